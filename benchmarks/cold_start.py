@@ -0,0 +1,86 @@
+# benchmarks/cold_start.py
+"""
+워커 콜드 스타트 벤치마크 (워밍업 유무별 기동 시간과 스타일별 첫 요청 지연)
+
+스타일마다 새 프로세스를 띄워 Django를 기동하고 (= 워커 부팅) 그 스타일의 첫 요청과
+두 번째 요청 지연을 잰다. 워밍업을 끄면 첫 요청이 OpenCV 초기화 비용을 치른다.
+
+사용법:
+    python benchmarks/cold_start.py --size 1024
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 새 프로세스에서 실행: 기동 시간, 첫 요청, 두 번째 요청 (초)
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+boot = time.perf_counter() - start
+
+import cv2, numpy as np
+from django.test import Client
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+style, size = sys.argv[1], int(sys.argv[2])
+sys.path.insert(0, 'benchmarks')
+from oil_painting import make_image
+image = make_image(size * size * 3 / 4 / 1e6)
+png = cv2.imencode('.png', image)[1].tobytes()
+
+client = Client(HTTP_HOST='localhost')
+timings = []
+for _ in range(2):
+    upload = SimpleUploadedFile('a.png', png, content_type='image/png')
+    start = time.perf_counter()
+    response = client.post('/api/converter/', {'image': upload, 'style': style, 'format': 'png'})
+    timings.append(time.perf_counter() - start)
+    assert response.status_code == 200, response.content[:200]
+print(json.dumps({'boot': boot, 'first': timings[0], 'second': timings[1]}))
+'''
+
+
+def run_child(style: str, size: int, warm: bool) -> dict:
+    env = dict(os.environ,
+               DJANGO_SETTINGS_MODULE='config.settings',
+               CONVERTER_WARMUP_ON_READY='true' if warm else 'false',
+               # 결과 캐시 때문에 두 번째 요청이 변환을 건너뛰지 않도록
+               RESULT_CACHE_BACKEND='')
+    child = subprocess.run([sys.executable, '-c', CHILD, style, str(size)], cwd=ROOT, env=env,
+                           capture_output=True, text=True)
+    if child.returncode != 0:
+        raise RuntimeError(child.stderr)
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def main():
+    sys.path.insert(0, ROOT)
+    from converter.processors import ProcessorFactory
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=1024, help='요청 이미지 너비 (px)')
+    parser.add_argument('--styles', nargs='+', default=list(ProcessorFactory.PROCESSORS),
+                        choices=list(ProcessorFactory.PROCESSORS))
+    args = parser.parse_args()
+
+    print(f"{'style':<16} {'boot ms':>8} {'boot+warm':>10} {'1st cold':>9} {'1st warm':>9} "
+          f"{'2nd':>8} {'ttfr cold':>10} {'ttfr warm':>10}")
+    for style in args.styles:
+        cold = run_child(style, args.size, warm=False)
+        warm = run_child(style, args.size, warm=True)
+        # 기동부터 첫 응답까지 (time to first response)
+        ttfr_cold = cold['boot'] + cold['first']
+        ttfr_warm = warm['boot'] + warm['first']
+        print(f"{style:<16} {cold['boot'] * 1e3:8.0f} {warm['boot'] * 1e3:10.0f} "
+              f"{cold['first'] * 1e3:9.1f} {warm['first'] * 1e3:9.1f} {warm['second'] * 1e3:8.1f} "
+              f"{ttfr_cold * 1e3:10.0f} {ttfr_warm * 1e3:10.0f}")
+
+
+if __name__ == '__main__':
+    main()
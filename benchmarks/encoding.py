@@ -0,0 +1,64 @@
+# benchmarks/encoding.py
+"""
+스타일별 출력 인코딩 벤치마크 (포맷/레벨별 인코딩 시간과 출력 크기)
+
+사용법:
+    python benchmarks/encoding.py --size 4 --styles oil_painting watercolor
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oil_painting import make_image  # noqa: E402
+from converter.encoding import EncoderOptions, encode_image  # noqa: E402
+from converter.processors import ProcessorFactory  # noqa: E402
+
+# 비교할 포맷/레벨 조합
+CANDIDATES = [
+    EncoderOptions('png', 0),
+    EncoderOptions('png', 1),
+    EncoderOptions('png', 3),
+    EncoderOptions('png', 6),
+    EncoderOptions('png', 9),
+    EncoderOptions('jpeg', 80),
+    EncoderOptions('jpeg', 90),
+    EncoderOptions('jpeg', 95),
+    EncoderOptions('webp', 80),
+    EncoderOptions('webp', 90),
+    EncoderOptions('webp', 101),
+]
+
+
+def timed(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=float, default=4, help='입력 크기 (MP)')
+    parser.add_argument('--styles', nargs='+', default=list(ProcessorFactory.PROCESSORS))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    image = make_image(args.size)
+    raw_mb = image.nbytes / 1e6
+    print(f'input: {image.shape[1]}x{image.shape[0]} ({raw_mb:.1f} MB raw BGR)')
+    print(f"{'style':<16} {'format':<10} {'encode ms':>10} {'size KB':>9} {'ratio':>7}")
+    for style in args.styles:
+        result = ProcessorFactory.get_processor(style).process(image)
+        for options in CANDIDATES:
+            seconds, encoded = timed(lambda: encode_image(result, options), args.repeat)
+            print(f'{style:<16} {options.cache_variant:<10} {seconds * 1e3:10.1f} '
+                  f'{len(encoded) / 1e3:9.0f} {raw_mb * 1e6 / len(encoded):6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# benchmarks/load_test.py
+"""
+gunicorn 워커 수 x OpenCV 스레드 수 조합별 부하 테스트 (처리량, p50/p99 지연)
+
+조합마다 gunicorn을 띄우고 --clients개 클라이언트가 동시에 --requests개 변환을 요청한다.
+'0' 스레드는 OpenCV 기본값(모든 코어)으로, 워커마다 코어 수만큼 스레드를 쓰는 과다 구독 상태다.
+
+사용법:
+    python benchmarks/load_test.py --configs 4x1 2x2 1x4 4x0 --clients 8 --requests 64
+    python benchmarks/load_test.py --style oil_painting --size 2048 --parallel-min-pixels 1000000
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from oil_painting import make_image  # noqa: E402
+from converter.concurrency import auto_tune, cpu_count  # noqa: E402
+
+
+def default_configs(cpus: int):
+    """처리량 우선, 자동 조정, 지연 우선, 과다 구독 조합"""
+    tuned = auto_tune(cpus)
+    configs = [(cpus, 1), (tuned['WORKERS'], tuned['CV_THREADS']), (1, cpus), (cpus, 0)]
+    return list(dict.fromkeys(configs))
+
+
+def multipart(fields: dict, file_bytes: bytes):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                     f'{value}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="image"; '
+                 f'filename="load.jpg"\r\nContent-Type: image/jpeg\r\n\r\n'.encode())
+    parts.append(file_bytes + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def wait_ready(url: str, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + 'styles/', timeout=2)
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.3)
+    raise RuntimeError('gunicorn이 시작되지 않았습니다.')
+
+
+def run_config(workers, threads, args, body, content_type):
+    env = dict(os.environ,
+               DJANGO_SETTINGS_MODULE='config.settings',
+               CONVERTER_WORKERS=str(workers),
+               CONVERTER_CV_THREADS=str(threads),
+               CONVERTER_PARALLEL_MIN_PIXELS=str(args.parallel_min_pixels),
+               CONVERTER_AFFINITY='true' if args.affinity else 'false',
+               # 같은 이미지를 반복 요청하므로 결과 캐시를 꺼야 변환 시간이 측정됨
+               RESULT_CACHE_BACKEND='')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'config.wsgi', '-c', 'gunicorn.conf.py',
+         '--bind', f'127.0.0.1:{args.port}', '--timeout', '300'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f'http://127.0.0.1:{args.port}/api/converter/'
+    try:
+        wait_ready(url)
+
+        def one(_):
+            request = urllib.request.Request(url, data=body, headers={'Content-Type': content_type})
+            start = time.perf_counter()
+            with urllib.request.urlopen(request, timeout=300) as response:
+                response.read()
+            return time.perf_counter() - start
+
+        # 워커마다 한 번씩 데워 둠
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(one, range(workers)))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            latencies = np.array(list(pool.map(one, range(args.requests)))) * 1e3
+        elapsed = time.perf_counter() - start
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+    return {
+        'rps': args.requests / elapsed,
+        'p50': float(np.percentile(latencies, 50)),
+        'p99': float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', nargs='+', help='워커x스레드 (예: 4x1 2x2), 기본은 코어 수로 결정')
+    parser.add_argument('--style', default='cartoon')
+    parser.add_argument('--size', type=int, default=1024, help='요청 이미지 너비 (px)')
+    parser.add_argument('--clients', type=int, default=None, help='동시 클라이언트 수 (기본: 코어 수 x 2)')
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--parallel-min-pixels', type=int, default=0)
+    parser.add_argument('--affinity', action='store_true')
+    parser.add_argument('--port', type=int, default=8777)
+    args = parser.parse_args()
+
+    cpus = cpu_count()
+    args.clients = args.clients or cpus * 2
+    if args.configs:
+        configs = [tuple(int(n) for n in config.split('x')) for config in args.configs]
+    else:
+        configs = default_configs(cpus)
+
+    image = make_image(args.size * args.size * 3 / 4 / 1e6)
+    jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    body, content_type = multipart({'style': args.style, 'format': 'jpeg'}, jpeg)
+
+    print(f'cores {cpus}, style {args.style}, {image.shape[1]}x{image.shape[0]}, '
+          f'clients {args.clients}, requests {args.requests}')
+    print(f"{'workers':>7} {'threads':>7} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for workers, threads in configs:
+        result = run_config(workers, threads, args, body, content_type)
+        label = 'all' if threads == 0 else str(threads)
+        print(f"{workers:7d} {label:>7} {result['rps']:8.2f} {result['p50']:9.1f} {result['p99']:9.1f}",
+              flush=True)
+
+
+if __name__ == '__main__':
+    main()
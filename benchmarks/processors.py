@@ -0,0 +1,263 @@
+# benchmarks/processors.py
+"""
+전체 스타일 성능 벤치마크 (지연 백분위수, 처리량, 최대 메모리)와 기준치 비교
+
+ProcessorFactory.PROCESSORS의 모든 스타일을 결정적인 합성 이미지 모음과 여러 해상도,
+get_parameters()의 기본값/최솟값/최댓값 조합으로 실행한다.
+결과를 JSON 기준치로 저장해 두고, 이후 실행을 기준치와 비교한다.
+종료 코드: 0 회귀 없음, 1 느려지거나 메모리가 늘어난 항목 있음, 2 기준치 파일 없음.
+
+기준치 (benchmarks/baseline.json):
+    저장소의 기준치는 아래 명령으로 만든 참고용이다 (만든 장비는 파일의 environment 참고).
+    지연은 장비마다 다르므로 다른 장비에서 비교하려면 같은 장비에서 먼저 기준치를 다시 만든다.
+        python benchmarks/processors.py --sizes 0.25 --corners default --repeat 9 \
+            --output benchmarks/baseline.json
+    CI (.github/workflows/benchmark.yml)는 같은 러너에서 PR의 base 커밋으로 기준치를 만들고
+    PR 커밋을 --compare로 비교해, 회귀가 있으면 종료 코드 1로 검사를 실패시킨다.
+
+사용법:
+    python benchmarks/processors.py --sizes 0.25 1 4 --output benchmarks/baseline.json
+    python benchmarks/processors.py --compare benchmarks/baseline.json --tolerance 0.25
+    python benchmarks/processors.py --styles oil_painting --corners default --repeat 10
+    python benchmarks/processors.py --sizes 1 4 --calibrate cost_calibration.json
+
+--calibrate는 측정한 p50을 스타일별 비용 모델(get_cost) 예상치와 비교해 스타일별 보정 배율
+(측정 / 예상의 중앙값)을 저장한다. 서버에서 COST_CALIBRATION_FILE로 지정하면 예산 검사와
+입장 제어가 이 장비 기준의 예상 시간을 쓴다 (배포와 같은 OpenCV 스레드 수로 측정할 것).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oil_painting import make_image  # noqa: E402
+from converter.processors import ProcessorFactory  # noqa: E402
+
+PERCENTILES = (50, 90, 99)
+
+
+# --- 합성 이미지 모음 (시드 고정) ---
+
+def make_noise(megapixels: float, seed: int = 0) -> np.ndarray:
+    """고주파 노이즈 - 엣지가 가장 많은 최악의 경우"""
+    w = int(np.sqrt(megapixels * 1e6 * 4 / 3))
+    h = int(w * 3 / 4)
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def make_flat(megapixels: float, seed: int = 0) -> np.ndarray:
+    """부드러운 그라디언트 - 엣지가 거의 없는 경우"""
+    image = make_image(megapixels, seed)
+    return cv2.GaussianBlur(image, (0, 0), 25)
+
+
+CORPUS = {
+    'shapes': make_image,
+    'noise': make_noise,
+    'flat': make_flat,
+}
+
+
+# --- 파라미터 조합 ---
+
+def parameter_corner(processor_class, corner: str) -> dict:
+    """'default', 'min', 'max' 조합의 파라미터 (bool은 min=False, max=True)"""
+    params = {}
+    for param in processor_class.get_parameters():
+        if corner == 'default':
+            value = param['default']
+        elif param['type'] == 'bool':
+            value = corner == 'max'
+        else:
+            value = param.get(corner, param['default'])
+        params[param['name']] = value
+    return params
+
+
+CORNERS = ('default', 'min', 'max')
+
+
+def case_key(style, corner, corpus, megapixels) -> str:
+    return f'{style}/{corner}/{corpus}/{megapixels:g}mp'
+
+
+# --- 측정 ---
+
+def measure(processor, image, params, repeat: int, warmup: int = 1) -> dict:
+    """지연 백분위수, 처리량, 최대 메모리 (tracemalloc 기준 NumPy/OpenCV 배열 할당)"""
+    for _ in range(warmup):
+        processor.process(image, **params)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processor.process(image, **params)
+        samples.append(time.perf_counter() - start)
+
+    # 메모리는 시간 측정과 따로 한 번 더 실행해서 잼 (tracemalloc 부하가 시간에 섞이지 않도록)
+    tracemalloc.start()
+    processor.process(image, **params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = np.array(samples) * 1e3
+    megapixels = image.shape[0] * image.shape[1] / 1e6
+    result = {f'p{p}_ms': round(float(np.percentile(ms, p)), 3) for p in PERCENTILES}
+    result.update({
+        'mean_ms': round(float(ms.mean()), 3),
+        'min_ms': round(float(ms.min()), 3),
+        'mp_per_s': round(megapixels / (result['p50_ms'] / 1e3), 3),
+        'peak_mb': round(peak / 2**20, 2),
+        'repeat': repeat,
+    })
+    return result
+
+
+def environment() -> dict:
+    """결과 비교에 영향을 주는 실행 환경"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'cv2_threads': cv2.getNumThreads(),
+    }
+
+
+def run(args) -> dict:
+    results = {}
+    for megapixels in args.sizes:
+        for corpus_name in args.corpora:
+            image = CORPUS[corpus_name](megapixels)
+            for style in args.styles:
+                processor_class = ProcessorFactory.get_processor_class(style)
+                processor = processor_class()
+                for corner in args.corners:
+                    params = parameter_corner(processor_class, corner)
+                    key = case_key(style, corner, corpus_name, megapixels)
+                    results[key] = {'params': params, **measure(processor, image, params, args.repeat),
+                                    'estimate_ms': round(processor_class.estimate_cost(image.shape, params), 3)}
+                    row = results[key]
+                    print(f"{key:<42} p50 {row['p50_ms']:9.1f} ms  p99 {row['p99_ms']:9.1f} ms  "
+                          f"{row['mp_per_s']:7.2f} MP/s  {row['peak_mb']:8.1f} MB", flush=True)
+    return results
+
+
+# --- 비용 모델 보정 ---
+
+def calibrate(results: dict) -> dict:
+    """스타일별 측정 p50 / 비용 모델 예상치의 중앙값 (1보다 크면 모델이 과소평가)"""
+    ratios = {}
+    for key, row in results.items():
+        if row['estimate_ms'] > 0:
+            ratios.setdefault(key.split('/')[0], []).append(row['p50_ms'] / row['estimate_ms'])
+    return {style: round(float(np.median(values)), 3) for style, values in ratios.items()}
+
+
+# --- 기준치 비교 ---
+
+def compare(baseline: dict, current: dict, tolerance: float, memory_tolerance: float,
+            min_delta_ms: float) -> list:
+    """
+    기준치보다 p50 지연이나 최대 메모리가 허용치 이상 늘어난 항목 목록
+    지연은 p50과 최솟값이 모두 tolerance 넘게 늘어야 느려진 것으로 본다
+    (공유 장비에서 다른 프로세스 때문에 한 번 느려진 측정을 회귀로 보지 않도록).
+    Args:
+        tolerance: 허용하는 p50 지연 증가율 (0.25 = 25%)
+        memory_tolerance: 허용하는 최대 메모리 증가율
+        min_delta_ms: 이보다 작은 지연 증가는 측정 잡음으로 보고 무시
+    """
+    regressions = []
+    print(f"\n{'case':<42} {'base p50':>9} {'p50':>9} {'ratio':>6} {'base MB':>8} {'MB':>8}")
+    for key, row in current.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f'{key:<42} (기준치 없음)')
+            continue
+        ratio = row['p50_ms'] / base['p50_ms'] if base['p50_ms'] else float('inf')
+        min_ratio = row['min_ms'] / base['min_ms'] if base.get('min_ms') else ratio
+        memory_ratio = row['peak_mb'] / base['peak_mb'] if base['peak_mb'] else 1.0
+        slower = (ratio > 1 + tolerance and min_ratio > 1 + tolerance
+                  and row['p50_ms'] - base['p50_ms'] > min_delta_ms)
+        bigger = memory_ratio > 1 + memory_tolerance
+        mark = ' <- 느려짐' if slower else ''
+        mark += ' <- 메모리 증가' if bigger else ''
+        print(f"{key:<42} {base['p50_ms']:9.1f} {row['p50_ms']:9.1f} {ratio:5.2f}x "
+              f"{base['peak_mb']:8.1f} {row['peak_mb']:8.1f}{mark}")
+        if slower or bigger:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=float, nargs='+', default=[0.25, 1])
+    parser.add_argument('--styles', nargs='+', default=list(ProcessorFactory.PROCESSORS),
+                        choices=list(ProcessorFactory.PROCESSORS))
+    parser.add_argument('--corpora', nargs='+', default=list(CORPUS), choices=list(CORPUS))
+    parser.add_argument('--corners', nargs='+', default=list(CORNERS), choices=CORNERS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일 (기준치)')
+    parser.add_argument('--compare', help='비교할 기준치 JSON 파일')
+    parser.add_argument('--calibrate', help='비용 모델 보정 배율을 저장할 JSON 파일')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--memory-tolerance', type=float, default=0.10)
+    parser.add_argument('--min-delta-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    # 비교할 때는 따로 지정하지 않았으면 기준치와 같은 조건으로 실행
+    baseline = None
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f'기준치 파일이 없습니다: {args.compare} (--output으로 먼저 만들 것)')
+            sys.exit(2)
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        argv = sys.argv[1:]
+        for name in ('sizes', 'styles', 'corpora', 'corners', 'repeat'):
+            if f'--{name}' not in argv and name in baseline.get('config', {}):
+                setattr(args, name, baseline['config'][name])
+        if baseline.get('environment') != environment():
+            print(f"경고: 기준치와 실행 환경이 다릅니다 {baseline.get('environment')}")
+
+    results = run(args)
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'config': {name: getattr(args, name)
+                   for name in ('sizes', 'styles', 'corpora', 'corners', 'repeat')},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'\n{args.output}에 저장')
+
+    if args.calibrate:
+        calibration = calibrate(results)
+        with open(args.calibrate, 'w', encoding='utf-8') as f:
+            json.dump({'created_at': report['created_at'], 'environment': report['environment'],
+                       'calibration': calibration}, f, ensure_ascii=False, indent=2)
+        print(f'\n비용 모델 보정 배율 {calibration}')
+        print(f'{args.calibrate}에 저장')
+
+    if baseline is not None:
+        regressions = compare(baseline['results'], results, args.tolerance,
+                              args.memory_tolerance, args.min_delta_ms)
+        if regressions:
+            print(f'\n회귀 {len(regressions)}건: {", ".join(regressions)}')
+            sys.exit(1)
+        print('\n회귀 없음')
+
+
+if __name__ == '__main__':
+    main()
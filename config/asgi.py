@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# 서버로 뜰 때만 워밍업 (gunicorn.conf.py는 미리 끄고 워커마다 post_fork에서 실행)
+os.environ.setdefault('CONVERTER_WARMUP_ON_READY', 'true')
 
 application = get_asgi_application()
@@ -1,4 +1,5 @@
 from pathlib import Path
+import json
 import os
 from dotenv import load_dotenv
 
@@ -130,4 +131,197 @@ CORS_ALLOW_METHODS = [
     'PUT',
 ]
 
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# 바이너리 이미지 응답의 메타데이터 헤더를 프론트엔드에서 읽을 수 있도록 노출
+CORS_EXPOSE_HEADERS = [
+    'Content-Disposition',
+    'X-File-Name',
+    'X-Style',
+    'X-Params',
+    'X-Preview',
+    'X-Cache',
+    'Server-Timing',
+]
+
+# --- Converter 결과 캐시 ---
+# BACKEND: 'memory' (프로세스 내 LRU), 'django' (CACHES 별칭 사용), '' (사용 안 함)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'converter': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('RESULT_CACHE_DIR', str(BASE_DIR / 'cache' / 'converter')),
+    },
+}
+
+CONVERTER_RESULT_CACHE = {
+    'BACKEND': os.getenv('RESULT_CACHE_BACKEND', 'memory'),
+    'MAX_BYTES': int(os.getenv('RESULT_CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+    'CACHE_ALIAS': 'converter',
+    'TIMEOUT': int(os.getenv('RESULT_CACHE_TIMEOUT', 24 * 60 * 60)),
+}
+
+# --- Converter 디코딩 이미지 저장소 (image_id로 재변환) ---
+# 디코딩한 이미지는 워커마다 메모리에 두고, 원본 업로드 바이트는 CACHE_ALIAS 캐시에 넣어
+# 다른 워커로 간 image_id 요청도 원본을 다시 디코딩해 처리 (여러 서버면 Redis 등 공유 캐시 별칭)
+CONVERTER_IMAGE_STORE = {
+    'MAX_BYTES': int(os.getenv('IMAGE_STORE_MAX_BYTES', 512 * 1024 * 1024)),
+    'TTL': int(os.getenv('IMAGE_STORE_TTL', 600)),
+    'CACHE_ALIAS': os.getenv('IMAGE_STORE_CACHE_ALIAS', 'converter'),
+    # 재변환끼리 공유할 중간 결과(그레이스케일, Sobel 등) 예산 - 원본 크기의 배수
+    'FEATURE_RATIO': float(os.getenv('IMAGE_STORE_FEATURE_RATIO', 2.0)),
+}
+
+# --- Converter 유사 입력 색인 (재압축/재인코딩된 같은 사진의 결과 재사용) ---
+# 같은 크기에서 pHash(63비트) 해밍 거리가 MAX_DISTANCE 이하면 같은 입력으로 취급
+# 색상과 미세한 노이즈는 비교하지 않으므로 기본은 꺼져 있음
+CONVERTER_SIMILAR_INPUTS = {
+    'ENABLED': os.getenv('SIMILAR_INPUTS_ENABLED', 'false').lower() == 'true',
+    'MAX_ENTRIES': int(os.getenv('SIMILAR_INPUTS_MAX_ENTRIES', 4096)),
+    'MAX_DISTANCE': int(os.getenv('SIMILAR_INPUTS_MAX_DISTANCE', 4)),
+}
+
+# --- Converter 업로드 디코딩 ---
+# 헤더로 확인한 픽셀 수가 MAX_PIXELS를 넘으면 디코딩 전에 413으로 거절
+CONVERTER_DECODE = {
+    'MAX_PIXELS': int(os.getenv('DECODE_MAX_PIXELS', 100_000_000)),
+}
+
+# --- Converter 처리 비용 예산 (스타일별 비용 모델 x 픽셀 수 = 코어 하나 기준 예상 ms) ---
+# MAX_COST를 넘는 요청은 디코딩 전에 413으로 거절하거나, ON_EXCEED가 'downscale'이면
+# 예산에 맞게 줄여서 변환 (동기 변환만 - 작업 큐, 배치, async/는 항상 거절). 0이면 검사 안 함
+# CALIBRATION: 스타일별 보정 배율 - COST_CALIBRATION_FILE로 benchmarks/processors.py --calibrate 결과 지정
+CONVERTER_COST = {
+    'MAX_COST': float(os.getenv('COST_MAX_MS', 30_000)),
+    'ON_EXCEED': os.getenv('COST_ON_EXCEED', 'reject'),
+    'CALIBRATION': {},
+}
+if os.getenv('COST_CALIBRATION_FILE'):
+    with open(os.getenv('COST_CALIBRATION_FILE'), encoding='utf-8') as f:
+        CONVERTER_COST['CALIBRATION'] = json.load(f)['calibration']
+
+# --- Converter 입장 제어 (예상 CPU-초 토큰 버킷, converter/admission.py 참고) ---
+# 토큰은 초당 RATE개(0이면 코어 수 / 워커 수)씩 BURST개(0이면 RATE x 10)까지 차고,
+# 변환은 예상 처리 시간만큼 꺼낸 뒤 실행. 모자라면 MAX_WAIT초까지 기다리고 그래도 없으면 503 + Retry-After
+CONVERTER_ADMISSION = {
+    'ENABLED': os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true',
+    'RATE': float(os.getenv('ADMISSION_RATE', 0)),
+    'BURST': float(os.getenv('ADMISSION_BURST', 0)),
+    'MAX_WAIT': float(os.getenv('ADMISSION_MAX_WAIT', 2)),
+}
+
+# --- Converter 미리보기 (preview=true 요청의 기본 긴 변 길이) ---
+CONVERTER_PREVIEW_SIZE = int(os.getenv('PREVIEW_SIZE', 512))
+
+# --- Converter 출력 인코딩 ---
+# 바이너리 응답에서 포맷을 지정하지 않거나 'auto'/'image/*'로 요청하면 STYLE_FORMATS 사용
+# (benchmarks/encoding.py 측정 기준: 사진 같은 스타일은 JPEG이 PNG보다 10배 이상 빠르고 작음)
+CONVERTER_ENCODER = {
+    'STYLE_FORMATS': {
+        'ink_drawing': 'png',
+        'mosaic': 'png',
+        'detailed_sketch': 'jpeg',
+        'oil_painting': 'jpeg',
+        'watercolor': 'jpeg',
+        'cartoon': 'jpeg',
+        'cel_shading': 'jpeg',
+        'pointillism': 'jpeg',
+        'outline': 'png',
+    },
+    'LEVELS': {
+        'png': int(os.getenv('PNG_COMPRESSION', 1)),
+        'jpeg': int(os.getenv('JPEG_QUALITY', 90)),
+        'webp': int(os.getenv('WEBP_QUALITY', 90)),
+    },
+    # 기존 JSON(base64) 응답은 항상 PNG - LEVELS['png']와 별도로 예전 압축 레벨 유지
+    'JSON_PNG_LEVEL': int(os.getenv('JSON_PNG_COMPRESSION', 3)),
+}
+
+# --- Converter 비동기 작업 큐 (jobs/ 또는 async=true) ---
+# BACKEND: 'process' (프로세스 풀), 'thread' (스레드 풀, 개발/테스트용)
+# 끝나지 않은 작업이 MAX_PENDING개면 429 + Retry-After로 거절
+# WORKERS, MAX_PENDING은 서버 전체 값 - gunicorn이면 워커마다 나눠서 적용 (runserver는 그대로)
+# 작업 기록과 결과는 CACHE_ALIAS 캐시에 넣어 어느 웹 워커로 조회해도 보이게 함 (결과 바이트는 여기에만)
+# ('converter'는 호스트 안에서 공유되는 FileBasedCache, 여러 서버면 Redis 등 공유 캐시 별칭)
+CONVERTER_JOBS = {
+    'BACKEND': os.getenv('JOB_BACKEND', 'process'),
+    'WORKERS': int(os.getenv('JOB_WORKERS', 2)),
+    'MAX_PENDING': int(os.getenv('JOB_MAX_PENDING', 16)),
+    'RESULT_TTL': int(os.getenv('JOB_RESULT_TTL', 600)),
+    'CACHE_ALIAS': os.getenv('JOB_CACHE_ALIAS', 'converter'),
+    'MAX_WAIT': 30,
+    'RETRY_AFTER': 5,
+}
+
+# --- Converter 배치 변환 (batch/: 한 이미지, 여러 스타일) ---
+CONVERTER_BATCH = {
+    'WORKERS': int(os.getenv('BATCH_WORKERS', 4)),
+    'MAX_ITEMS': 16,
+}
+
+# --- Converter 여러 프레임 입력 (움직이는 GIF/WebP, 짧은 MP4 - converter/animation.py 참고) ---
+# 프레임을 WORKERS개 스레드로 변환하고, 풀에 넣고 아직 출력하지 않은 프레임은 IN_FLIGHT개까지
+# 프레임이 MAX_FRAMES개를 넘으면 413
+# 동영상은 VIDEO_FOURCC 코덱의 MP4로 출력 (기본 'avc1' = H.264, 브라우저에서 재생됨)
+# 설치된 OpenCV가 그 코덱으로 쓸 수 없으면 GIF로 출력 ('mp4v'는 브라우저가 재생하지 못함)
+CONVERTER_ANIMATION = {
+    'MAX_FRAMES': int(os.getenv('ANIMATION_MAX_FRAMES', 300)),
+    'WORKERS': int(os.getenv('ANIMATION_WORKERS', 2)),
+    'IN_FLIGHT': int(os.getenv('ANIMATION_IN_FLIGHT', 4)),
+    'VIDEO_FOURCC': os.getenv('ANIMATION_VIDEO_FOURCC', 'avc1'),
+}
+
+# --- Converter 타일 처리 (아주 큰 이미지의 작업 메모리 제한) ---
+# 픽셀 수가 MIN_PIXELS 이상이면 TILE_SIZE 타일로 나눠 WORKERS개씩 병렬 처리
+# (프로세서가 get_halo로 여백을 선언한 스타일만 - 나머지는 한 번에 처리)
+CONVERTER_TILING = {
+    'MIN_PIXELS': int(os.getenv('TILING_MIN_PIXELS', 16_000_000)),
+    'TILE_SIZE': int(os.getenv('TILING_TILE_SIZE', 1024)),
+    'WORKERS': int(os.getenv('TILING_WORKERS', 2)),
+}
+
+# --- Converter 지표 (metrics/: 단계별 소요 시간 히스토그램, Prometheus 형식) ---
+# SERVER_TIMING이면 변환 응답에 Server-Timing 헤더로 단계별 시간(ms)을 붙임
+CONVERTER_METRICS = {
+    'ENABLED': os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+    'SERVER_TIMING': os.getenv('SERVER_TIMING', 'false').lower() == 'true',
+}
+
+# --- Converter 워밍업 (서버 시작 시 스타일마다 SIZE px 이미지로 한 번씩 실행) ---
+# ON_READY는 기본으로 꺼져 있어 migrate, shell, test 등 manage.py 명령은 워밍업하지 않음
+# config/wsgi.py, config/asgi.py가 서버로 뜰 때 켜고, gunicorn.conf.py는 끈 채로 워커마다 fork 후에 실행
+# (OpenCV 스레드 풀은 fork를 넘지 못함)
+CONVERTER_WARMUP = {
+    'ON_READY': os.getenv('CONVERTER_WARMUP_ON_READY', 'false').lower() == 'true',
+    'SIZE': int(os.getenv('CONVERTER_WARMUP_SIZE', 64)),
+}
+
+# --- Converter 동시성 (워커 수 x 워커당 OpenCV 스레드 수, converter/concurrency.py 참고) ---
+# 'auto'면 코어 수로 결정: 4코어 미만은 워커=코어, 스레드 1 / 그 이상은 스레드 2, 워커=코어//2
+# PARALLEL_MIN_PIXELS: 이 이상인 이미지는 타일로 나눠 CV_THREADS개 스레드로 처리 (0이면 끔)
+# AFFINITY: gunicorn 워커마다 CV_THREADS개 코어에 고정
+CONVERTER_CONCURRENCY = {
+    'WORKERS': os.getenv('CONVERTER_WORKERS', 'auto'),
+    'CV_THREADS': os.getenv('CONVERTER_CV_THREADS', 'auto'),
+    'PARALLEL_MIN_PIXELS': int(os.getenv('CONVERTER_PARALLEL_MIN_PIXELS', 0)),
+    'AFFINITY': os.getenv('CONVERTER_AFFINITY', 'false').lower() == 'true',
+}
+
+# --- Converter 비동기 변환 (async/, ASGI: 변환은 공유 메모리 프로세스 풀에서 실행) ---
+# BACKEND: 'process' (프로세스 풀), 'thread' (스레드 풀, 개발/테스트용)
+# 실행 중 + 대기 중인 변환이 MAX_PENDING개(0이면 WORKERS의 2배)면 429 + Retry-After로 거절
+CONVERTER_OFFLOAD = {
+    'BACKEND': os.getenv('OFFLOAD_BACKEND', 'process'),
+    'WORKERS': int(os.getenv('OFFLOAD_WORKERS', 2)),
+    'MAX_PENDING': int(os.getenv('OFFLOAD_MAX_PENDING', 0)),
+    'RETRY_AFTER': 1,
+}
+
+# --- Converter 선언형 스타일 (스타일 이름 -> 단계 그래프, converter/processors/pipeline.py 형식) ---
+# CONVERTER_PIPELINES_FILE로 JSON 파일을 지정하면 서버 시작 시 그 스타일들을 등록 (같은 이름은 교체)
+CONVERTER_PIPELINES = {}
+if os.getenv('CONVERTER_PIPELINES_FILE'):
+    with open(os.getenv('CONVERTER_PIPELINES_FILE'), encoding='utf-8') as f:
+        CONVERTER_PIPELINES = json.load(f)
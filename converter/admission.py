@@ -0,0 +1,151 @@
+# converter/admission.py
+"""
+예상 CPU 시간 가중 입장 제어 (토큰 버킷)
+
+버킷에는 CPU-초 단위 토큰이 초당 RATE개씩 (기본은 이 워커 몫의 코어 수) BURST개까지 찬다.
+변환 요청은 예상 처리 시간(converter/cost.py)만큼 토큰을 꺼내고 나서 실행한다.
+mosaic 1MP 같은 요청은 토큰을 거의 쓰지 않아 계속 통과하고, 비싼 요청은 토큰이
+찰 때까지 최대 MAX_WAIT초 기다린 뒤, 그래도 모자라면 Overloaded(503 + Retry-After)로 거절한다.
+BURST보다 비싼 요청은 BURST만큼만 꺼낸다 (버킷이 가득 차면 실행할 수 있도록).
+기다리는 요청은 도착 순서대로 토큰을 받는다 (뒤에 온 싼 요청이 앞의 비싼 요청을 계속 앞지르지 않도록).
+
+적용 범위 (변환 진입점)
+    convert_image, batch_convert, async/ : 요청 스레드에서 바로 변환하므로 버킷을 거친다.
+        batch_convert는 캐시에 없는 스타일 비용의 합, async/는 스레드 풀(prepare)에서 꺼낸다.
+    submit_job : 제외. 변환은 고정 크기 작업 풀에서 돌고 MAX_PENDING을 넘으면 429로 거절하므로
+        CPU 사용량은 이미 풀 크기로 묶여 있다. 버킷까지 거치면 같은 작업을 두 번 세고,
+        비동기로 맡긴 요청을 503으로 돌려보내게 된다.
+"""
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+
+from .concurrency import get_concurrency
+
+
+class Overloaded(Exception):
+    """토큰이 모자라 지금은 실행할 수 없는 요청"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """CPU-초 토큰 버킷 (스레드 안전, 대기 요청은 FIFO)"""
+
+    def __init__(self, rate: float, burst: float, max_wait: float = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: 초당 채워지는 토큰 (CPU-초/초)
+            burst: 버킷 크기 (CPU-초)
+            max_wait: 토큰이 모자랄 때 기다리는 최대 시간 (초)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.clock = clock
+        self.tokens = burst
+        self.admitted = 0
+        self.rejected = 0
+        self._updated = clock()
+        self._cond = threading.Condition()
+        # 기다리는 요청 (번호표 -> 비용), 맨 앞 요청만 토큰을 꺼낼 수 있음
+        self._waiters = OrderedDict()
+        self._tickets = itertools.count()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, cost: float, timeout: Optional[float] = None) -> float:
+        """
+        cost CPU-초만큼 토큰을 꺼냄 (모자라면 timeout초까지 대기), 기다린 시간(초) 반환
+        Raises:
+            Overloaded: timeout 안에 토큰이 차지 않음
+        """
+        cost = min(max(cost, 0.0), self.burst)
+        timeout = self.max_wait if timeout is None else timeout
+        start = self.clock()
+        with self._cond:
+            ticket = next(self._tickets)
+            self._waiters[ticket] = cost
+            try:
+                while True:
+                    self._refill()
+                    if next(iter(self._waiters)) == ticket and self.tokens >= cost:
+                        self.tokens -= cost
+                        self.admitted += 1
+                        return self.clock() - start
+                    # 앞에서 기다리는 요청까지 토큰을 받아야 차례가 옴
+                    needed = 0.0
+                    for waiter, waiter_cost in self._waiters.items():
+                        needed += waiter_cost
+                        if waiter == ticket:
+                            break
+                    shortage = max(0.0, needed - self.tokens) / self.rate
+                    remaining = timeout - (self.clock() - start)
+                    if shortage > remaining:
+                        self.rejected += 1
+                        raise Overloaded(f'서버가 바쁩니다 (예상 처리 시간 {cost:.1f}초).',
+                                         retry_after=shortage)
+                    # 토큰은 충분하지만 앞 요청이 아직 꺼내지 않았으면 그 요청이 깨울 때까지 대기
+                    self._cond.wait(shortage or None)
+            finally:
+                del self._waiters[ticket]
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill()
+            return {
+                'tokens': round(self.tokens, 3),
+                'rate': self.rate,
+                'burst': self.burst,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'waiting': len(self._waiters),
+            }
+
+
+def retry_after_header(error: Overloaded) -> str:
+    """Retry-After 헤더 값 (정수 초, 최소 1)"""
+    return str(max(1, math.ceil(error.retry_after)))
+
+
+_bucket = None
+_bucket_lock = threading.Lock()
+
+
+def get_admission() -> Optional[TokenBucket]:
+    """
+    settings.CONVERTER_ADMISSION으로 만든 프로세스 공용 버킷 (꺼져 있으면 None)
+    RATE가 없으면 이 워커 프로세스의 몫인 코어 수 / 워커 수
+    """
+    global _bucket
+    if _bucket is None:
+        with _bucket_lock:
+            if _bucket is None:
+                config = getattr(settings, 'CONVERTER_ADMISSION', {})
+                if config.get('ENABLED', True):
+                    concurrency = get_concurrency()
+                    rate = config.get('RATE') or max(1.0, concurrency['CPUS'] / concurrency['WORKERS'])
+                    _bucket = TokenBucket(rate, config.get('BURST') or rate * 10,
+                                          config.get('MAX_WAIT', 2))
+                else:
+                    _bucket = False
+    return _bucket or None
+
+
+def reset_admission() -> None:
+    """설정 변경 후 버킷을 다시 만들도록 초기화 (테스트용)"""
+    global _bucket
+    with _bucket_lock:
+        _bucket = None
@@ -0,0 +1,426 @@
+# converter/animation.py
+"""
+여러 프레임 입력 (움직이는 GIF/WebP/APNG, 짧은 MP4/MOV) 변환
+
+프레임은 한 장씩 디코딩해서 공용 스레드 풀에서 선택한 스타일로 변환하고, 끝난 순서가 아니라
+원래 순서대로 받아 바로 출력 파일에 이어 쓴다. 디코딩과 출력은 요청 스레드가, 변환은 풀이 맡으므로
+세 단계가 겹쳐 돌고, 풀에 넣고 아직 쓰지 않은 프레임은 IN_FLIGHT개를 넘지 않아
+클립 길이와 관계없이 메모리에 있는 프레임 수가 일정하다.
+
+- 움직이는 이미지는 GIF로 출력한다. 프레임마다 풀에서 팔레트 이미지를 만들고, 요청 스레드가
+  GIF_CHUNK장씩 PIL save_all로 인코딩해 한 파일로 이어 붙인다 (save_all은 받은 프레임을 모두
+  모았다가 쓰므로 한 번에 넘기면 클립 길이만큼 메모리를 씀).
+- 동영상은 OpenCV VideoCapture로 디코딩하고 VideoWriter로 MP4(H.264, 'avc1')에 이어 쓴다.
+  브라우저 <video>는 MPEG-4 Part 2('mp4v')를 재생하지 못하므로, 설치된 OpenCV가 H.264로
+  쓸 수 없으면 (pip opencv-python 휠은 H.264 인코더가 없음) 동영상도 GIF로 출력한다.
+  OpenCV는 파일 경로로만 열 수 있어 메모리로 받은 업로드는 임시 파일에 옮긴다.
+
+프로세서 인스턴스는 ProcessorFactory의 공유 인스턴스라 LUT, 커널 같은 캐시를 모든 프레임이
+같이 쓰고, 파라미터(pointillism의 seed 등)도 같으므로 프레임 사이에 무늬가 깜빡이지 않는다.
+"""
+import io
+import os
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from django.conf import settings
+from PIL import Image, ImageSequence
+
+from .decoding import ImageTooLarge, _file_path
+from .metrics import timed
+
+# 프레임 길이 정보가 없을 때 쓰는 값 (GIF 100ms, 동영상 25fps)
+DEFAULT_DURATION = 100
+DEFAULT_FPS = 25.0
+
+ANIMATION, VIDEO = 'animation', 'video'
+
+# GIF를 한 번에 인코딩하는 프레임 수 (인코딩을 기다리는 팔레트 이미지의 메모리 상한)
+GIF_CHUNK = 16
+
+# 동영상 출력 코덱 (settings.CONVERTER_ANIMATION['VIDEO_FOURCC']로 바꿀 수 있음)
+VIDEO_FOURCC = 'avc1'
+
+# 동영상으로 처리할 ISO 기반 미디어 파일의 주 브랜드 (MP4, M4V, QuickTime, 3GP)
+VIDEO_BRANDS = {
+    b'isom', b'iso2', b'iso4', b'iso5', b'iso6', b'mp41', b'mp42', b'avc1', b'mmp4',
+    b'M4V ', b'M4VH', b'M4VP', b'qt  ', b'3gp4', b'3gp5', b'3gp6', b'3g2a', b'dash',
+}
+
+# 출력 (MIME 타입, 확장자)
+OUTPUT_TYPES = {
+    ANIMATION: ('image/gif', '.gif'),
+    VIDEO: ('video/mp4', '.mp4'),
+}
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """여러 프레임 입력의 헤더 정보 (동영상의 frames는 컨테이너가 알려 주는 근사값)"""
+    kind: str
+    width: int
+    height: int
+    frames: int
+    format: Optional[str] = None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+
+def animation_config() -> Dict[str, Any]:
+    return getattr(settings, 'CONVERTER_ANIMATION', {})
+
+
+def is_video(source) -> bool:
+    """
+    MP4/MOV 동영상인지 - 'ftyp' 상자의 주 브랜드로 판단
+    HEIC, AVIF 같은 정지 이미지도 같은 ISO 기반 컨테이너라 브랜드가 VIDEO_BRANDS에 있을 때만 동영상
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:12])
+    else:
+        source.seek(0)
+        head = source.read(12)
+        source.seek(0)
+    return head[4:8] == b'ftyp' and head[8:12] in VIDEO_BRANDS
+
+
+@contextmanager
+def local_path(source, suffix: str = ''):
+    """OpenCV가 열 수 있는 파일 경로 (디스크에 없는 업로드는 임시 파일로 복사했다가 지움)"""
+    path = _file_path(source)
+    if path is not None:
+        yield path
+        return
+    with tempfile.NamedTemporaryFile(suffix=suffix) as f:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            f.write(source)
+        else:
+            source.seek(0)
+            shutil.copyfileobj(source, f)
+        f.flush()
+        yield f.name
+
+
+def _open_image(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(source))
+    path = _file_path(source)
+    if path is not None:
+        return Image.open(path)
+    source.seek(0)
+    return Image.open(source)
+
+
+def probe_media(source, max_pixels: Optional[int] = None) -> Optional[MediaInfo]:
+    """
+    여러 프레임 입력이면 헤더 정보, 한 장짜리 이미지면 None (픽셀은 디코딩하지 않음)
+    Raises:
+        ImageTooLarge: 프레임 하나의 픽셀 수가 max_pixels를 넘거나 프레임이 MAX_FRAMES개를 넘음
+        ValueError: 열 수 없는 동영상
+    """
+    if is_video(source):
+        with local_path(source, '.mp4') as path:
+            capture = cv2.VideoCapture(path)
+            try:
+                if not capture.isOpened():
+                    raise ValueError('동영상을 열 수 없습니다.')
+                info = MediaInfo(VIDEO, int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                 int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                                 max(1, int(capture.get(cv2.CAP_PROP_FRAME_COUNT))), 'MP4')
+            finally:
+                capture.release()
+    else:
+        try:
+            with _open_image(source) as image:
+                if not getattr(image, 'is_animated', False):
+                    return None
+                info = MediaInfo(ANIMATION, image.width, image.height, image.n_frames, image.format)
+        except Image.DecompressionBombError as e:
+            raise ImageTooLarge(str(e))
+        except Image.UnidentifiedImageError:
+            return None
+
+    if max_pixels and info.width * info.height > max_pixels:
+        raise ImageTooLarge(f'프레임이 너무 큽니다 ({info.width}x{info.height}, '
+                            f'최대 {max_pixels:,} 픽셀).')
+    max_frames = animation_config().get('MAX_FRAMES')
+    if max_frames and info.frames > max_frames:
+        raise ImageTooLarge(f'프레임이 너무 많습니다 ({info.frames}개, 최대 {max_frames}개).')
+    return info
+
+
+def iter_frames(source, info: MediaInfo) -> Iterator[Tuple[np.ndarray, float]]:
+    """(BGR 프레임, 표시 시간 ms)를 한 장씩 디코딩 (MAX_FRAMES개까지)"""
+    max_frames = animation_config().get('MAX_FRAMES') or None
+    if info.kind == VIDEO:
+        with local_path(source, '.mp4') as path:
+            capture = cv2.VideoCapture(path)
+            try:
+                duration = 1000.0 / (capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS)
+                count = 0
+                while max_frames is None or count < max_frames:
+                    ok, frame = capture.read()
+                    if not ok:
+                        break
+                    count += 1
+                    yield frame, duration
+            finally:
+                capture.release()
+        return
+
+    with _open_image(source) as image:
+        for index, frame in enumerate(ImageSequence.Iterator(image)):
+            if max_frames is not None and index >= max_frames:
+                break
+            rgb = np.asarray(frame.convert('RGB'))
+            yield (cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR),
+                   frame.info.get('duration') or DEFAULT_DURATION)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_frame_executor() -> ThreadPoolExecutor:
+    """프레임 변환용 공용 스레드 풀 (OpenCV 연산은 GIL을 놓으므로 스레드로 여러 코어를 씀)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=animation_config().get('WORKERS', 2),
+                                               thread_name_prefix='converter-frames')
+    return _executor
+
+
+def map_frames(fn: Callable[[np.ndarray, float], Any], frames: Iterable[Tuple[np.ndarray, float]],
+               in_flight: int = 4, executor: Optional[ThreadPoolExecutor] = None) -> Iterator[Any]:
+    """
+    frames의 각 (프레임, 표시 시간)에 fn을 풀에서 적용하고 결과를 원래 순서대로 반환
+    풀에 넣고 아직 꺼내 가지 않은 프레임이 in_flight개가 되면 가장 앞 프레임이 끝날 때까지
+    다음 프레임을 디코딩하지 않는다. 제너레이터가 중간에 닫히면 시작하지 않은 프레임은 취소한다.
+    """
+    executor = executor or get_frame_executor()
+    pending = deque()
+    try:
+        for frame, duration in frames:
+            pending.append(executor.submit(fn, frame, duration))
+            if len(pending) >= max(1, in_flight):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def gif_frame(image: np.ndarray) -> Image.Image:
+    """BGR(또는 그레이스케일) 결과를 프레임별 적응형 256색 팔레트 이미지로"""
+    code = cv2.COLOR_GRAY2RGB if image.ndim == 2 else cv2.COLOR_BGR2RGB
+    return Image.fromarray(cv2.cvtColor(image, code)).quantize(256)
+
+
+def _split_gif(data: bytes) -> Tuple[bytes, bytes, List[Tuple[int, bytes]]]:
+    """
+    GIF89a 파일을 (헤더 + 논리 화면 기술자, 전역 색상표, 블록 목록)으로 나눔 (GIF89a 명세 기준)
+    블록은 (종류, 바이트) - 종류는 확장 레이블(0xF9, 0xFF 등) 또는 이미지(0x2C), 끝(0x3B)은 뺌
+    """
+    flags = data[10]
+    end = 13 + (3 << ((flags & 7) + 1) if flags & 0x80 else 0)
+    head, color_table = data[:13], data[13:end]
+    blocks, pos = [], end
+    while data[pos] != 0x3B:
+        start = pos
+        if data[pos] == 0x21:
+            kind, pos = data[pos + 1], pos + 2
+        else:
+            # 이미지 기술자 (10바이트) + 로컬 색상표 + LZW 최소 코드 크기
+            kind, image_flags = 0x2C, data[pos + 9]
+            pos += 10 + (3 << ((image_flags & 7) + 1) if image_flags & 0x80 else 0) + 1
+        while data[pos]:
+            pos += data[pos] + 1
+        pos += 1
+        blocks.append((kind, data[start:pos]))
+    return head, color_table, blocks
+
+
+class GifWriter:
+    """
+    GIF를 chunk장씩 이어 쓰는 인코더
+    모은 프레임을 PIL Image.save(save_all=True)로 한 GIF로 인코딩한 뒤, 두 번째 묶음부터는
+    헤더와 애플리케이션 확장(반복 횟수)을 떼고 프레임 블록만 이어 쓴다. 그 묶음의 전역 색상표를
+    쓰던 프레임에는 같은 색상표를 로컬 색상표로 붙이므로 묶음끼리 팔레트가 달라도 된다.
+    """
+
+    def __init__(self, fp: IO[bytes], loop: int = 0, chunk: int = GIF_CHUNK):
+        self.fp = fp
+        self.loop = loop
+        self.chunk = max(1, chunk)
+        self.frames = 0
+        self._pending: List[Tuple[Image.Image, float]] = []
+        self._started = False
+
+    def write(self, frame: Image.Image, duration: float) -> None:
+        """팔레트 이미지 한 장 추가 (chunk장이 모이면 인코딩해서 씀)"""
+        self._pending.append((frame, duration))
+        if len(self._pending) >= self.chunk:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        images = [frame for frame, _ in self._pending]
+        buffer = io.BytesIO()
+        images[0].save(buffer, 'GIF', save_all=True, append_images=images[1:], loop=self.loop,
+                       duration=[round(duration) for _, duration in self._pending])
+        self._pending = []
+        head, color_table, blocks = _split_gif(buffer.getvalue())
+        if not self._started:
+            self.fp.write(head + color_table)
+            self._started = True
+            local_table = None
+        else:
+            # 전역 색상표 크기 비트를 로컬 색상표 플래그와 함께 옮김
+            local_table = (0x80 | (head[10] & 7), color_table) if color_table else None
+        for kind, block in blocks:
+            if local_table is not None:
+                if kind in (0xFF, 0xFE):
+                    continue
+                if kind == 0x2C and not block[9] & 0x80:
+                    block = block[:9] + bytes([block[9] & 0x40 | local_table[0]]) + \
+                        local_table[1] + block[10:]
+            if kind == 0x2C:
+                self.frames += 1
+            self.fp.write(block)
+
+    def close(self) -> None:
+        self._flush()
+        self.fp.write(b';')
+
+
+@dataclass
+class ConvertedMedia:
+    """변환 결과 (처음 위치로 되감은 임시 파일 - 닫으면 지워짐)"""
+    file: IO[bytes]
+    content_type: str
+    extension: str
+    frames: int
+
+
+def _write_gif(frames, process, in_flight: int) -> Tuple[IO[bytes], int]:
+    def convert(frame, duration):
+        return gif_frame(process(frame)), duration
+
+    output = tempfile.TemporaryFile()
+    try:
+        writer = GifWriter(output)
+        count = 0
+        for result, duration in map_frames(convert, frames, in_flight):
+            writer.write(result, duration)
+            count += 1
+        if count == 0:
+            raise ValueError('디코딩할 수 있는 프레임이 없습니다.')
+        writer.close()
+    except BaseException:
+        output.close()
+        raise
+    return output, writer.frames
+
+
+@lru_cache(maxsize=None)
+def can_encode_video(fourcc: str) -> bool:
+    """설치된 OpenCV가 fourcc 코덱으로 MP4를 쓸 수 있는지 (작은 파일에 한 프레임 써 봄)"""
+    fd, path = tempfile.mkstemp(suffix='.mp4')
+    os.close(fd)
+    try:
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), DEFAULT_FPS, (64, 48))
+        if not writer.isOpened():
+            return False
+        writer.write(np.zeros((48, 64, 3), np.uint8))
+        writer.release()
+        return os.path.getsize(path) > 0
+    finally:
+        os.unlink(path)
+
+
+def _write_video(frames, process, in_flight: int,
+                 fourcc: str = VIDEO_FOURCC) -> Tuple[IO[bytes], int]:
+    def convert(frame, duration):
+        result = process(frame)
+        if result.ndim == 2:
+            result = cv2.cvtColor(result, cv2.COLOR_GRAY2BGR)
+        # H.264 (yuv420)는 짝수 크기만 인코딩하므로 홀수 변은 가장자리를 한 줄 늘림
+        pad_y, pad_x = result.shape[0] % 2, result.shape[1] % 2
+        if pad_y or pad_x:
+            result = cv2.copyMakeBorder(result, 0, pad_y, 0, pad_x, cv2.BORDER_REPLICATE)
+        return result, duration
+
+    # VideoWriter는 경로로만 쓸 수 있으므로 이름 있는 임시 파일에 쓰고, 다 쓴 뒤 열어 두고 지움
+    fd, path = tempfile.mkstemp(suffix='.mp4')
+    os.close(fd)
+    writer, count = None, 0
+    try:
+        for result, duration in map_frames(convert, frames, in_flight):
+            if writer is None:
+                writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc),
+                                         1000.0 / duration, (result.shape[1], result.shape[0]))
+                if not writer.isOpened():
+                    raise ValueError('MP4 인코더를 열 수 없습니다.')
+            writer.write(result)
+            count += 1
+        if writer is None:
+            raise ValueError('디코딩할 수 있는 프레임이 없습니다.')
+        writer.release()
+        writer = None
+        return open(path, 'rb'), count
+    finally:
+        if writer is not None:
+            writer.release()
+        os.unlink(path)
+
+
+def _charged(frames: Iterable[Tuple[np.ndarray, float]],
+             charge: Callable[[int], None]) -> Iterator[Tuple[np.ndarray, float]]:
+    for count, item in enumerate(frames, 1):
+        charge(count)
+        yield item
+
+
+def convert_media(source, info: MediaInfo, process: Callable[[np.ndarray], np.ndarray],
+                  timer=None, charge: Optional[Callable[[int], None]] = None) -> ConvertedMedia:
+    """
+    모든 프레임을 process로 변환해 움직이는 이미지는 GIF, 동영상은 MP4 임시 파일로 씀
+    (VIDEO_FOURCC 코덱으로 쓸 수 없는 OpenCV면 동영상도 GIF)
+    Args:
+        process: 프레임(BGR) -> 결과 이미지 (여러 스레드에서 동시에 부름)
+        timer: 디코딩부터 인코딩까지 겹쳐 도는 전체 시간을 'frames' 단계로 기록할 StageTimer
+        charge: 프레임을 디코딩할 때마다 지금까지의 프레임 수로 부름 - 예외를 내면 변환을 멈춤
+            (동영상의 프레임 수는 컨테이너가 알려 주는 값이라 실제로 디코딩한 만큼 비용을 매기는 데 씀)
+    Raises:
+        ValueError: 디코딩할 수 있는 프레임이 없음
+    """
+    config = animation_config()
+    in_flight = config.get('IN_FLIGHT', 4)
+    fourcc = config.get('VIDEO_FOURCC') or VIDEO_FOURCC
+    kind = info.kind
+    if kind == VIDEO and not can_encode_video(fourcc):
+        kind = ANIMATION
+    write = partial(_write_video, fourcc=fourcc) if kind == VIDEO else _write_gif
+    frames = iter_frames(source, info)
+    if charge is not None:
+        frames = _charged(frames, charge)
+    with timed(timer, 'frames'):
+        output, count = write(frames, process, in_flight)
+    output.seek(0)
+    content_type, extension = OUTPUT_TYPES[kind]
+    return ConvertedMedia(output, content_type, extension, count)
@@ -1,6 +1,37 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ConverterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'converter'
+
+    def ready(self):
+        # 첫 요청 때 import되던 뷰(DRF, 작업 큐, 배치 등)와 프로세서 공유 인스턴스를 미리 준비
+        # (gunicorn --preload면 마스터에서 한 번만 하고 워커들이 fork로 물려받음)
+        from . import views  # noqa: F401
+        from .processors import ProcessorFactory
+        ProcessorFactory.register_pipelines(getattr(settings, 'CONVERTER_PIPELINES', {}))
+        ProcessorFactory.preload()
+        
+        # 서버로 뜰 때만 (config/wsgi.py, config/asgi.py가 ON_READY를 켬 - manage.py 명령은 건너뜀)
+        # gunicorn.conf.py는 마스터 대신 워커마다 post_fork에서 실행하도록 ON_READY를 끔
+        config = getattr(settings, 'CONVERTER_WARMUP', {})
+        if config.get('ON_READY', False):
+            # 워커당 OpenCV 스레드 수 (워커 여러 개가 각자 모든 코어를 쓰지 않도록)
+            from .concurrency import apply_cv_threads, get_concurrency
+            apply_cv_threads(get_concurrency()['CV_THREADS'])
+            # 첫 요청이 OpenCV 초기화 비용을 치르지 않도록 작은 이미지로 한 번씩 실행
+            run_warm_up(config.get('SIZE', 64))
+
+
+def run_warm_up(size: int = 64):
+    """워밍업 실행 후 걸린 시간을 metrics/의 'warmup' 항목으로 기록"""
+    from .metrics import STAGE_SECONDS, size_bucket
+    from .warmup import warm_up
+
+    timings = warm_up(size=size)
+    for name, seconds in timings.items():
+        stage, _, style = name.rpartition(':')
+        STAGE_SECONDS.observe(seconds, 'warmup', stage or 'process', style, size_bucket(size * size))
+    return timings
@@ -0,0 +1,129 @@
+# converter/async_views.py
+"""
+ASGI용 비동기 변환 엔드포인트 (async/)
+
+DRF 뷰셋은 동기 뷰라서 요청 하나가 변환이 끝날 때까지 워커(스레드)를 잡고 있다.
+여기서는 파일 읽기와 디코딩은 스레드 풀에, 변환과 인코딩은 공유 메모리를 쓰는
+프로세스 풀(converter/offload.py)에 맡기고 이벤트 루프는 기다리기만 하므로
+워커 하나가 많은 연결을 동시에 받을 수 있다.
+    uvicorn config.asgi:application
+    gunicorn config.asgi:application -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker
+WSGI로 실행해도 동작하지만 요청마다 스레드를 점유하므로 이점이 없다.
+
+결과는 항상 바이너리 이미지 (format 미지정 시 스타일별 기본 포맷)
+"""
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotAllowed, JsonResponse
+
+from .admission import Overloaded, get_admission, retry_after_header
+from .cache import get_result_cache, make_cache_key
+from .cost import budget_factor, estimate_cost
+from .decoding import ImageTooLarge
+from .encoding import AUTO_FORMAT, parse_format, resolve_options
+from .image_store import ImageNotFound
+from .jobs import QueueFull
+from .metrics import StageTimer
+from .offload import get_offloader
+from .processors import ProcessorFactory
+from .views import SourceImage, image_response, parse_params
+
+
+def json_error(message: str, status: int) -> JsonResponse:
+    return JsonResponse({'error': message}, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+def busy_response(error: QueueFull) -> JsonResponse:
+    response = json_error(str(error), status=429)
+    response['Retry-After'] = str(getattr(settings, 'CONVERTER_OFFLOAD', {}).get('RETRY_AFTER', 1))
+    return response
+
+
+def error_response(error: Exception) -> JsonResponse:
+    """예외를 동기 뷰와 같은 상태 코드의 JSON 응답으로"""
+    if isinstance(error, QueueFull):
+        return busy_response(error)
+    if isinstance(error, Overloaded):
+        response = json_error(str(error), status=503)
+        response['Retry-After'] = retry_after_header(error)
+        return response
+    if isinstance(error, ImageNotFound):
+        return json_error(str(error), status=404)
+    if isinstance(error, ImageTooLarge):
+        return json_error(str(error), status=413)
+    if isinstance(error, ValueError):
+        return json_error(str(error), status=400)
+    return json_error(f'이미지 처리 중 오류 발생: {str(error)}', status=500)
+
+
+def prepare(request, timer: StageTimer) -> SimpleNamespace:
+    """
+    스레드 풀에서 실행: 폼 파싱, 캐시 조회, 입장 제어, 디코딩
+    캐시에 결과가 있으면 image 없이 cached만 채워서 반환
+    """
+    data = {**request.POST.dict(), **request.FILES.dict()}
+    if 'image' not in data and 'image_id' not in data:
+        raise ValueError('이미지 파일이 누락되었습니다.')
+    style = data.get('style', 'pencil_sketch')
+    params = ProcessorFactory.get_processor_class(style).clean_params(parse_params(data))
+    source = SourceImage(data, timer=timer)
+    timer.label(style=style, shape=source.shape)
+    cost = estimate_cost(style, source.shape, params)
+    budget_factor(cost)
+    encoder_options = resolve_options(
+        style, parse_format(data.get('format', AUTO_FORMAT)),
+        quality=data.get('quality'),
+        compression=data.get('compression')
+    )
+    task = SimpleNamespace(style=style, params=params, file_name=source.file_name,
+                           encoder_options=encoder_options, cache_key=None,
+                           cached=None, image=None)
+    result_cache = get_result_cache()
+    if result_cache is not None:
+        task.cache_key = make_cache_key(source.digest, style, params, encoder_options.cache_variant)
+        with timer.stage('cache'):
+            task.cached = result_cache.lookup(task.cache_key)
+        if task.cached is not None:
+            return task
+    # 동기 뷰와 같은 버킷 (스레드 풀에서 실행되므로 기다려도 이벤트 루프는 막히지 않음)
+    admission = get_admission()
+    if admission is not None:
+        with timer.stage('admission'):
+            admission.acquire(cost / 1000)
+    task.image = source.image
+    return task
+
+
+async def convert_image_async(request):
+    """업로드를 받아 프로세스 풀에서 변환 (풀이 가득 차면 디코딩하기 전에 429)"""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    offloader = get_offloader()
+    if offloader.full:
+        return busy_response(QueueFull(f'변환 작업이 가득 찼습니다 ({offloader.max_pending}개).'))
+
+    timer = StageTimer('convert_async')
+    try:
+        task = await sync_to_async(prepare, thread_sensitive=False)(request, timer)
+        cache_status = 'HIT' if task.cached is not None else None
+        encoded = task.cached
+        if encoded is None:
+            # 'process'는 풀 대기 + 변환 + 인코딩 (작업 프로세스에서 인코딩까지 끝냄)
+            with timer.stage('process'):
+                encoded = await offloader.run(task.image, task.style, task.params,
+                                              task.encoder_options)
+            if task.cache_key is not None:
+                get_result_cache().set(task.cache_key, encoded)
+                cache_status = 'MISS'
+    except Exception as e:
+        return error_response(e)
+
+    return timer.attach(image_response(task.file_name, task.style, task.params, encoded,
+                                       task.encoder_options, cache_status))
+
+
+# DRF 뷰셋과 같이 CSRF 검사 제외 (csrf_exempt 데코레이터는 Django 4.2에서 async 뷰를 동기 뷰로 감쌈)
+convert_image_async.csrf_exempt = True
@@ -0,0 +1,109 @@
+# converter/batch.py
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .concurrency import tiling_config
+from .encoding import EncoderOptions, encode_image
+from .processors import ImageFeatures, ProcessorFactory, render
+
+
+@dataclass
+class BatchItem:
+    """배치 요청의 (스타일, 파라미터) 한 쌍"""
+    index: int
+    style: str
+    params: Dict[str, Any]
+    encoder_options: Optional[EncoderOptions] = None
+    cache_key: Optional[str] = None
+
+
+def parse_batch_items(raw, max_items: int) -> List[BatchItem]:
+    """
+    styles 필드를 BatchItem 목록으로 변환
+    Args:
+        raw: JSON 문자열 또는 리스트 - ["mosaic", {"style": "cartoon", "params": {...}}, ...]
+    Raises:
+        ValueError: 형식이 잘못되었거나 모르는 스타일, 잘못된 파라미터, 개수 초과
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            raise ValueError('styles는 JSON 배열이어야 합니다.')
+    if not isinstance(raw, list) or not raw:
+        raise ValueError('styles는 비어 있지 않은 배열이어야 합니다.')
+    if len(raw) > max_items:
+        raise ValueError(f'한 번에 최대 {max_items}개 스타일까지 변환할 수 있습니다.')
+
+    items = []
+    for index, entry in enumerate(raw):
+        if isinstance(entry, str):
+            style, params = entry, {}
+        elif isinstance(entry, dict):
+            style, params = entry.get('style'), entry.get('params') or {}
+        else:
+            raise ValueError(f'styles[{index}]는 스타일 이름이나 객체여야 합니다.')
+        if not isinstance(params, dict):
+            raise ValueError(f'styles[{index}].params는 객체여야 합니다.')
+        processor_class = ProcessorFactory.get_processor_class(style)
+        try:
+            params = processor_class.clean_params(params)
+        except ValueError as e:
+            raise ValueError(f'styles[{index}]: {e}')
+        items.append(BatchItem(index, style, params))
+    return items
+
+
+def convert_item(image: np.ndarray, item: BatchItem, features: ImageFeatures) -> bytes:
+    processor = ProcessorFactory.get_processor(item.style)
+    result = render(processor, image, item.params, features=features,
+                    tiling=tiling_config())
+    return encode_image(result, item.encoder_options)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_batch_executor() -> ThreadPoolExecutor:
+    """
+    배치 변환용 공용 스레드 풀.
+    OpenCV 연산은 GIL을 놓기 때문에 스레드로도 여러 코어를 쓰고,
+    디코딩한 이미지를 복사 없이 모든 스타일이 공유한다.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'CONVERTER_BATCH', {}).get('WORKERS', 4)
+                _executor = ThreadPoolExecutor(max_workers=workers,
+                                               thread_name_prefix='converter-batch')
+    return _executor
+
+
+def run_batch(image: np.ndarray, items: List[BatchItem],
+              features: Optional[ImageFeatures] = None) -> Iterator[Tuple[BatchItem, Any]]:
+    """
+    모든 항목을 병렬로 변환하고 끝나는 순서대로 (항목, 인코딩 바이트 또는 예외) 반환.
+    그레이스케일, Sobel 등 중간 결과는 features로 모든 스타일이 공유한다.
+    제너레이터가 중간에 닫히면 (클라이언트 연결 끊김) 시작하지 않은 항목은 취소한다.
+    """
+    features = ImageFeatures.of(image, features)
+    executor = get_batch_executor()
+    futures = {executor.submit(convert_item, image, item, features): item for item in items}
+    try:
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result()
+            except Exception as e:
+                yield item, e
+    finally:
+        for future in futures:
+            future.cancel()
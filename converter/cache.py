@@ -0,0 +1,199 @@
+# converter/cache.py
+import hashlib
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .processors import ProcessorFactory
+
+
+def canonical_params(style: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """기본값을 채우고 범위/step에 맞춘 정규화된 파라미터 (같은 결과면 같은 키)"""
+    return ProcessorFactory.get_processor_class(style).clean_params(params)
+
+
+def file_digest(uploaded_file) -> str:
+    """업로드 파일의 해시 (청크 단위로 읽어서 전체를 메모리에 올리지 않음)"""
+    hasher = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def make_cache_key(digest: str, style: str, params: Dict[str, Any], variant: str = '') -> str:
+    """원본 업로드 해시 + 스타일 + 정규화된 파라미터 (+ 미리보기 등 변형)의 해시"""
+    hasher = hashlib.sha256(digest.encode('ascii'))
+    hasher.update(b'\0' + style.encode('utf-8') + b'\0' + variant.encode('utf-8') + b'\0')
+    hasher.update(json.dumps(canonical_params(style, params),
+                             sort_keys=True, default=str).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class ResultCache(ABC):
+    """인코딩된 변환 결과 캐시의 기본 클래스 (적중/실패 횟수 집계)"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[bytes]:
+        """캐시 조회 후 적중/실패 횟수를 갱신"""
+        value = self.get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'backend': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    @classmethod
+    @abstractmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ResultCache':
+        """settings.CONVERTER_RESULT_CACHE 딕셔너리로 생성"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class MemoryResultCache(ResultCache):
+    """프로세스 내 LRU 캐시 - 저장된 바이트 합계가 max_bytes를 넘으면 오래된 것부터 제거"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self._entries[key] = value
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'MemoryResultCache':
+        return cls(max_bytes=config.get('MAX_BYTES', 256 * 1024 * 1024))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+        })
+        return stats
+
+
+class DjangoResultCache(ResultCache):
+    """Django 캐시 프레임워크 백엔드 (FileBasedCache 등 settings.CACHES 별칭 사용)"""
+
+    def __init__(self, alias: str = 'default', timeout: Optional[int] = None):
+        super().__init__()
+        self.alias = alias
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'DjangoResultCache':
+        return cls(alias=config.get('CACHE_ALIAS', 'default'), timeout=config.get('TIMEOUT'))
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        stats = super().stats()
+        stats['alias'] = self.alias
+        return stats
+
+
+BACKENDS = {
+    'memory': MemoryResultCache,
+    'django': DjangoResultCache,
+}
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def create_result_cache(config: Dict[str, Any]) -> Optional[ResultCache]:
+    """설정 딕셔너리로 캐시 백엔드 생성 (BACKEND가 None이면 캐시 사용 안 함)"""
+    backend = config.get('BACKEND', 'memory')
+    if not backend:
+        return None
+    backend_class = BACKENDS.get(backend)
+    if backend_class is None:
+        raise ValueError(f"Unknown result cache backend: {backend}. Available: {list(BACKENDS.keys())}")
+    return backend_class.from_config(config)
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """settings.CONVERTER_RESULT_CACHE로 만든 프로세스 공용 캐시"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = create_result_cache(
+                    getattr(settings, 'CONVERTER_RESULT_CACHE', {})
+                ) or False
+    return _result_cache or None
+
+
+def reset_result_cache() -> None:
+    """설정 변경 후 캐시를 다시 만들도록 초기화 (테스트용)"""
+    global _result_cache
+    with _result_cache_lock:
+        _result_cache = None
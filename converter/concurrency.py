@@ -0,0 +1,149 @@
+# converter/concurrency.py
+"""
+워커 수 x OpenCV 스레드 수 동시성 설정
+
+gunicorn 워커마다 OpenCV가 모든 코어 크기의 스레드 풀을 쓰면 워커 N개가
+코어 수의 N배 스레드를 돌려 꼬리 지연이 나빠진다. 여기서는 워커당 스레드 수를
+정해 (워커 수 x 스레드 수 = 코어 수) 과다 구독을 막는다.
+
+자동 조정 ('auto'):
+    - 코어 4개 미만: 워커 = 코어 수, 스레드 1 (요청 여러 개를 동시에 처리하는 처리량 우선)
+    - 코어 4개 이상: 스레드 2, 워커 = 코어 수 // 2
+      (큰 이미지 한 장의 지연을 절반 가까이 줄이면서 전체 스레드 수는 코어 수 유지)
+요청 한 장 안의 병렬 처리는 PARALLEL_MIN_PIXELS 이상인 이미지를 타일로 나눠
+워커의 CV_THREADS개 스레드로 처리한다 (타일 처리를 지원하는 스타일만).
+
+코어 수는 처음 물어본 시점 (gunicorn이면 fork 전 마스터)의 값을 프로세스에 고정해 두고 쓴다.
+pin_worker로 워커를 코어 몇 개에 고정한 뒤 affinity로 다시 세면 값이 줄어 'auto'가
+다르게 풀리고 CV_THREADS, 작업 큐 몫, 입장 속도가 계산 시점마다 달라지기 때문이다.
+
+이 모듈은 Django 설정 없이 import할 수 있어야 한다 (gunicorn.conf.py에서 사용).
+"""
+import os
+from typing import Any, Dict, Optional
+
+import cv2
+
+AUTO = 'auto'
+
+# gunicorn이 워커 수를 알려 주는 환경 변수 (post_fork에서 기록)
+WEB_WORKERS_ENV = 'CONVERTER_WEB_WORKERS'
+
+_cpus = None
+
+
+def cpu_count() -> int:
+    """
+    이 프로세스가 쓸 수 있는 코어 수 (CPU affinity, 컨테이너 cpuset 반영)
+    처음 호출했을 때 센 값을 계속 돌려준다 - pin_worker로 코어를 고정한 뒤에도 같은 값
+    """
+    global _cpus
+    if _cpus is None:
+        if hasattr(os, 'sched_getaffinity'):
+            _cpus = len(os.sched_getaffinity(0))
+        else:
+            _cpus = os.cpu_count() or 1
+    return _cpus
+
+
+def reset_cpu_count() -> None:
+    """코어 수를 다시 세도록 초기화 (테스트용)"""
+    global _cpus
+    _cpus = None
+
+
+def auto_tune(cpus: Optional[int] = None) -> Dict[str, int]:
+    """코어 수로 워커 수와 워커당 OpenCV 스레드 수 결정"""
+    cpus = cpus or cpu_count()
+    threads = 1 if cpus < 4 else 2
+    return {'WORKERS': max(1, cpus // threads), 'CV_THREADS': threads}
+
+
+def _is_auto(value) -> bool:
+    return value in (AUTO, None, '')
+
+
+def resolve(config: Dict[str, Any], cpus: Optional[int] = None) -> Dict[str, Any]:
+    """
+    설정의 'auto' 값을 채운 동시성 설정
+    둘 다 'auto'면 auto_tune 결과, 한쪽만 정해져 있으면 다른 쪽은 워커 수 x 스레드 수가
+    코어 수가 되도록 맞춘다. 'CPUS'에는 계산에 쓴 코어 수를 담는다.
+    Args:
+        config: {'WORKERS': int | 'auto', 'CV_THREADS': int | 'auto',
+                 'PARALLEL_MIN_PIXELS': int, 'AFFINITY': bool}
+    """
+    cpus = cpus or cpu_count()
+    workers, threads = config.get('WORKERS', AUTO), config.get('CV_THREADS', AUTO)
+    resolved = dict(config)
+    if _is_auto(workers) and _is_auto(threads):
+        resolved.update(auto_tune(cpus))
+    elif _is_auto(threads):
+        resolved['WORKERS'] = int(workers)
+        resolved['CV_THREADS'] = max(1, cpus // max(1, int(workers)))
+    elif _is_auto(workers):
+        resolved['CV_THREADS'] = int(threads)
+        resolved['WORKERS'] = max(1, cpus // max(1, int(threads)))
+    else:
+        resolved['WORKERS'], resolved['CV_THREADS'] = int(workers), int(threads)
+    resolved['CPUS'] = cpus
+    resolved.setdefault('PARALLEL_MIN_PIXELS', 0)
+    resolved.setdefault('AFFINITY', False)
+    return resolved
+
+
+def get_concurrency() -> Dict[str, Any]:
+    """settings.CONVERTER_CONCURRENCY를 resolve한 결과"""
+    from django.conf import settings
+    return resolve(getattr(settings, 'CONVERTER_CONCURRENCY', {}))
+
+
+def web_workers() -> int:
+    """
+    이 서버의 웹 워커 프로세스 수 - gunicorn.conf.py의 post_fork가 기록한 값
+    기록이 없으면 (runserver, 단일 프로세스 ASGI 등) 1 - 서버 전체 한도를 이 프로세스가 모두 씀
+    """
+    return max(1, int(os.environ.get(WEB_WORKERS_ENV) or 1))
+
+
+def apply_cv_threads(threads: int) -> None:
+    """이 프로세스의 OpenCV 스레드 수 설정 (0이면 OpenCV 기본값 - 모든 코어)"""
+    cv2.setNumThreads(threads if threads > 0 else -1)
+
+
+def pin_worker(index: int, threads: int) -> Optional[set]:
+    """
+    워커 index번을 코어 threads개에 고정 (워커끼리 코어를 나눠 캐시 간섭과 이동을 줄임)
+    Returns:
+        고정한 코어 집합 (지원하지 않는 플랫폼이면 None)
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return None
+    # 고정 전에 코어 수를 세어 둬야 이후 get_concurrency()가 고정 전과 같은 값을 냄
+    cpu_count()
+    available = sorted(os.sched_getaffinity(0))
+    start = (index * threads) % len(available)
+    cores = {available[(start + i) % len(available)] for i in range(max(1, threads))}
+    os.sched_setaffinity(0, cores)
+    return cores
+
+
+def tiling_config(tiling: Optional[Dict[str, Any]] = None,
+                  concurrency: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    타일 처리 설정에 요청 내 병렬 처리를 반영 (인자가 없으면 Django 설정 사용)
+    PARALLEL_MIN_PIXELS 이상인 이미지는 메모리 기준(MIN_PIXELS) 미만이어도 타일로 나눠
+    CV_THREADS개 스레드로 처리한다.
+    """
+    if tiling is None:
+        from django.conf import settings
+        tiling = getattr(settings, 'CONVERTER_TILING', None)
+    if concurrency is None:
+        concurrency = get_concurrency()
+    parallel_min = concurrency.get('PARALLEL_MIN_PIXELS') or 0
+    threads = concurrency.get('CV_THREADS') or 1
+    if parallel_min <= 0 or threads <= 1:
+        return tiling
+    tiling = dict(tiling or {})
+    tiling['MIN_PIXELS'] = min(tiling.get('MIN_PIXELS', parallel_min), parallel_min)
+    tiling['WORKERS'] = max(tiling.get('WORKERS', 1), threads)
+    return tiling
@@ -0,0 +1,50 @@
+# converter/cost.py
+"""
+요청별 예상 처리 비용과 예산 검사
+
+비용은 스타일별 비용 모델(get_cost: 1메가픽셀당 ms)에 입력 픽셀 수를 곱한 예상 처리 시간이다.
+모델은 기준 장비에서 맞춘 값이라, 배포 장비의 벤치마크로 만든 스타일별 보정 배율을 곱해 쓴다.
+디코딩 전에 헤더의 크기만으로 계산하므로, 워커를 몇 분씩 잡아 둘 요청을 디코딩도 하기 전에 거절한다.
+예산(settings.CONVERTER_COST['MAX_COST'])을 넘으면 CostTooHigh(413)로 거절하거나,
+ON_EXCEED가 'downscale'이고 호출하는 쪽이 줄여서 변환할 수 있으면 예산에 맞는 축소 배율을 돌려준다.
+"""
+import math
+from typing import Any, Dict, Tuple
+
+from django.conf import settings
+
+from .decoding import ImageTooLarge
+from .processors import ProcessorFactory
+
+
+class CostTooHigh(ImageTooLarge):
+    """예상 처리 시간이 예산을 넘는 요청"""
+
+
+def cost_config() -> Dict[str, Any]:
+    return getattr(settings, 'CONVERTER_COST', {})
+
+
+def estimate_cost(style: str, shape: Tuple[int, int], params: Dict[str, Any]) -> float:
+    """
+    (높이, 너비) 이미지를 style, params로 변환하는 예상 시간 (ms)
+    CALIBRATION에 스타일별 보정 배율(benchmarks/processors.py --calibrate 결과)이 있으면 곱함
+    """
+    estimate = ProcessorFactory.get_processor_class(style).estimate_cost(shape, params)
+    return estimate * cost_config().get('CALIBRATION', {}).get(style, 1.0)
+
+
+def budget_factor(cost: float, allow_downscale: bool = False) -> float:
+    """
+    예상 비용이 예산 안에 들도록 긴 변에 곱할 축소 배율 (예산 안이면 1.0)
+    비용은 픽셀 수에 비례하므로 배율은 sqrt(예산 / 비용)
+    Raises:
+        CostTooHigh: 예산을 넘고 줄여서 변환할 수 없음 (ON_EXCEED가 'reject'이거나 allow_downscale=False)
+    """
+    budget = cost_config().get('MAX_COST')
+    if not budget or cost <= budget:
+        return 1.0
+    if allow_downscale and cost_config().get('ON_EXCEED') == 'downscale':
+        return math.sqrt(budget / cost)
+    raise CostTooHigh(f'예상 처리 시간이 너무 깁니다 ({cost / 1000:.1f}초, '
+                      f'최대 {budget / 1000:.1f}초). 이미지나 파라미터를 줄여 주세요.')
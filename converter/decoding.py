@@ -0,0 +1,118 @@
+# converter/decoding.py
+import io
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# JPEG DCT 축소 배율별 OpenCV 플래그 (디코딩하면서 1/2, 1/4, 1/8로 줄임)
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# 디코딩 중에 축소할 수 있는 포맷 (그 외 포맷은 전체를 디코딩한 뒤 줄여야 함)
+REDUCIBLE_FORMATS = {'JPEG'}
+
+
+class ImageTooLarge(Exception):
+    """픽셀 수가 허용치를 넘는 이미지 (디코딩 전에 거절)"""
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """헤더만 읽어서 얻은 이미지 정보"""
+    width: int
+    height: int
+    format: Optional[str]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+
+def _file_path(source) -> Optional[str]:
+    """디스크에 임시 파일로 받은 업로드면 그 경로 (TemporaryUploadedFile)"""
+    temporary_file_path = getattr(source, 'temporary_file_path', None)
+    return temporary_file_path() if temporary_file_path else None
+
+
+def _read_bytes(source) -> bytes:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    source.seek(0)
+    return source.read()
+
+
+def probe_image(source, max_pixels: Optional[int] = None) -> ImageInfo:
+    """
+    헤더만 읽어 크기와 포맷 확인 (픽셀은 디코딩하지 않음)
+    Args:
+        source: 업로드 파일 또는 바이트
+        max_pixels: 넘으면 ImageTooLarge
+    Raises:
+        ImageTooLarge: 픽셀 수가 max_pixels를 넘음
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        fp = io.BytesIO(source)
+    else:
+        source.seek(0)
+        fp = source
+    try:
+        with Image.open(fp) as image:
+            info = ImageInfo(image.width, image.height, image.format)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e))
+    if max_pixels and info.width * info.height > max_pixels:
+        raise ImageTooLarge(f'이미지가 너무 큽니다 ({info.width}x{info.height}, '
+                            f'최대 {max_pixels:,} 픽셀).')
+    return info
+
+
+def reduction_factor(info: ImageInfo, max_edge: Optional[int]) -> int:
+    """긴 변이 max_edge 이상으로 남는 가장 큰 디코딩 축소 배율 (1, 2, 4, 8)"""
+    if not max_edge or info.format not in REDUCIBLE_FORMATS:
+        return 1
+    long_edge = max(info.width, info.height)
+    for factor in (8, 4, 2):
+        if long_edge // factor >= max_edge:
+            return factor
+    return 1
+
+
+def decode_image(source: Union[bytes, object], max_edge: Optional[int] = None,
+                 max_pixels: Optional[int] = None, info: Optional[ImageInfo] = None) -> np.ndarray:
+    """
+    업로드 파일(또는 바이트)을 OpenCV 형식(BGR) 이미지로 디코딩
+
+    임시 파일로 받은 업로드는 파이썬으로 읽지 않고 OpenCV가 파일에서 바로 BGR로 디코딩한다.
+    max_edge를 주면 JPEG은 DCT 단계에서 긴 변이 max_edge 이상인 범위까지 줄여서 디코딩한다.
+    OpenCV가 못 읽는 포맷(GIF 등)은 PIL로 디코딩한다. EXIF 방향은 기존처럼 무시한다.
+    Args:
+        max_edge: 필요한 긴 변 길이 (결과는 이보다 클 수 있음 - 정확한 크기는 호출하는 쪽에서 조정)
+        max_pixels: 넘으면 디코딩 전에 ImageTooLarge
+        info: probe_image 결과 (없으면 헤더를 읽음)
+    """
+    if info is None:
+        info = probe_image(source, max_pixels)
+    factor = reduction_factor(info, max_edge)
+    flags = REDUCED_FLAGS[factor] | cv2.IMREAD_IGNORE_ORIENTATION
+
+    path = _file_path(source)
+    if path is not None:
+        image = cv2.imread(path, flags)
+    else:
+        image = cv2.imdecode(np.frombuffer(_read_bytes(source), np.uint8), flags)
+    if image is not None:
+        return image
+
+    # OpenCV가 지원하지 않는 포맷
+    with Image.open(path or io.BytesIO(_read_bytes(source))) as pil_image:
+        if factor > 1:
+            pil_image.draft('RGB', (info.width // factor, info.height // factor))
+        rgb = np.asarray(pil_image.convert('RGB'))
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
@@ -0,0 +1,157 @@
+# converter/encoding.py
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+# 출력 포맷별 확장자, Content-Type, 압축 옵션 (level = PNG 압축 레벨 또는 JPEG/WebP 품질)
+FORMATS = {
+    'png': {
+        'extension': '.png', 'content_type': 'image/png',
+        'level': 'compression', 'flag': cv2.IMWRITE_PNG_COMPRESSION, 'min': 0, 'max': 9,
+    },
+    'webp': {
+        # 품질 101 이상은 무손실 WebP
+        'extension': '.webp', 'content_type': 'image/webp',
+        'level': 'quality', 'flag': cv2.IMWRITE_WEBP_QUALITY, 'min': 1, 'max': 101,
+    },
+    'jpeg': {
+        'extension': '.jpg', 'content_type': 'image/jpeg',
+        'level': 'quality', 'flag': cv2.IMWRITE_JPEG_QUALITY, 'min': 1, 'max': 100,
+    },
+}
+
+FORMAT_ALIASES = {
+    'jpg': 'jpeg',
+}
+
+# 스타일별 기본 포맷을 쓰라는 뜻의 format 값
+AUTO_FORMAT = 'auto'
+
+# 이미지보다 선호하면 기존 JSON 응답을 유지할 타입
+JSON_MEDIA_TYPES = ('application/json', 'text/html')
+
+
+def parse_format(name: str) -> str:
+    """요청의 format 값을 정규화된 포맷 이름으로 변환 ('auto'는 그대로)"""
+    fmt = str(name).strip().lower()
+    fmt = FORMAT_ALIASES.get(fmt, fmt)
+    if fmt != AUTO_FORMAT and fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {name}. Available: {list(FORMATS.keys())}")
+    return fmt
+
+
+def format_from_accept(accept: str) -> Optional[str]:
+    """
+    Accept 헤더에서 가장 선호하는 이미지 포맷 선택
+    Returns:
+        지원하는 이미지 타입이 없거나 JSON/HTML을 더 선호하면 None,
+        'image/*'만 있으면 'auto' (스타일별 기본 포맷)
+    """
+    candidates = []
+    for index, part in enumerate(accept.split(',')):
+        media_type, *options = [token.strip() for token in part.split(';')]
+        q = 1.0
+        for option in options:
+            key, _, value = option.partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type == 'image/*':
+            fmt = AUTO_FORMAT
+        else:
+            fmt = next((name for name, spec in FORMATS.items()
+                        if spec['content_type'] == media_type), None)
+        if (fmt is not None or media_type in JSON_MEDIA_TYPES) and q > 0:
+            # q가 같으면 구체적인 타입이 image/*보다, 먼저 나온 타입이 나중 것보다 우선
+            candidates.append((q, media_type != 'image/*', -index, fmt))
+    return max(candidates)[3] if candidates else None
+
+
+@dataclass(frozen=True)
+class EncoderOptions:
+    """출력 포맷과 압축 레벨 (PNG 압축 레벨 또는 JPEG/WebP 품질)"""
+    format: str
+    level: int
+
+    @property
+    def content_type(self) -> str:
+        return FORMATS[self.format]['content_type']
+
+    @property
+    def extension(self) -> str:
+        return FORMATS[self.format]['extension']
+
+    @property
+    def cache_variant(self) -> str:
+        return f'{self.format}:{self.level}'
+
+
+def encoder_config() -> dict:
+    return getattr(settings, 'CONVERTER_ENCODER', {})
+
+
+def resolve_options(style: str, fmt: Optional[str] = None, quality=None,
+                    compression=None) -> EncoderOptions:
+    """
+    요청 값과 스타일별 기본값으로 인코딩 옵션 결정
+    Args:
+        fmt: 포맷 이름, None이나 'auto'면 CONVERTER_ENCODER['STYLE_FORMATS'][style]
+        quality: JPEG/WebP 품질 (없으면 포맷 기본값)
+        compression: PNG 압축 레벨 (없으면 포맷 기본값)
+    """
+    config = encoder_config()
+    if fmt is None or fmt == AUTO_FORMAT:
+        fmt = config.get('STYLE_FORMATS', {}).get(style, 'png')
+    fmt = parse_format(fmt)
+    spec = FORMATS[fmt]
+    
+    level = compression if spec['level'] == 'compression' else quality
+    if level is None or level == '':
+        level = config.get('LEVELS', {}).get(fmt, DEFAULT_LEVELS[fmt])
+    try:
+        level = int(level)
+    except (TypeError, ValueError):
+        raise ValueError(f"{spec['level']} must be an integer")
+    if not spec['min'] <= level <= spec['max']:
+        raise ValueError(f"{fmt} {spec['level']} must be between {spec['min']} and {spec['max']}")
+    return EncoderOptions(fmt, level)
+
+
+# CONVERTER_ENCODER['LEVELS']가 없을 때의 기본 레벨 (benchmarks/encoding.py 측정 기준)
+DEFAULT_LEVELS = {
+    'png': 1,
+    'webp': 90,
+    'jpeg': 90,
+}
+
+# 기존 JSON(base64) 응답의 PNG 압축 레벨 (CONVERTER_ENCODER['JSON_PNG_LEVEL']가 없을 때)
+# 바이너리 기본값(LEVELS['png'])을 바꿔도 기존 JSON 응답 크기는 그대로 유지
+JSON_PNG_LEVEL = 3
+
+
+def json_options(compression=None) -> EncoderOptions:
+    """기존 JSON(base64) 응답용 인코딩 옵션 (항상 PNG, compression이 없으면 JSON_PNG_LEVEL)"""
+    if compression is None or compression == '':
+        compression = encoder_config().get('JSON_PNG_LEVEL', JSON_PNG_LEVEL)
+    return resolve_options(None, 'png', compression=compression)
+
+
+def encode_image(image: np.ndarray, options=None) -> bytes:
+    """
+    BGR 이미지를 인코딩
+    Args:
+        options: EncoderOptions 또는 포맷 이름 (포맷 기본 레벨 사용)
+    """
+    if options is None or isinstance(options, str):
+        fmt = parse_format(options or 'png')
+        options = EncoderOptions(fmt, DEFAULT_LEVELS[fmt])
+    spec = FORMATS[options.format]
+    ok, buffer = cv2.imencode(spec['extension'], image, [spec['flag'], options.level])
+    if not ok:
+        raise ValueError(f'{options.format} 인코딩에 실패했습니다.')
+    return buffer.tobytes()
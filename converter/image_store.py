@@ -0,0 +1,240 @@
+# converter/image_store.py
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+from .decoding import decode_image
+from .processors import ImageFeatures
+
+
+class ImageNotFound(Exception):
+    """image_id에 해당하는 이미지가 없거나 만료됨"""
+
+
+@dataclass
+class StoredImage:
+    """디코딩이 끝난 업로드 이미지 (BGR, 읽기 전용)와 재변환에 공유할 중간 결과"""
+    image: np.ndarray
+    digest: str
+    file_name: str
+    expires_at: float
+    features: ImageFeatures
+    # 원본이 shared에도 있는지 (있으면 shared의 원본이 지워지는 순간 이 항목도 무효)
+    shared: bool = False
+    shared_expires_at: float = 0.0
+
+    @property
+    def nbytes(self) -> int:
+        # 중간 결과는 features.max_bytes까지 늘어날 수 있으므로 그만큼 미리 잡아 둠
+        return self.image.nbytes + (self.features.max_bytes or 0)
+
+
+class DecodedImageStore:
+    """
+    디코딩된 이미지를 핸들로 보관하는 저장소.
+
+    슬라이더를 움직일 때마다 원본을 다시 업로드/디코딩하지 않도록
+    한 번 디코딩한 BGR 배열을 보관한다. 전체 크기가 max_bytes를 넘으면
+    가장 오래 쓰지 않은 이미지부터, ttl초 동안 쓰지 않은 이미지는 만료로 제거한다.
+
+    alias(Django 캐시 별칭)를 주면 원본 업로드 바이트도 image_id로 그 캐시(shared)에 넣어 둔다.
+    gunicorn 워커가 여러 개면 업로드를 받은 워커와 재변환 요청을 받는 워커가 다를 수 있는데,
+    이 프로세스에 없는 image_id는 shared에서 원본을 꺼내 다시 디코딩해 이어서 보관한다.
+    shared의 원본이 곧 image_id의 유효 여부라, 다른 워커가 delete한 이미지는 이 프로세스에
+    디코딩 결과가 남아 있어도 찾을 수 없다.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, ttl: float = 600,
+                 feature_ratio: float = 2.0, alias: Optional[str] = None,
+                 prefix: str = 'converter:image:'):
+        """
+        Args:
+            feature_ratio: 이미지마다 보관할 중간 결과 크기 (원본 크기의 배수)
+            alias: 워커끼리 공유하는 settings.CACHES 별칭 (FileBasedCache 등, 없으면 이 프로세스만)
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.feature_ratio = feature_ratio
+        self.alias = alias
+        self.prefix = prefix
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def put(self, image: np.ndarray, digest: str, file_name: str = '',
+            source: Optional[bytes] = None) -> Optional[str]:
+        """
+        이미지를 저장하고 핸들 반환 (max_bytes보다 크면 저장하지 않고 None)
+        Args:
+            source: 원본 업로드 바이트 - shared가 있으면 다른 워커가 디코딩할 수 있게 넣어 둠
+        """
+        image_id = secrets.token_urlsafe(16)
+        shared = self.shared is not None and source is not None
+        entry = self._insert(image_id, image, digest, file_name, shared)
+        if entry is None:
+            return None
+        if shared:
+            self.shared.set(self.prefix + image_id,
+                            {'data': bytes(source), 'digest': digest, 'file_name': file_name},
+                            self.ttl)
+            entry.shared_expires_at = time.monotonic() + self.ttl
+        return image_id
+
+    def put_source(self, source: bytes, digest: str, file_name: str = '',
+                   shape=None) -> Optional[str]:
+        """
+        디코딩하지 않고 원본 업로드 바이트만 shared에 넣고 핸들 반환 (디코딩은 처음 get할 때)
+        shared가 없거나 디코딩한 크기(shape 기준)가 max_bytes보다 크면 None
+        """
+        if self.shared is None:
+            return None
+        if shape is not None and shape[0] * shape[1] * 3 * (1 + self.feature_ratio) > self.max_bytes:
+            return None
+        image_id = secrets.token_urlsafe(16)
+        self.shared.set(self.prefix + image_id,
+                        {'data': bytes(source), 'digest': digest, 'file_name': file_name},
+                        self.ttl)
+        return image_id
+
+    def get(self, image_id: str) -> Optional[StoredImage]:
+        """핸들로 이미지 조회 (조회할 때마다 만료 시간 연장)"""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(image_id)
+            if entry is not None:
+                self._entries.move_to_end(image_id)
+                entry.expires_at = time.monotonic() + self.ttl
+        if entry is None:
+            return self._load_shared(image_id)
+        if not self._touch_shared(image_id, entry):
+            # 다른 워커가 지웠거나 shared에서 만료됨 - 이 프로세스의 디코딩 결과도 버림
+            self._discard(image_id)
+            return None
+        return entry
+
+    def delete(self, image_id: str) -> bool:
+        entry = self._discard(image_id)
+        shared = self.shared is not None and self.shared.delete(self.prefix + image_id)
+        return entry is not None or bool(shared)
+
+    def _discard(self, image_id: str) -> Optional[StoredImage]:
+        with self._lock:
+            entry = self._entries.pop(image_id, None)
+            if entry is not None:
+                self.current_bytes -= entry.nbytes
+        return entry
+
+    def _insert(self, image_id: str, image: np.ndarray, digest: str, file_name: str,
+                shared: bool = False) -> Optional[StoredImage]:
+        # 호출한 쪽의 배열 플래그는 그대로 두고 읽기 전용 뷰를 보관
+        image = image.view()
+        image.setflags(write=False)
+        features = ImageFeatures(image, max_bytes=int(image.nbytes * self.feature_ratio))
+        entry = StoredImage(image, digest, file_name, time.monotonic() + self.ttl, features, shared)
+        if entry.nbytes > self.max_bytes:
+            return None
+        with self._lock:
+            self._expire()
+            # 같은 image_id를 두 요청이 동시에 shared에서 불러왔으면 나중 것으로 교체
+            replaced = self._entries.pop(image_id, None)
+            if replaced is not None:
+                self.current_bytes -= replaced.nbytes
+            self._entries[image_id] = entry
+            self.current_bytes += entry.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+        return entry
+
+    def _load_shared(self, image_id: str) -> Optional[StoredImage]:
+        """다른 워커가 넣어 둔 원본을 디코딩해 이 프로세스에도 보관"""
+        if self.shared is None:
+            return None
+        stored = self.shared.get(self.prefix + image_id)
+        if stored is None:
+            return None
+        image = decode_image(stored['data'])
+        entry = self._insert(image_id, image, stored['digest'], stored['file_name'], shared=True)
+        if entry is not None and not self._touch_shared(image_id, entry):
+            self._discard(image_id)
+            return None
+        return entry
+
+    def _touch_shared(self, image_id: str, entry: StoredImage) -> bool:
+        """
+        shared의 원본이 남아 있는지 확인하고 만료 시간 연장 (없으면 False)
+        원본을 다시 쓰는 캐시도 있으므로 (FileBasedCache) 남은 시간이 절반 아래일 때만 연장
+        """
+        shared = self.shared
+        if shared is None or not entry.shared:
+            return True
+        key = self.prefix + image_id
+        now = time.monotonic()
+        if entry.shared_expires_at - now >= self.ttl / 2:
+            return shared.has_key(key)
+        if not shared.touch(key, self.ttl):
+            return False
+        entry.shared_expires_at = now + self.ttl
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'ttl': self.ttl,
+            'shared': self.shared is not None,
+        }
+
+    def _expire(self):
+        # 접근 순서대로 정렬되어 있으므로 앞쪽의 만료된 항목만 제거하면 됨
+        now = time.monotonic()
+        while self._entries:
+            image_id, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[image_id]
+            self.current_bytes -= entry.nbytes
+
+
+_image_store = None
+_image_store_lock = threading.Lock()
+
+
+def get_image_store() -> DecodedImageStore:
+    """settings.CONVERTER_IMAGE_STORE로 만든 프로세스 공용 저장소 (CACHE_ALIAS가 있으면 원본 공유)"""
+    global _image_store
+    if _image_store is None:
+        with _image_store_lock:
+            if _image_store is None:
+                config = getattr(settings, 'CONVERTER_IMAGE_STORE', {})
+                _image_store = DecodedImageStore(
+                    max_bytes=config.get('MAX_BYTES', 512 * 1024 * 1024),
+                    ttl=config.get('TTL', 600),
+                    feature_ratio=config.get('FEATURE_RATIO', 2.0),
+                    alias=config.get('CACHE_ALIAS'),
+                )
+    return _image_store
+
+
+def reset_image_store() -> None:
+    """설정 변경 후 저장소를 다시 만들도록 초기화 (테스트용)"""
+    global _image_store
+    with _image_store_lock:
+        _image_store = None
@@ -0,0 +1,444 @@
+# converter/jobs.py
+import math
+import multiprocessing
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .cache import get_result_cache
+from .concurrency import apply_cv_threads, get_concurrency, tiling_config, web_workers
+from .encoding import EncoderOptions, encode_image
+from .processors import ProcessorFactory, render
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# 끝나지 않은 작업 기록의 보관 시간 - 작업을 맡은 웹 워커가 죽어 끝나지 못한 기록도 결국 지워지도록
+PENDING_TTL = 60 * 60
+
+# 다른 웹 워커가 맡은 작업을 롱 폴링할 때 저장소를 다시 읽는 간격 (초)
+POLL_INTERVAL = 0.2
+
+
+class QueueFull(Exception):
+    """대기 중인 작업이 max_pending에 도달해 새 작업을 받을 수 없음"""
+
+
+def run_job(image: np.ndarray, style: str, params: Dict[str, Any],
+            encoder_options: EncoderOptions, tiling: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    작업 프로세스에서 실행: 변환 후 인코딩한 바이트 반환
+    Args:
+        tiling: 타일 처리 설정 (작업 프로세스에서는 Django 설정을 읽지 않으므로 인자로 전달)
+    """
+    processor = ProcessorFactory.get_processor(style)
+    return encode_image(render(processor, image, params, tiling=tiling), encoder_options)
+
+
+def init_worker(cv_threads: int = 0, pipelines: Optional[Dict[str, Any]] = None) -> None:
+    """
+    작업 프로세스 초기화 - spawn한 프로세스는 Django를 기동하지 않으므로
+    OpenCV 스레드 수와 설정으로 추가한 선언형 스타일을 여기서 적용
+    """
+    apply_cv_threads(cv_threads)
+    ProcessorFactory.register_pipelines(pipelines)
+
+
+class JobBackend(ABC):
+    """작업을 실제로 실행하는 풀 (브로커 없이 로컬에서 실행)"""
+
+    @abstractmethod
+    def submit(self, fn, *args) -> Future:
+        pass
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        pass
+
+
+class ExecutorBackend(JobBackend):
+    """concurrent.futures 풀 공통 - 끝나지 않은 future를 기억했다가 종료할 때 취소"""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self._futures = set()
+        self._futures_lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        future = self.executor.submit(fn, *args)
+        with self._futures_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._futures_lock:
+            self._futures.discard(future)
+
+    def shutdown(self):
+        # shutdown(cancel_futures=True)는 파이썬 3.9부터라 시작하지 않은 작업을 직접 취소
+        with self._futures_lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        self.executor.shutdown(wait=False)
+
+
+class ProcessBackend(ExecutorBackend):
+    """
+    프로세스 풀 - 무거운 변환이 웹 워커의 GIL/타임아웃과 무관하게 실행됨
+    작업 프로세스 하나가 죽으면 (OOM 등) 풀 전체가 BrokenProcessPool이 되므로,
+    그 뒤 첫 제출에서 새 풀로 바꾼다 (죽을 때 실행 중이던 작업만 실패로 끝남).
+    """
+
+    def __init__(self, workers: int = 2, start_method: str = 'spawn', cv_threads: int = 0,
+                 pipelines: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            cv_threads: 작업 프로세스의 OpenCV 스레드 수 (0이면 OpenCV 기본값 - 모든 코어)
+            pipelines: 작업 프로세스에 등록할 선언형 스타일 (settings.CONVERTER_PIPELINES)
+        """
+        self.workers = workers
+        self.start_method = start_method
+        self.cv_threads = cv_threads
+        self.pipelines = pipelines
+        self.rebuilds = 0
+        self._rebuild_lock = threading.Lock()
+        super().__init__(self._create_executor())
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context(self.start_method),
+            initializer=init_worker, initargs=(self.cv_threads, self.pipelines)
+        )
+
+    def submit(self, fn, *args):
+        executor = self.executor
+        try:
+            return super().submit(fn, *args)
+        except BrokenProcessPool:
+            self._rebuild(executor)
+            return super().submit(fn, *args)
+
+    def _rebuild(self, broken: ProcessPoolExecutor) -> None:
+        with self._rebuild_lock:
+            # 다른 스레드가 이미 바꿨으면 그대로 씀
+            if self.executor is broken:
+                broken.shutdown(wait=False)
+                self.executor = self._create_executor()
+                self.rebuilds += 1
+
+
+class ThreadBackend(ExecutorBackend):
+    """스레드 풀 - 개발/테스트용 (OpenCV 연산은 GIL을 놓으므로 어느 정도 병렬 실행)"""
+
+    def __init__(self, workers: int = 2):
+        super().__init__(ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='converter-job'))
+
+
+BACKENDS = {
+    'process': ProcessBackend,
+    'thread': ThreadBackend,
+}
+
+
+@dataclass
+class Job:
+    id: str
+    style: str
+    params: Dict[str, Any]
+    encoder_options: EncoderOptions
+    file_name: str = ''
+    cache_key: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    result: Optional[bytes] = None
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False)
+    finished: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def status(self) -> str:
+        if self.finished.is_set():
+            return FAILED if self.error is not None else DONE
+        if self.future is not None and self.future.running():
+            return RUNNING
+        return QUEUED
+
+    def to_record(self) -> Dict[str, Any]:
+        """JobStore에 넣을 기록 (future와 결과 바이트는 제외)"""
+        return {
+            'id': self.id,
+            'style': self.style,
+            'params': self.params,
+            'encoder_options': self.encoder_options,
+            'file_name': self.file_name,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], result: Optional[bytes] = None) -> 'Job':
+        """다른 웹 워커가 넣은 기록으로 만든 작업 (실행 중이어도 상태는 queued로 보임)"""
+        job = cls(**record, result=result)
+        if job.finished_at is not None:
+            job.finished.set()
+        return job
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'style': self.style,
+            'params': self.params,
+            'format': self.encoder_options.format,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class JobStore:
+    """
+    작업 기록과 결과 바이트를 웹 워커끼리 공유하는 저장소 (Django 캐시).
+
+    gunicorn 워커가 여러 개면 제출을 받은 워커와 상태/결과 조회를 받는 워커가 다를 수 있으므로
+    FileBasedCache처럼 프로세스끼리 공유하는 캐시 별칭을 쓴다 (서버가 여러 대면 Redis 등).
+    cache를 주지 않으면 이 프로세스 안에서만 보이는 LocMemCache (워커 하나, 테스트용).
+    """
+
+    def __init__(self, cache=None, prefix: str = 'converter:job:'):
+        if cache is None:
+            cache = LocMemCache(f'converter-jobs-{id(self)}', {'OPTIONS': {'MAX_ENTRIES': 10000}})
+        self.cache = cache
+        self.prefix = prefix
+
+    def put(self, job: Job, timeout: float) -> None:
+        self.cache.set(self.prefix + job.id, job.to_record(), timeout)
+
+    def put_result(self, job_id: str, result: bytes, timeout: float) -> None:
+        self.cache.set(self.prefix + job_id + ':result', result, timeout)
+
+    def get_result(self, job_id: str) -> Optional[bytes]:
+        return self.cache.get(self.prefix + job_id + ':result')
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[Job]:
+        record = self.cache.get(self.prefix + job_id)
+        if record is None:
+            return None
+        result = None
+        if with_result and record['finished_at'] is not None and record['error'] is None:
+            result = self.get_result(job_id)
+            if result is None:
+                return None
+        return Job.from_record(record, result)
+
+    def delete(self, job_id: str) -> None:
+        self.cache.delete_many([self.prefix + job_id, self.prefix + job_id + ':result'])
+
+
+class JobQueue:
+    """
+    무거운 스타일용 비동기 작업 큐.
+
+    끝나지 않은 작업이 max_pending개면 새 작업을 QueueFull로 거절해
+    과부하 시 타임아웃 대신 바로 429를 돌려줄 수 있게 한다.
+    끝난 작업의 결과는 result_ttl초 동안 보관한다.
+    실행은 이 프로세스의 풀에서 하고, 기록은 store에도 넣어 다른 웹 워커가 조회할 수 있다.
+    결과 바이트는 store에만 두고 이 프로세스에는 상태만 남겨, 결과가 쌓여도 워커 메모리가
+    늘지 않는다 (크기 제한과 제거는 store의 캐시 백엔드가 맡음).
+    """
+
+    def __init__(self, backend: JobBackend, max_pending: int = 16, result_ttl: float = 600,
+                 tiling: Optional[Dict[str, Any]] = None, store: Optional[JobStore] = None):
+        self.backend = backend
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.tiling = tiling
+        self.store = store or JobStore()
+        self._jobs: Dict[str, Job] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, image: np.ndarray, style: str, params: Dict[str, Any],
+               encoder_options: EncoderOptions, file_name: str = '',
+               cache_key: Optional[str] = None) -> Job:
+        """
+        변환 작업 등록
+        Args:
+            cache_key: 있으면 성공한 결과를 변환 결과 캐시에도 저장
+        Raises:
+            QueueFull: 끝나지 않은 작업이 max_pending개일 때
+        """
+        job = Job(secrets.token_urlsafe(12), style, params, encoder_options, file_name, cache_key)
+        with self._lock:
+            self._expire()
+            if self._pending >= self.max_pending:
+                raise QueueFull(f'작업 대기열이 가득 찼습니다 ({self.max_pending}개).')
+            self._pending += 1
+            self._jobs[job.id] = job
+        try:
+            self.store.put(job, PENDING_TTL)
+            job.future = self.backend.submit(run_job, image, style, params, encoder_options,
+                                             self.tiling)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                del self._jobs[job.id]
+            self.store.delete(job.id)
+            raise
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def add_completed(self, style: str, params: Dict[str, Any],
+                      encoder_options: EncoderOptions, result: bytes, file_name: str = '') -> Job:
+        """캐시 등으로 이미 결과가 있는 작업을 완료 상태로 등록"""
+        job = Job(secrets.token_urlsafe(12), style, params, encoder_options, file_name)
+        job.finished_at = job.created_at
+        job.finished.set()
+        self.store.put_result(job.id, result, self.result_ttl)
+        self.store.put(job, self.result_ttl)
+        with self._lock:
+            self._expire()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[Job]:
+        """
+        작업 조회 - 이 프로세스가 맡은 작업이 아니면 store의 기록
+        Args:
+            with_result: 성공한 작업이면 store에서 결과 바이트도 읽음 (없으면 만료로 보고 None)
+        """
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+        if job is None:
+            return self.store.get(job_id, with_result)
+        if with_result and job.finished.is_set() and job.error is None:
+            result = self.store.get_result(job_id)
+            if result is None:
+                return None
+            job = replace(job, result=result)
+        return job
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """작업이 끝나거나 timeout초가 지날 때까지 대기 (롱 폴링)"""
+        job = self.get(job_id)
+        if job is None or timeout <= 0:
+            return job
+        if job.future is not None or job.finished.is_set():
+            job.finished.wait(timeout)
+            return job
+        # 다른 웹 워커가 맡은 작업은 끝날 때까지 기록을 다시 읽음
+        deadline = time.monotonic() + timeout
+        while not job.finished.is_set() and time.monotonic() < deadline:
+            time.sleep(min(POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+            job = self.store.get(job_id) or job
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            'backend': type(self.backend).__name__,
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+            **{name: statuses.count(name) for name in (QUEUED, RUNNING, DONE, FAILED)},
+        }
+
+    def _finish(self, job: Job, future: Future):
+        result = None
+        try:
+            result = future.result()
+        except BaseException as e:
+            job.error = str(e) or type(e).__name__
+        job.finished_at = time.time()
+        with self._lock:
+            self._pending -= 1
+        if job.error is None and job.cache_key is not None:
+            result_cache = get_result_cache()
+            if result_cache is not None:
+                result_cache.set(job.cache_key, result)
+        try:
+            # 결과를 먼저 넣어야 완료 기록을 보고 결과를 못 찾는 일이 없음
+            if job.error is None:
+                self.store.put_result(job.id, result, self.result_ttl)
+            self.store.put(job, self.result_ttl)
+        except Exception as e:
+            job.error = job.error or f'작업 결과를 저장하지 못했습니다: {e}'
+        job.finished.set()
+
+    def _expire(self):
+        deadline = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < deadline]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def create_job_queue(config: Dict[str, Any]) -> JobQueue:
+    """
+    설정 딕셔너리로 작업 큐 생성
+    WORKERS와 MAX_PENDING은 서버 전체 값이라 gunicorn이 기록한 웹 워커 수(web_workers)로
+    나눠 워커마다 적용한다 (워커마다 최소 1, runserver처럼 프로세스가 하나면 나누지 않음).
+    CACHE_ALIAS가 있으면 그 캐시로 기록을 공유한다.
+    """
+    name = config.get('BACKEND', 'process')
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown job backend: {name}. Available: {list(BACKENDS.keys())}")
+    workers = web_workers()
+    options = {'workers': max(1, config.get('WORKERS', 2) // workers)}
+    if backend_class is ProcessBackend:
+        options['start_method'] = config.get('START_METHOD', 'spawn')
+        options['cv_threads'] = get_concurrency()['CV_THREADS']
+        options['pipelines'] = getattr(settings, 'CONVERTER_PIPELINES', {})
+    alias = config.get('CACHE_ALIAS')
+    return JobQueue(backend_class(**options),
+                    max_pending=max(1, math.ceil(config.get('MAX_PENDING', 16) / workers)),
+                    result_ttl=config.get('RESULT_TTL', 600),
+                    tiling=tiling_config(),
+                    store=JobStore(caches[alias]) if alias else None)
+
+
+def get_job_queue() -> JobQueue:
+    """settings.CONVERTER_JOBS로 만든 프로세스 공용 작업 큐"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = create_job_queue(getattr(settings, 'CONVERTER_JOBS', {}))
+    return _job_queue
+
+
+def reset_job_queue() -> None:
+    """설정 변경 후 큐를 다시 만들도록 초기화 (테스트용)"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is not None:
+            _job_queue.backend.shutdown()
+        _job_queue = None
@@ -0,0 +1,190 @@
+# converter/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+# 단계별 소요 시간 히스토그램 구간 (초)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 입력 크기 구간 (픽셀 수 상한, 라벨) - 스타일별 지연을 크기대별로 나눠 보기 위함
+SIZE_BUCKETS = (
+    (1_000_000, 'lt1mp'),
+    (4_000_000, '1to4mp'),
+    (12_000_000, '4to12mp'),
+    (24_000_000, '12to24mp'),
+)
+LARGEST_SIZE = 'ge24mp'
+UNKNOWN = 'unknown'
+
+
+def size_bucket(pixels: Optional[int]) -> str:
+    """픽셀 수를 크기 구간 라벨로"""
+    if pixels is None:
+        return UNKNOWN
+    for limit, label in SIZE_BUCKETS:
+        if pixels < limit:
+            return label
+    return LARGEST_SIZE
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Histogram:
+    """
+    라벨별 누적 히스토그램 (Prometheus 텍스트 형식으로 출력)
+    값은 프로세스마다 따로 모이므로 gunicorn 워커가 여럿이면 워커별로 수집된다.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 값 -> (구간별 개수, 합계, 전체 개수)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, ([*counts], total, count))
+                            for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, f'le="{bound:g}"')
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{le} {count}')
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{plain} {total:.6f}')
+            lines.append(f'{self.name}_count{plain} {count}')
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    'converter_stage_seconds',
+    'Time spent in each conversion stage.',
+    ('endpoint', 'stage', 'style', 'size'),
+)
+
+REGISTRY = [STAGE_SECONDS]
+
+
+def render_metrics() -> str:
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_config() -> Dict:
+    return getattr(settings, 'CONVERTER_METRICS', {})
+
+
+def timed(timer: Optional['StageTimer'], name: str):
+    """timer가 있으면 name 단계로 시간 측정 (없으면 아무것도 안 함)"""
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+class StageTimer:
+    """
+    요청 하나의 단계별 소요 시간 기록.
+
+    with timer.stage('decode'): ... 처럼 단계를 감싸고, 끝나면 finish()로
+    스타일과 입력 크기 라벨을 붙여 히스토그램에 기록한다.
+    같은 단계를 여러 번 재면 합산한다.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.style = UNKNOWN
+        self.pixels: Optional[int] = None
+        self.stages: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self.finished = False
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def label(self, style: Optional[str] = None, shape=None) -> None:
+        """스타일과 입력 크기 (높이, 너비) 라벨 지정"""
+        if style is not None:
+            self.style = style
+        if shape is not None:
+            self.pixels = int(shape[0]) * int(shape[1])
+
+    def finish(self) -> None:
+        """전체 시간을 더해 히스토그램에 기록 (한 번만)"""
+        if self.finished:
+            return
+        self.finished = True
+        self.stages['total'] = time.perf_counter() - self.started
+        if not metrics_config().get('ENABLED', True):
+            return
+        size = size_bucket(self.pixels)
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, self.endpoint, name, self.style, size)
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (밀리초)"""
+        return ', '.join(f'{name};dur={seconds * 1e3:.1f}' for name, seconds in self.stages.items())
+
+    def attach(self, response):
+        """
+        응답에 기록을 연결 - 아직 렌더링하지 않은 DRF 응답은 JSON 렌더링 시간까지
+        'render' 단계로 잰 뒤 기록하고, 설정에 따라 Server-Timing 헤더를 붙인다.
+        """
+        def complete(rendered=None):
+            if render_started is not None:
+                self.add('render', time.perf_counter() - render_started)
+            self.finish()
+            if metrics_config().get('SERVER_TIMING', False):
+                (rendered or response)['Server-Timing'] = self.server_timing()
+
+        render_started = None
+        if getattr(response, 'is_rendered', True):
+            complete()
+        else:
+            render_started = time.perf_counter()
+            response.add_post_render_callback(complete)
+        return response
@@ -0,0 +1,155 @@
+# converter/offload.py
+"""
+비동기 뷰용 프로세스 풀 오프로딩
+
+이벤트 루프는 업로드 수신과 응답 전송만 하고, 변환과 인코딩은 프로세스 풀에서 실행한다.
+입력 이미지는 pickle로 보내지 않고 공유 메모리(multiprocessing.shared_memory)에 한 번
+복사한 뒤 이름만 넘겨, 작업 프로세스가 같은 메모리를 그대로 ndarray로 읽는다.
+결과는 인코딩된 바이트(압축되어 작음)로 돌려받는다.
+
+실행 중이거나 대기 중인 작업이 max_pending개면 QueueFull로 거절한다 (429 + Retry-After).
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .concurrency import get_concurrency, tiling_config
+from .encoding import EncoderOptions
+from .jobs import ProcessBackend, QueueFull, ThreadBackend, run_job
+
+
+def run_shared(name: str, shape: Tuple[int, ...], dtype: str, style: str, params: Dict[str, Any],
+               encoder_options: EncoderOptions, tiling: Optional[Dict[str, Any]] = None) -> bytes:
+    """작업 프로세스에서 실행: 공유 메모리의 이미지를 복사 없이 변환 후 인코딩"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        image.flags.writeable = False
+        try:
+            return run_job(image, style, params, encoder_options, tiling)
+        finally:
+            del image
+    finally:
+        shm.close()
+
+
+def share_array(image: np.ndarray) -> shared_memory.SharedMemory:
+    """이미지를 새 공유 메모리 블록에 복사"""
+    shm = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+    view = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+    view[...] = image
+    del view
+    return shm
+
+
+def release(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+class Offloader:
+    """
+    프로세스 풀 + 공유 메모리로 변환을 실행하는 공용 실행기.
+    대기 중인 작업 수는 작업이 실제로 끝날 때 줄어든다 (클라이언트가 끊겨도 풀이 비워질 때까지 유지).
+    """
+
+    def __init__(self, backend, max_pending: int = 4, tiling: Optional[Dict[str, Any]] = None):
+        self.backend = backend
+        self.max_pending = max_pending
+        self.tiling = tiling
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def full(self) -> bool:
+        return self._pending >= self.max_pending
+
+    def submit(self, image: np.ndarray, style: str, params: Dict[str, Any],
+               encoder_options: EncoderOptions) -> Future:
+        """
+        변환 작업 등록 (인코딩된 바이트를 돌려주는 Future)
+        Raises:
+            QueueFull: 실행 중이거나 대기 중인 작업이 max_pending개일 때
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFull(f'변환 작업이 가득 찼습니다 ({self.max_pending}개).')
+            self._pending += 1
+        shm = None
+        try:
+            shm = share_array(np.ascontiguousarray(image))
+            future = self.backend.submit(run_shared, shm.name, image.shape, image.dtype.str,
+                                         style, params, encoder_options, self.tiling)
+        except Exception:
+            if shm is not None:
+                release(shm)
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(lambda _: self._finish(shm))
+        return future
+
+    async def run(self, image: np.ndarray, style: str, params: Dict[str, Any],
+                  encoder_options: EncoderOptions) -> bytes:
+        """submit 후 이벤트 루프를 막지 않고 결과를 기다림"""
+        return await asyncio.wrap_future(self.submit(image, style, params, encoder_options))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': type(self.backend).__name__,
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+        }
+
+    def _finish(self, shm: shared_memory.SharedMemory):
+        release(shm)
+        with self._lock:
+            self._pending -= 1
+
+
+_offloader = None
+_offloader_lock = threading.Lock()
+
+
+def create_offloader(config: Dict[str, Any]) -> Offloader:
+    """설정 딕셔너리로 실행기 생성 (MAX_PENDING이 없으면 워커 수의 2배)"""
+    name = config.get('BACKEND', 'process')
+    workers = config.get('WORKERS', 2)
+    if name == 'process':
+        backend = ProcessBackend(workers, config.get('START_METHOD', 'spawn'),
+                                 cv_threads=get_concurrency()['CV_THREADS'],
+                                 pipelines=getattr(settings, 'CONVERTER_PIPELINES', {}))
+    elif name == 'thread':
+        backend = ThreadBackend(workers)
+    else:
+        raise ValueError(f"Unknown offload backend: {name}. Available: ['process', 'thread']")
+    return Offloader(backend, max_pending=config.get('MAX_PENDING') or workers * 2,
+                     tiling=tiling_config())
+
+
+def get_offloader() -> Offloader:
+    """settings.CONVERTER_OFFLOAD로 만든 프로세스 공용 실행기"""
+    global _offloader
+    if _offloader is None:
+        with _offloader_lock:
+            if _offloader is None:
+                _offloader = create_offloader(getattr(settings, 'CONVERTER_OFFLOAD', {}))
+    return _offloader
+
+
+def reset_offloader() -> None:
+    """설정 변경 후 실행기를 다시 만들도록 초기화 (테스트용)"""
+    global _offloader
+    with _offloader_lock:
+        if _offloader is not None:
+            _offloader.backend.shutdown()
+        _offloader = None
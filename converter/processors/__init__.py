@@ -1,4 +1,6 @@
 # converter/processors/__init__.pyㄴㄴㅇㅇ
 from .factory import ProcessorFactory
+from .features import ImageFeatures
+from .tiling import process_tiled, render
 
-__all__ = ['ProcessorFactory']
\ No newline at end of file
+__all__ = ['ProcessorFactory', 'ImageFeatures', 'process_tiled', 'render']
\ No newline at end of file
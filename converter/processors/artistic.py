@@ -2,6 +2,8 @@
 import cv2
 import numpy as np
 from .base import BaseImageProcessor
+from .features import ImageFeatures
+from .raster import disk_kernel, stamp_points
 
 class OutlineProcessor(BaseImageProcessor):
     """아웃라인만 추출"""
@@ -29,15 +31,24 @@ class OutlineProcessor(BaseImageProcessor):
             }
         ]
     
-    def process(self, image: np.ndarray, threshold1=50, threshold2=150) -> np.ndarray:
-        gray = self.to_gray(image)
-        edges = cv2.Canny(gray, threshold1, threshold2)
-        
-        # 흰 배경에 검은 선
-        white_bg = np.ones_like(image) * 255
-        white_bg[edges != 0] = 0
+    @classmethod
+    def get_halo(cls, **params):
+        # Canny 히스테리시스는 약한 엣지를 따라 거리 제한 없이 이어지므로 어떤 여백으로도
+        # 타일 결과가 전체 처리와 같아지지 않음 - 타일로 나누지 않고 한 번에 처리
+        return None
+    
+    @classmethod
+    def get_cost(cls, **params):
+        # Canny (엣지가 많은 이미지 기준)
+        return 15.0
+    
+    def process(self, image: np.ndarray, threshold1=50, threshold2=150, features=None) -> np.ndarray:
+        edges = ImageFeatures.of(image, features).canny(threshold1, threshold2)
         
-        return white_bg
+        # 흰 배경에 검은 선: 엣지(0/255)를 3채널 캔버스에 복사한 뒤 제자리에서 반전
+        # (edges는 공유 중간 결과라 직접 반전하지 않음)
+        outline = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+        return cv2.bitwise_not(outline, dst=outline)
 
 class PointillismProcessor(BaseImageProcessor):
     """점묘화 효과"""
@@ -52,7 +63,8 @@ class PointillismProcessor(BaseImageProcessor):
                 'min': 5,
                 'max': 50,
                 'step': 5,
-                'description': '점 밀집도 (작을수록 점이 큼)'
+                'description': '점 밀집도 (작을수록 점이 큼)',
+                'scale': 'area'
             },
             {
                 'name': 'point_size',
@@ -61,30 +73,43 @@ class PointillismProcessor(BaseImageProcessor):
                 'min': 3,
                 'max': 20,
                 'step': 1,
-                'description': '점 크기'
+                'description': '점 크기',
+                'scale': 'linear'
+            },
+            {
+                'name': 'seed',
+                'type': 'int',
+                'default': 0,
+                'min': 0,
+                'max': 9999,
+                'step': 1,
+                'description': '랜덤 시드 (같은 값이면 같은 결과)'
             }
         ]
     
-    def process(self, image: np.ndarray, point_density=15, point_size=8) -> np.ndarray:
+    @classmethod
+    def get_cost(cls, point_density=15, point_size=8, **params):
+        # 점 개수(픽셀 수 / point_density) x 도장 면적에 비례
+        return 15.0 + 8.0 * point_size * point_size / point_density
+    
+    def process(self, image: np.ndarray, point_density=15, point_size=8, seed=0,
+                features=None) -> np.ndarray:
         h, w = image.shape[:2]
         
         # 흰 캔버스
-        canvas = np.ones((h, w, 3), dtype=np.uint8) * 255
+        canvas = np.full((h, w, 3), 255, dtype=np.uint8)
         
         # 점의 개수 계산 (더 적게)
         num_points = (h * w) // point_density
         
-        for _ in range(num_points):
-            x = np.random.randint(0, w)
-            y = np.random.randint(0, h)
-            
-            # 해당 위치의 색상 가져오기
-            color = tuple(map(int, image[y, x]))
-            
-            # 점 그리기 (더 크게) 서버 호스트...
-            cv2.circle(canvas, (x, y), point_size, color, -1)
+        # 모든 점의 위치와 색상을 한 번에 샘플링
+        rng = np.random.default_rng(seed)
+        xs = rng.integers(0, w, num_points)
+        ys = rng.integers(0, h, num_points)
+        colors = image[ys, xs]
         
-        return canvas
+        # 점 그리기 - 원 모양 도장을 그린 순서대로 한 번에 찍음
+        return stamp_points(canvas, ys, xs, colors, disk_kernel(point_size))
 class VintageProcessor(BaseImageProcessor):
     """빈티지/세피아 효과"""
     
@@ -102,7 +127,12 @@ class VintageProcessor(BaseImageProcessor):
             }
         ]
     
-    def process(self, image: np.ndarray, intensity=1.0) -> np.ndarray:
+    @classmethod
+    def get_halo(cls, **params):
+        # 픽셀 단위 색 변환
+        return 0
+    
+    def process(self, image: np.ndarray, intensity=1.0, features=None) -> np.ndarray:
         # 세피아 변환 매트릭스
         kernel = np.array([[0.272, 0.534, 0.131],
                           [0.349, 0.686, 0.168],
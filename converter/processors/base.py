@@ -1,8 +1,53 @@
 # converter/processors/base.py
+import math
 import cv2
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+# get_cost를 재정의하지 않은 스타일의 1메가픽셀당 예상 처리 시간 (ms)
+DEFAULT_COST = 10.0
+
+
+def parse_bool(name: str, value) -> bool:
+    """bool 파라미터 값 (JSON true/false, 0/1, 'true'/'false' 등)"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ('1', 'true', 'yes', 'on'):
+            return True
+        if text in ('0', 'false', 'no', 'off'):
+            return False
+    raise ValueError(f'{name}는 true 또는 false여야 합니다.')
+
+
+def parse_number(name: str, value) -> float:
+    """숫자 파라미터 값 (숫자 또는 숫자 문자열, bool/NaN/무한대는 거절)"""
+    if isinstance(value, bool):
+        raise ValueError(f'{name}는 숫자여야 합니다.')
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name}는 숫자여야 합니다.')
+    if not math.isfinite(number):
+        raise ValueError(f'{name}는 유한한 숫자여야 합니다.')
+    return number
+
+
+def fit_param(param: Dict[str, Any], value: float):
+    """min/max 범위로 제한한 뒤 min에서 step 간격으로 맞춤 (홀수만 되는 값 등 유지)"""
+    low, high = param.get('min', value), param.get('max', value)
+    value = min(max(value, low), high)
+    step = param.get('step')
+    if step:
+        value = low + round((value - low) / step) * step
+        value = min(value, high)
+    # step을 더하면서 생기는 부동소수점 오차 제거 (0.30000000000000004 -> 0.3)
+    return int(round(value)) if param['type'] == 'int' else round(value, 10)
+
 
 class BaseImageProcessor(ABC):
     """모든 이미지 프로세서의 기본 클래스"""
@@ -24,15 +69,104 @@ class BaseImageProcessor(ABC):
                     'description': '효과 강도'
                 }
             ]
+            픽셀 단위 크기 파라미터는 'scale' 키로 해상도에 따라 어떻게
+            바뀌는지 표시한다 ('linear': 길이, 'area': 면적).
         """
         return []
     
+    @classmethod
+    def default_params(cls) -> Dict[str, Any]:
+        """파라미터 이름 -> 기본값"""
+        return {param['name']: param['default'] for param in cls.get_parameters()}
+    
+    # 타일 처리 지원: 결과 한 픽셀이 입력의 몇 픽셀 반경까지 영향을 받는지 선언
+    @classmethod
+    def get_halo(cls, **params) -> Optional[int]:
+        """
+        타일 처리에 필요한 타일 바깥 여백 (픽셀)
+        Args:
+            **params: 기본값이 채워진 파라미터
+        Returns:
+            여백 크기, None이면 이미지 전체가 필요해 타일 처리 불가
+            (전역 최댓값 정규화, 난수 배치 등)
+        """
+        return None
+    
+    @classmethod
+    def get_tile_alignment(cls, **params) -> int:
+        """타일 시작 좌표가 맞춰야 하는 배수 (격자 기반 효과는 격자 간격)"""
+        return 1
+    
+    @classmethod
+    def scale_params(cls, params: Dict[str, Any], factor: float) -> Dict[str, Any]:
+        """
+        이미지를 factor 배로 축소/확대했을 때 같은 느낌이 나도록 크기 파라미터 조정
+        Args:
+            params: 요청 파라미터 (빠진 크기 파라미터는 기본값 기준으로 조정)
+            factor: 변경된 긴 변 / 원본 긴 변
+        Returns:
+            조정된 파라미터 (min/max 범위로 제한하고 step에 맞춤)
+        """
+        scaled = dict(params)
+        for param in cls.get_parameters():
+            mode = param.get('scale')
+            if mode not in ('linear', 'area'):
+                continue
+            name = param['name']
+            try:
+                value = float(scaled.get(name, param['default']))
+            except (TypeError, ValueError):
+                continue
+            value *= factor if mode == 'linear' else factor * factor
+            scaled[name] = fit_param(param, value)
+        return scaled
+    
+    @classmethod
+    def clean_params(cls, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        요청 파라미터를 get_parameters() 기준으로 검증/정규화
+        빠진 파라미터는 기본값으로 채우고, 타입을 맞춘 뒤 min/max로 제한하고 step에 맞춘다.
+        같은 결과를 내는 요청은 같은 딕셔너리가 되므로 캐시 키에도 그대로 쓴다.
+        Raises:
+            ValueError: 모르는 파라미터, 타입을 바꿀 수 없는 값
+        """
+        if not isinstance(params, dict):
+            raise ValueError('params는 JSON 객체여야 합니다.')
+        schema = {param['name']: param for param in cls.get_parameters()}
+        unknown = sorted(set(params) - set(schema))
+        if unknown:
+            raise ValueError(f'알 수 없는 파라미터: {unknown}. 사용 가능: {list(schema)}')
+        cleaned = {}
+        for name, param in schema.items():
+            if name not in params:
+                cleaned[name] = param['default']
+            elif param['type'] == 'bool':
+                cleaned[name] = parse_bool(name, params[name])
+            else:
+                cleaned[name] = fit_param(param, parse_number(name, params[name]))
+        return cleaned
+    
+    @classmethod
+    def get_cost(cls, **params) -> float:
+        """
+        기본값이 채워진 파라미터로 처리할 때 1메가픽셀당 예상 처리 시간 (ms, 코어 하나 기준)
+        benchmarks/processors.py 측정값으로 맞춘 대략적인 값 - 비싼 스타일은 재정의
+        """
+        return DEFAULT_COST
+    
+    @classmethod
+    def estimate_cost(cls, shape, params: Dict[str, Any]) -> float:
+        """(높이, 너비) 이미지를 params로 처리하는 예상 시간 (ms)"""
+        megapixels = shape[0] * shape[1] / 1e6
+        return megapixels * cls.get_cost(**{**cls.default_params(), **params})
+    
     @abstractmethod
-    def process(self, image: np.ndarray, **params) -> np.ndarray:
+    def process(self, image: np.ndarray, features=None, **params) -> np.ndarray:
         """
         이미지를 처리하는 메인 메서드
         Args:
             image: OpenCV 형식의 이미지 (BGR)
+            features: 같은 이미지의 중간 결과를 공유하는 ImageFeatures (없으면 새로 계산)
             **params: 파라미터들
         Returns:
             처리된 이미지 (BGR)
@@ -11,11 +11,16 @@ from .painting import (
     CelShadingProcessor
 )
 from .artistic import (
+    OutlineProcessor,
     PointillismProcessor
 )
+from .pipeline import pipeline_processor
 
 class ProcessorFactory:
-    """변환 타입에 따라 적절한 프로세서를 반환"""
+    """
+    변환 타입에 따라 적절한 프로세서를 반환
+    프로세서는 상태가 없으므로 스타일마다 인스턴스 하나를 만들어 모든 요청/스레드가 공유한다.
+    """
     
     PROCESSORS = {
         'ink_drawing': InkDrawingProcessor,
@@ -26,15 +31,57 @@ class ProcessorFactory:
         'mosaic': MosaicProcessor,
         'cel_shading': CelShadingProcessor,
         'pointillism': PointillismProcessor,
+        'outline': OutlineProcessor,
     }
     
     @classmethod
-    def get_processor(cls, style: str):
-        """스타일 이름으로 프로세서 인스턴스 반환"""
+    def get_processor_class(cls, style: str):
+        """스타일 이름으로 프로세서 클래스 반환"""
         processor_class = cls.PROCESSORS.get(style)
         if processor_class is None:
             raise ValueError(f"Unknown style: {style}. Available: {list(cls.PROCESSORS.keys())}")
-        return processor_class()
+        return processor_class
+    
+    # 스타일 -> 공유 인스턴스
+    _instances = {}
+    
+    @classmethod
+    def get_processor(cls, style: str):
+        """스타일 이름으로 공유 프로세서 인스턴스 반환"""
+        processor = cls._instances.get(style)
+        if processor is None:
+            processor = cls._instances[style] = cls.get_processor_class(style)()
+        return processor
+    
+    @classmethod
+    def register(cls, style: str, processor_class):
+        """스타일 추가 (같은 이름이 있으면 교체)"""
+        cls.PROCESSORS[style] = processor_class
+        cls._instances.pop(style, None)
+    
+    @classmethod
+    def register_pipelines(cls, pipelines):
+        """
+        선언형 파이프라인으로 스타일 추가 (settings.CONVERTER_PIPELINES)
+        Args:
+            pipelines: 스타일 이름 -> 선언 (converter/processors/pipeline.py 형식)
+        Raises:
+            ValueError: 선언이 잘못됨 (하나라도 잘못되면 아무것도 등록하지 않음)
+        """
+        classes = {}
+        for style, spec in (pipelines or {}).items():
+            try:
+                classes[style] = pipeline_processor(f'{style}_pipeline', spec)
+            except ValueError as e:
+                raise ValueError(f'파이프라인 {style}: {e}')
+        for style, processor_class in classes.items():
+            cls.register(style, processor_class)
+    
+    @classmethod
+    def preload(cls):
+        """모든 스타일의 공유 인스턴스를 미리 생성 (gunicorn --preload 시 마스터에서 한 번)"""
+        for style in cls.PROCESSORS:
+            cls.get_processor(style)
     
     @classmethod
     def available_styles(cls):
@@ -0,0 +1,120 @@
+# converter/processors/features.py
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import cv2
+import numpy as np
+
+
+class ImageFeatures:
+    """
+    한 이미지에서 파생되는 중간 결과를 키별로 한 번만 계산해 공유하는 컨텍스트.
+
+    그레이스케일, Sobel 그라디언트, bilateral 필터 등을 처음 요청할 때
+    계산하고 이후에는 같은 배열을 돌려준다. 여러 스타일을 한 번에 변환하거나
+    (배치) 같은 이미지로 파라미터만 바꿔 다시 변환할 때 중복 계산을 없앤다.
+    반환되는 배열은 공유되므로 읽기 전용이다 - 수정하려면 복사해서 쓸 것.
+    스레드 안전하며, 같은 키를 동시에 요청하면 한 번만 계산한다.
+    """
+
+    def __init__(self, image: np.ndarray, max_bytes: Optional[int] = None):
+        """
+        Args:
+            image: OpenCV 형식의 이미지 (BGR)
+            max_bytes: 보관할 중간 결과의 최대 바이트 (넘으면 계산만 하고 보관하지 않음)
+        """
+        self.image = image
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._values: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, image: np.ndarray, features: Optional['ImageFeatures'] = None) -> 'ImageFeatures':
+        """image에 대한 컨텍스트 - 주어진 컨텍스트가 같은 이미지 것이면 재사용"""
+        if features is not None and features.image is image:
+            return features
+        return cls(image)
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """key에 해당하는 값을 한 번만 계산해서 반환"""
+        value = self._values.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self._values.get(key)
+            if value is None:
+                value = compute()
+                self._remember(key, value)
+        return value
+
+    def _remember(self, key, value):
+        arrays = value if isinstance(value, tuple) else (value,)
+        size = sum(a.nbytes for a in arrays if isinstance(a, np.ndarray))
+        with self._lock:
+            if self.max_bytes is not None and self.nbytes + size > self.max_bytes:
+                return
+            for a in arrays:
+                if isinstance(a, np.ndarray):
+                    a.setflags(write=False)
+            self._values[key] = value
+            self.nbytes += size
+
+    # --- 공통 중간 결과 ---
+
+    def gray(self) -> np.ndarray:
+        """그레이스케일"""
+        return self.get('gray', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY))
+
+    def median_gray(self, ksize: int) -> np.ndarray:
+        """메디안 블러를 적용한 그레이스케일"""
+        return self.get(('median_gray', ksize), lambda: cv2.medianBlur(self.gray(), ksize))
+
+    def sobel(self, ksize: int = 3):
+        """
+        그레이스케일의 (x, y) Sobel 미분 (float32)
+        uint8 입력의 미분값은 ksize 7까지 2^24 미만의 정수라 float32로도 CV_64F와 값이 같다.
+        """
+        def compute():
+            gray = self.gray()
+            return (cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=ksize),
+                    cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=ksize))
+        return self.get(('sobel', ksize), compute)
+
+    def gradient_magnitude(self, ksize: int = 3) -> np.ndarray:
+        """
+        Sobel 그라디언트 크기 (float32, float64 계산과의 상대 오차 1e-7 수준)
+        cv2.magnitude는 메모리 정렬에 따라 마지막 비트가 달라지므로 NumPy로 제자리 계산
+        (같은 입력이면 항상 같은 결과 - 결과 캐시와 타일 처리에 필요)
+        """
+        def compute():
+            sobelx, sobely = self.sobel(ksize)
+            magnitude = np.square(sobelx)
+            magnitude += np.square(sobely)
+            return np.sqrt(magnitude, out=magnitude)
+        return self.get(('gradient_magnitude', ksize), compute)
+
+    def gradient_angle(self, ksize: int = 3) -> np.ndarray:
+        """Sobel 그라디언트 방향 (float32 라디안, -π ~ π)"""
+        def compute():
+            sobelx, sobely = self.sobel(ksize)
+            return np.arctan2(sobely, sobelx)
+        return self.get(('gradient_angle', ksize), compute)
+
+    def bilateral(self, d: int, sigma_color: float, sigma_space: float,
+                  iterations: int = 1) -> np.ndarray:
+        """bilateralFilter를 iterations번 반복 적용한 컬러 이미지"""
+        def compute():
+            if iterations <= 1:
+                return cv2.bilateralFilter(self.image, d, sigma_color, sigma_space)
+            previous = self.bilateral(d, sigma_color, sigma_space, iterations - 1)
+            return cv2.bilateralFilter(previous, d, sigma_color, sigma_space)
+        return self.get(('bilateral', d, sigma_color, sigma_space, iterations), compute)
+
+    def canny(self, threshold1: float, threshold2: float) -> np.ndarray:
+        """그레이스케일의 Canny 엣지"""
+        return self.get(('canny', threshold1, threshold2),
+                        lambda: cv2.Canny(self.gray(), threshold1, threshold2))
@@ -1,71 +1,118 @@
 # converter/processors/painting.py
+from functools import lru_cache
+
 import cv2
 import numpy as np
 from .base import BaseImageProcessor
+from .features import ImageFeatures
+from .pipeline import pipeline_processor
+from .raster import disk_kernel, new_id_map, fill_from_id_map
+
+CARTOON = {
+    'description': '카툰화 효과',
+    'parameters': [
+        {
+            'name': 'color_levels',
+            'type': 'int',
+            'default': 9,
+            'min': 3,
+            'max': 20,
+            'step': 1,
+            'description': '색상 단순화 레벨'
+        },
+        {
+            'name': 'edge_thickness',
+            'type': 'int',
+            'default': 9,
+            'min': 3,
+            'max': 15,
+            'step': 2,
+            'description': '윤곽선 감지 범위',
+            'scale': 'linear'
+        },
+        {
+            'name': 'line_thickness',
+            'type': 'int',
+            'default': 1,
+            'min': 1,
+            'max': 5,
+            'step': 1,
+            'description': '선 굵기',
+            'scale': 'linear'
+        }
+    ],
+    'stages': {
+        # 색상 단순화 (윤곽선 쪽과 독립이라 동시에 실행)
+        'color': {'op': 'bilateral', 'd': '$color_levels', 'sigma_color': 250, 'sigma_space': 250},
+        # 엣지 검출과 선 굵기 조정
+        'gray': {'op': 'gray'},
+        'edges': {'op': 'adaptive_threshold', 'input': 'gray',
+                  'block_size': '$edge_thickness', 'c': 2},
+        'thick': {'op': 'dilate', 'input': 'edges', 'size': '$line_thickness'},
+        # 엣지를 컬러 이미지와 합성
+        'cartoon': {'op': 'bitwise_and', 'inputs': ['color', 'thick']},
+    },
+}
+
+CartoonProcessor = pipeline_processor('CartoonProcessor', CARTOON)
+
+# 한 번에 래스터화할 붓터치 수 (임시 좌표 배열 메모리 상한)
+STROKE_CHUNK = 65536
 
-class CartoonProcessor(BaseImageProcessor):
-    """카툰화 효과"""
+
+def paint_strokes(canvas: np.ndarray, source: np.ndarray, sobelx: np.ndarray,
+                  sobely: np.ndarray, brush_size: int, thickness: int,
+                  threshold: float = 10) -> np.ndarray:
+    """
+    brush_size 격자마다 그라디언트에 수직인 붓터치를 canvas에 일괄로 그린다.
     
-    @classmethod
-    def get_parameters(cls):
-        return [
-            {
-                'name': 'color_levels',
-                'type': 'int',
-                'default': 9,
-                'min': 3,
-                'max': 20,
-                'step': 1,
-                'description': '색상 단순화 레벨'
-            },
-            {
-                'name': 'edge_thickness',
-                'type': 'int',
-                'default': 9,
-                'min': 3,
-                'max': 15,
-                'step': 2,
-                'description': '윤곽선 감지 범위'
-            },
-            {
-                'name': 'line_thickness',
-                'type': 'int',
-                'default': 1,
-                'min': 1,
-                'max': 5,
-                'step': 1,
-                'description': '선 굵기'
-            }
-        ]
+    그라디언트 크기와 방향은 격자점에서만 float64로 계산하므로 전체 크기의
+    크기/방향 배열이 필요 없다. 격자점 선택, 시작/끝점, 색상 계산을 NumPy로 한 번에 처리한다.
+    각 붓터치를 번호 맵에 1픽셀 선으로 찍어 팽창시키므로 나중 붓터치가
+    앞의 것을 덮는 순서(행 우선)는 기존 cv2.line 루프와 같다.
+    """
+    h, w = canvas.shape[:2]
+    step = brush_size
     
-    def process(self, image: np.ndarray, color_levels=9, edge_thickness=9, line_thickness=1) -> np.ndarray:
-        # 색상 단순화
-        color = cv2.bilateralFilter(image, color_levels, 250, 250)
-        
-        # 엣지 검출
-        gray = self.to_gray(image)
-        edges = cv2.adaptiveThreshold(
-            gray, 255,
-            cv2.ADAPTIVE_THRESH_MEAN_C,
-            cv2.THRESH_BINARY,
-            edge_thickness, 2
+    # 엣지가 있는 격자점만 선택 (행 우선 순서)
+    grid_x = sobelx[::step, ::step].astype(np.float64)
+    grid_y = sobely[::step, ::step].astype(np.float64)
+    gy, gx = np.nonzero(np.hypot(grid_x, grid_y) > threshold)
+    if gy.size == 0:
+        return canvas
+    ys = gy * step
+    xs = gx * step
+    
+    # 그라디언트 방향에 수직인 붓터치의 시작점과 끝점 (int() 절사와 동일)
+    length = int(brush_size * 1.5)
+    direction = np.arctan2(grid_y[gy, gx], grid_x[gy, gx]) + np.pi / 2
+    dx = length / 2 * np.cos(direction)
+    dy = length / 2 * np.sin(direction)
+    x1 = np.trunc(xs - dx).astype(np.float32)
+    y1 = np.trunc(ys - dy).astype(np.float32)
+    x2 = np.trunc(xs + dx).astype(np.float32)
+    y2 = np.trunc(ys + dy).astype(np.float32)
+    
+    # 붓터치 번호 맵에 1픽셀 선으로 찍은 뒤 선 굵기만큼 팽창
+    id_map = new_id_map(canvas.shape)
+    t = np.linspace(0.0, 1.0, length + 1, dtype=np.float32)
+    
+    # 시작점(정수)에 반올림한 이동량을 더해 좌표 위치와 무관하게 같은 모양으로 래스터화
+    # (타일로 나눠 처리해도 전체 이미지와 같은 픽셀)
+    for begin in range(0, ys.size, STROKE_CHUNK):
+        sl = slice(begin, begin + STROKE_CHUNK)
+        py = (y1[sl, None] + np.rint(t * (y2[sl] - y1[sl])[:, None])).astype(np.intp)
+        px = (x1[sl, None] + np.rint(t * (x2[sl] - x1[sl])[:, None])).astype(np.intp)
+        ids = np.broadcast_to(
+            np.arange(begin + 1, begin + py.shape[0] + 1, dtype=np.float32)[:, None],
+            py.shape
         )
-        
-        # 선 굵기 조정
-        if line_thickness > 1:
-            kernel = np.ones((line_thickness, line_thickness), np.uint8)
-            edges = cv2.dilate(edges, kernel, iterations=1)
-        
-        # 엣지를 컬러 이미지와 합성
-        edges_colored = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-        cartoon = cv2.bitwise_and(color, edges_colored)
-        
-        return cartoon
+        inside = (py >= 0) & (py < h) & (px >= 0) & (px < w)
+        id_map[py[inside], px[inside]] = ids[inside]
+    
+    fill_from_id_map(canvas, id_map, source[ys, xs], disk_kernel(thickness / 2))
+    return canvas
 
-# converter/processors/painting.py (OilPaintingProcessor만 수정)
-import cv2
-import numpy as np
-from .base import BaseImageProcessor
 
 class OilPaintingProcessor(BaseImageProcessor):
     """유화 효과 - 명암에 따른 붓터치"""
@@ -80,7 +127,8 @@ class OilPaintingProcessor(BaseImageProcessor):
                 'min': 3,
                 'max': 15,
                 'step': 2,
-                'description': '붓 크기'
+                'description': '붓 크기',
+                'scale': 'linear'
             },
             {
                 'name': 'brush_intensity',
@@ -93,54 +141,39 @@ class OilPaintingProcessor(BaseImageProcessor):
             }
         ]
     
-    def process(self, image: np.ndarray, brush_size=7, brush_intensity=5) -> np.ndarray:
+    @classmethod
+    def get_halo(cls, brush_size=7, brush_intensity=5, **params):
+        # 붓터치가 중심에서 닿는 거리 + bilateral 2회 반경 (4 + 4) + medianBlur 반경
+        reach = int(brush_size * 1.5) // 2 + max(1, brush_intensity // 2) // 2 + 2
+        return reach + 8 + 1
+    
+    @classmethod
+    def get_tile_alignment(cls, brush_size=7, **params):
+        # 붓터치 격자가 전체 이미지와 같은 위치에 오도록
+        return brush_size
+    
+    @classmethod
+    def get_cost(cls, **params):
+        # bilateral 2회 + 붓터치 래스터화 (붓 크기와 거의 무관)
+        return 300.0
+    
+    def process(self, image: np.ndarray, brush_size=7, brush_intensity=5,
+                features=None) -> np.ndarray:
         """
         명암 그라디언트에 따라 붓터치 방향을 결정하는 유화 효과
         """
-        # 1. 색상 단순화 (유화 느낌)
-        result = image.copy()
-        for _ in range(2):
-            result = cv2.bilateralFilter(result, 9, 75, 75)
-        
-        # 2. 그레이스케일로 변환하여 명암 분석
-        gray = self.to_gray(image)
+        features = ImageFeatures.of(image, features)
         
-        # 3. Sobel로 그라디언트 방향 계산
-        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        # 1. 색상 단순화 (유화 느낌) - bilateral 필터 2회
+        result = features.bilateral(9, 75, 75, iterations=2)
         
-        # 그라디언트 크기와 방향
-        magnitude = np.sqrt(sobelx**2 + sobely**2)
-        angle = np.arctan2(sobely, sobelx)
+        # 2~3. 그레이스케일의 Sobel 그라디언트로 명암 분석 (크기/방향은 붓터치 격자점에서만)
+        sobelx, sobely = features.sobel(3)
         
-        # 4. 붓터치 효과 적용
-        h, w = image.shape[:2]
+        # 4. 붓터치 효과 적용 (전체 격자를 한 번에 계산)
         canvas = result.copy()
-        
-        # 일정 간격으로 붓터치 샘플링
-        step = brush_size
-        for y in range(0, h, step):
-            for x in range(0, w, step):
-                if magnitude[y, x] > 10:  # 엣지가 있는 부분만
-                    # 그라디언트 방향에 수직으로 붓터치
-                    direction = angle[y, x] + np.pi/2
-                    
-                    # 붓터치 길이
-                    length = int(brush_size * 1.5)
-                    
-                    # 시작점과 끝점 계산
-                    x1 = int(x - length/2 * np.cos(direction))
-                    y1 = int(y - length/2 * np.sin(direction))
-                    x2 = int(x + length/2 * np.cos(direction))
-                    y2 = int(y + length/2 * np.sin(direction))
-                    
-                    # 범위 체크
-                    if 0 <= x < w and 0 <= y < h:
-                        color = tuple(map(int, result[y, x]))
-                        
-                        # 붓터치 그리기 (선 굵기는 brush_intensity로 조절)
-                        cv2.line(canvas, (x1, y1), (x2, y2), color, 
-                                max(1, brush_intensity // 2), cv2.LINE_AA)
+        paint_strokes(canvas, result, sobelx, sobely,
+                      brush_size, max(1, brush_intensity // 2))
         
         # 5. 원본과 블렌딩하여 자연스럽게
         alpha = 0.7
@@ -165,7 +198,8 @@ class WatercolorProcessor(BaseImageProcessor):
                 'min': 20,
                 'max': 200,
                 'step': 10,
-                'description': '공간 범위'
+                'description': '공간 범위',
+                'scale': 'linear'
             },
             {
                 'name': 'sigma_r',
@@ -178,7 +212,12 @@ class WatercolorProcessor(BaseImageProcessor):
             }
         ]
     
-    def process(self, image: np.ndarray, sigma_s=60, sigma_r=0.6) -> np.ndarray:
+    @classmethod
+    def get_cost(cls, **params):
+        # cv2.stylization - 파라미터와 거의 무관하게 가장 비쌈
+        return 850.0
+    
+    def process(self, image: np.ndarray, sigma_s=60, sigma_r=0.6, features=None) -> np.ndarray:
         result = cv2.stylization(image, sigma_s=sigma_s, sigma_r=sigma_r)
         return result
 
@@ -196,28 +235,68 @@ class MosaicProcessor(BaseImageProcessor):
                 'min': 5,
                 'max': 50,
                 'step': 5,
-                'description': '타일 크기'
+                'description': '타일 크기',
+                'scale': 'linear'
             }
         ]
     
-    def process(self, image: np.ndarray, tile_size=10) -> np.ndarray:
+    @classmethod
+    def get_cost(cls, **params):
+        return 3.0
+    
+    def process(self, image: np.ndarray, tile_size=10, features=None) -> np.ndarray:
         h, w = image.shape[:2]
+        t = max(1, int(tile_size))
+        full_h, full_w = h - h % t, w - w % t
+        mosaic = np.empty_like(image)
         
-        small = cv2.resize(
-            image,
-            (w // tile_size, h // tile_size),
-            interpolation=cv2.INTER_LINEAR
-        )
-        
-        mosaic = cv2.resize(
-            small,
-            (w, h),
-            interpolation=cv2.INTER_NEAREST
-        )
+        # 완전한 블록 영역, 오른쪽 끝 열, 아래 끝 행, 구석을 각각 블록 평균으로 줄였다가
+        # 결과 캔버스의 해당 영역에 바로 늘려 씀 (가장자리 블록은 남은 크기 그대로)
+        # 배율이 모두 정수라 INTER_AREA는 정확한 블록 평균, INTER_NEAREST는 정확한 블록 복제
+        for rows, cols, block_h, block_w in (
+            (slice(0, full_h), slice(0, full_w), t, t),
+            (slice(0, full_h), slice(full_w, w), t, w - full_w),
+            (slice(full_h, h), slice(0, full_w), h - full_h, t),
+            (slice(full_h, h), slice(full_w, w), h - full_h, w - full_w),
+        ):
+            region = image[rows, cols]
+            if region.size == 0:
+                continue
+            region_h, region_w = region.shape[:2]
+            small = cv2.resize(region, (region_w // block_w, region_h // block_h),
+                               interpolation=cv2.INTER_AREA)
+            cv2.resize(small, (region_w, region_h), dst=mosaic[rows, cols],
+                       interpolation=cv2.INTER_NEAREST)
         
         return mosaic
 
 
+@lru_cache(maxsize=None)
+def cel_shading_lut(levels: int) -> np.ndarray:
+    """
+    셀 쉐이딩 H, S, V 양자화 조회 테이블 (1x256, 3채널)
+    채널별로 구간 가운데 값으로 양자화하고, V는 너무 어두운 값을 최소 밝기 근처로 올린다.
+    uint8 배열 연산을 0..255에 그대로 적용해 만들므로 오버플로 동작까지 기존 결과와 같다.
+    """
+    x = np.arange(256, dtype=np.uint8)
+    h_div = 180 // levels
+    s_div = 256 // levels
+    v_div = 256 // levels
+    
+    h = (x // h_div) * h_div + h_div // 2
+    s = (x // s_div) * s_div + s_div // 2
+    v = (x // v_div) * v_div + v_div // 2
+    
+    # 최소 밝기 보정
+    min_brightness = 30
+    mask = v < min_brightness
+    v[mask] = min_brightness + (v[mask] * 50 // min_brightness)
+    
+    lut = np.dstack([h, s, v]).reshape(1, 256, 3)
+    lut.flags.writeable = False
+    return lut
+
+
 class CelShadingProcessor(BaseImageProcessor):
     """셀 쉐이딩 (애니메이션 스타일)"""
     
@@ -246,38 +325,30 @@ class CelShadingProcessor(BaseImageProcessor):
                 'min': 1,
                 'max': 5,
                 'step': 1,
-                'description': '선 굵기'
+                'description': '선 굵기',
+                'scale': 'linear'
             }
         ]
     
-    def process(self, image: np.ndarray, levels=8, with_edges=True, line_thickness=1) -> np.ndarray:
-        # HSV로 변환
+    @classmethod
+    def get_halo(cls, line_thickness=1, **params):
+        # medianBlur(5) 반경 + 적응형 임계값(9) 반경 + 팽창 반경
+        return 2 + 4 + line_thickness // 2 + 1
+    
+    @classmethod
+    def get_cost(cls, **params):
+        return 12.0
+    
+    def process(self, image: np.ndarray, levels=8, with_edges=True, line_thickness=1,
+                features=None) -> np.ndarray:
+        # HSV로 변환 후 채널별 256칸 조회 테이블로 양자화 (제자리)
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        
-        h_div = 180 // levels
-        s_div = 256 // levels
-        v_div = 256 // levels
-        
-        # 색상 양자화
-        hsv[:, :, 0] = (hsv[:, :, 0] // h_div) * h_div + h_div // 2
-        hsv[:, :, 1] = (hsv[:, :, 1] // s_div) * s_div + s_div // 2
-        
-        v = hsv[:, :, 2]
-        v = (v // v_div) * v_div + v_div // 2
-        
-        # 최소 밝기 보정
-        min_brightness = 30
-        mask = v < min_brightness
-        v[mask] = min_brightness + (v[mask] * 50 // min_brightness)
-        
-        hsv[:, :, 2] = np.clip(v, 0, 255)
-        
+        cv2.LUT(hsv, cel_shading_lut(levels), dst=hsv)
         result = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
         
         # 윤곽선 추가
         if with_edges:
-            gray = self.to_gray(image)
-            gray = cv2.medianBlur(gray, 5)
+            gray = ImageFeatures.of(image, features).median_gray(5)
             edges = cv2.adaptiveThreshold(
                 gray, 255,
                 cv2.ADAPTIVE_THRESH_MEAN_C,
@@ -290,7 +361,8 @@ class CelShadingProcessor(BaseImageProcessor):
                 kernel = np.ones((line_thickness, line_thickness), np.uint8)
                 edges = cv2.dilate(edges, kernel, iterations=1)
             
-            # 검은 윤곽선 적용
-            result[edges < 128] = [0, 0, 0]
+            # 검은 윤곽선 적용: edges는 0/255뿐이므로 반전한 값을 마스크로 제자리에서 0으로
+            cv2.bitwise_not(edges, dst=edges)
+            cv2.bitwise_and(result, 0, dst=result, mask=edges)
         
         return result
\ No newline at end of file
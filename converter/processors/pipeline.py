@@ -0,0 +1,399 @@
+# converter/processors/pipeline.py
+"""
+기본 연산 단계의 그래프로 선언하는 스타일 (파이프라인)
+
+스타일을 process 메서드 대신 딕셔너리(JSON으로도 쓸 수 있는)로 선언한다:
+    {
+        'description': '잉크 드로잉',
+        'parameters': [...],                    # get_parameters()와 같은 형식
+        'stages': {
+            'edges': {'op': 'canny', 'threshold1': '$threshold1', 'threshold2': '$threshold2'},
+            'thick': {'op': 'dilate', 'input': 'edges', 'size': '$line_thickness'},
+            'lines': {'op': 'invert', 'input': 'thick'},
+        },
+        'output': 'lines',                      # 생략하면 마지막 단계
+    }
+- 'op'은 STAGES에 등록된 연산, 나머지 키는 연산 인자 ('$이름'은 요청 파라미터 값)
+- 입력은 'input' (단계 이름 하나) 또는 'inputs' (목록), 'image'는 원본 이미지
+- 원본에서 바로 나오는 연산(gray, canny, bilateral 등)은 입력 없이 ImageFeatures로 계산해
+  손으로 작성한 프로세서와도 중간 결과를 공유한다
+
+단계 결과는 (연산, 인자, 입력 단계의 키)로 만든 키로 ImageFeatures에 저장되므로, 같은
+ImageFeatures를 쓰는 여러 스타일(배치 변환, 저장된 이미지 재변환)은 같은 단계를 한 번만
+계산한다. 서로 의존하지 않는 단계는 스레드 풀에서 동시에 실행한다 (OpenCV는 GIL을 놓음).
+타일 여백(get_halo)은 각 연산의 여백을 경로를 따라 더한 최댓값으로 (여백이 None인 지역 연산이
+아닌 단계가 하나라도 있으면 None - 타일로 나누지 않음), 예상 비용(get_cost)은
+각 연산 비용의 합으로 자동 계산한다.
+"""
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .base import BaseImageProcessor
+from .features import ImageFeatures
+
+# 원본 이미지를 가리키는 단계 이름
+SOURCE = 'image'
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    기본 연산
+    inputs가 0이면 fn(features, **인자)로 원본에서 계산하고,
+    아니면 fn(*입력 배열, **인자)로 새 배열을 만든다 (입력은 공유되므로 수정 금지).
+    halo는 결과 한 픽셀이 입력의 몇 픽셀 반경까지 영향을 받는지 (None이면 이미지 전체)
+    cost는 1메가픽셀당 예상 처리 시간 (ms, BaseImageProcessor.get_cost와 같은 단위)
+    """
+    fn: Callable
+    inputs: int
+    halo: Callable[..., Optional[int]]
+    cost: Callable[..., float]
+
+
+STAGES: Dict[str, Stage] = {}
+
+
+def stage(name: str, inputs: int = 1, halo: Union[int, Callable[..., Optional[int]], None] = 0,
+          cost: Union[float, Callable[..., float]] = 1.0):
+    """연산 등록 데코레이터"""
+    def register(fn):
+        STAGES[name] = Stage(fn, inputs,
+                             halo if callable(halo) else (lambda **args: halo),
+                             cost if callable(cost) else (lambda **args: cost))
+        return fn
+    return register
+
+
+def _match_channels(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """그레이스케일과 컬러를 섞을 때 그레이스케일을 BGR로"""
+    if a.ndim == 3 and b.ndim == 2:
+        b = cv2.cvtColor(b, cv2.COLOR_GRAY2BGR)
+    elif a.ndim == 2 and b.ndim == 3:
+        a = cv2.cvtColor(a, cv2.COLOR_GRAY2BGR)
+    return a, b
+
+
+# --- 원본에서 계산하는 연산 (ImageFeatures 공유) ---
+
+@stage('gray', inputs=0)
+def _gray(features):
+    return features.gray()
+
+
+@stage('median_gray', inputs=0, halo=lambda ksize=5, **args: ksize // 2,
+       cost=lambda ksize=5, **args: 4.0 if ksize <= 5 else 20.0)
+def _median_gray(features, ksize=5):
+    return features.median_gray(int(ksize))
+
+
+def _bilateral_cost(d=9, sigma_space=75, iterations=1, **args):
+    # 커널 면적에 비례 (d <= 0이면 OpenCV가 sigma_space로 지름을 정함)
+    diameter = d if d > 0 else 2 * round(sigma_space * 1.5) + 1
+    return 1.6 * diameter * diameter * iterations
+
+
+@stage('bilateral', inputs=0,
+       halo=lambda d=9, iterations=1, **args: d // 2 * iterations if d > 0 else None,
+       cost=_bilateral_cost)
+def _bilateral(features, d=9, sigma_color=75, sigma_space=75, iterations=1):
+    return features.bilateral(int(d), sigma_color, sigma_space, int(iterations))
+
+
+# 히스테리시스는 약한 엣지를 따라 거리 제한 없이 이어지므로 지역 연산이 아님
+@stage('canny', inputs=0, halo=None, cost=15.0)
+def _canny(features, threshold1=50, threshold2=150):
+    return features.canny(threshold1, threshold2)
+
+
+@stage('gradient_magnitude', inputs=0, halo=lambda ksize=3, **args: max(1, ksize // 2), cost=5.0)
+def _gradient_magnitude(features, ksize=3):
+    return features.gradient_magnitude(int(ksize))
+
+
+# --- 입력 배열에서 새 배열을 만드는 연산 ---
+
+@stage('to_gray')
+def _to_gray(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+@stage('to_bgr')
+def _to_bgr(image):
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+
+
+@stage('invert', cost=0.5)
+def _invert(image):
+    return cv2.bitwise_not(image)
+
+
+@stage('gaussian_blur', halo=lambda size=5, **args: size // 2,
+       cost=lambda size=5, **args: 2.0 + 0.2 * size)
+def _gaussian_blur(image, size=5, sigma=0):
+    size = int(size) | 1
+    return cv2.GaussianBlur(image, (size, size), sigma)
+
+
+@stage('median_blur', halo=lambda size=5, **args: size // 2,
+       cost=lambda size=5, **args: 4.0 if size <= 5 else 20.0)
+def _median_blur(image, size=5):
+    return cv2.medianBlur(image, int(size) | 1)
+
+
+@stage('adaptive_threshold', halo=lambda block_size=9, **args: block_size // 2, cost=3.0)
+def _adaptive_threshold(image, block_size=9, c=2, method='mean'):
+    method = cv2.ADAPTIVE_THRESH_MEAN_C if method == 'mean' else cv2.ADAPTIVE_THRESH_GAUSSIAN_C
+    return cv2.adaptiveThreshold(image, 255, method, cv2.THRESH_BINARY, int(block_size), c)
+
+
+@stage('threshold', cost=0.5)
+def _threshold(image, thresh=128, invert=False):
+    kind = cv2.THRESH_BINARY_INV if invert else cv2.THRESH_BINARY
+    return cv2.threshold(image, thresh, 255, kind)[1]
+
+
+def _morphology_halo(size=1, iterations=1, **args):
+    # 커널 반경 x 반복 횟수 (짝수 크기 커널은 중심이 size // 2라 한쪽으로 size // 2까지 닿음)
+    return size // 2 * iterations if size > 1 else 0
+
+
+def _morphology_cost(size=1, iterations=1, **args):
+    return float(iterations) if size > 1 else 0.0
+
+
+@stage('dilate', halo=_morphology_halo, cost=_morphology_cost)
+def _dilate(image, size=1, iterations=1):
+    # 1x1 커널은 원본과 같으므로 그대로 돌려줌
+    if size <= 1:
+        return image
+    return cv2.dilate(image, np.ones((int(size), int(size)), np.uint8), iterations=int(iterations))
+
+
+@stage('erode', halo=_morphology_halo, cost=_morphology_cost)
+def _erode(image, size=1, iterations=1):
+    if size <= 1:
+        return image
+    return cv2.erode(image, np.ones((int(size), int(size)), np.uint8), iterations=int(iterations))
+
+
+@stage('normalize', halo=None, cost=2.0)
+def _normalize(image):
+    """최댓값을 255로 맞춰 uint8로 (float32 곱 한 번 후 절사)"""
+    peak = float(image.max())
+    scaled = np.multiply(image, np.float32(255.0 / peak if peak > 0 else 0.0))
+    return scaled.astype(np.uint8)
+
+
+@stage('bitwise_and', inputs=2)
+def _bitwise_and(a, b):
+    return cv2.bitwise_and(*_match_channels(a, b))
+
+
+@stage('divide', inputs=2, cost=2.0)
+def _divide(a, b, scale=1.0):
+    return cv2.divide(*_match_channels(a, b), scale=scale)
+
+
+@stage('blend', inputs=2, cost=2.0)
+def _blend(a, b, alpha=0.5, gamma=0):
+    a, b = _match_channels(a, b)
+    return cv2.addWeighted(a, alpha, b, 1 - alpha, gamma)
+
+
+# --- 선언 검사와 실행 ---
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    op: str
+    inputs: Tuple[str, ...]
+    args: Tuple[Tuple[str, Any], ...]
+
+
+def _resolve(value, params: Dict[str, Any]):
+    if isinstance(value, str) and value.startswith('$'):
+        return params[value[1:]]
+    return value
+
+
+class Pipeline:
+    """
+    검사를 마친 단계 그래프
+    Raises:
+        ValueError: 모르는 연산, 없는 입력 단계, 순환, 선언하지 않은 파라미터 참조
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        stages = spec.get('stages') or {}
+        if not stages:
+            raise ValueError('파이프라인에 stages가 없습니다.')
+        parameters = {param['name'] for param in spec.get('parameters', [])}
+        nodes = {}
+        for name, declaration in stages.items():
+            if name == SOURCE:
+                raise ValueError(f"'{SOURCE}'는 원본 이미지 이름이라 단계 이름으로 쓸 수 없습니다.")
+            declaration = dict(declaration)
+            op = declaration.pop('op', None)
+            if op not in STAGES:
+                raise ValueError(f"{name}: 모르는 연산 {op!r}. 사용 가능: {sorted(STAGES)}")
+            inputs = declaration.pop('inputs', None)
+            if inputs is None:
+                inputs = [declaration.pop('input')] if 'input' in declaration else []
+            if len(inputs) != STAGES[op].inputs:
+                raise ValueError(f'{name}: {op}은 입력 {STAGES[op].inputs}개가 필요합니다.')
+            try:
+                inspect.signature(STAGES[op].fn).bind(*[None] * max(1, len(inputs)), **declaration)
+            except TypeError as e:
+                raise ValueError(f'{name}: {op} 인자가 잘못되었습니다 ({e})')
+            for value in declaration.values():
+                if isinstance(value, str) and value.startswith('$') and value[1:] not in parameters:
+                    raise ValueError(f'{name}: 선언하지 않은 파라미터 {value}')
+            nodes[name] = Node(name, op, tuple(inputs), tuple(sorted(declaration.items())))
+        for node in nodes.values():
+            for source in node.inputs:
+                if source != SOURCE and source not in nodes:
+                    raise ValueError(f'{node.name}: 없는 입력 단계 {source!r}')
+        self.nodes = nodes
+        self.output = spec.get('output') or list(stages)[-1]
+        if self.output not in nodes:
+            raise ValueError(f'없는 출력 단계 {self.output!r}')
+        self.levels = self._levels()
+
+    def _levels(self) -> List[List[Node]]:
+        """출력에 필요한 단계를 의존 깊이별로 묶음 (같은 깊이끼리는 서로 독립)"""
+        depth: Dict[str, int] = {}
+        visiting = set()
+
+        def visit(name):
+            if name == SOURCE:
+                return -1
+            if name in depth:
+                return depth[name]
+            if name in visiting:
+                raise ValueError(f'단계 그래프에 순환이 있습니다 ({name}).')
+            visiting.add(name)
+            depth[name] = 1 + max((visit(source) for source in self.nodes[name].inputs), default=-1)
+            visiting.discard(name)
+            return depth[name]
+
+        visit(self.output)
+        levels: List[List[Node]] = [[] for _ in range(max(depth.values()) + 1)]
+        for name, level in depth.items():
+            levels[level].append(self.nodes[name])
+        return levels
+
+    def halo(self, params: Dict[str, Any]) -> Optional[int]:
+        """
+        출력 한 픽셀이 의존하는 입력 반경 (경로별 여백 합의 최댓값)
+        출력에 쓰이는 단계 중 하나라도 여백이 None이면 None (타일 처리 불가)
+        """
+        reach: Dict[str, Optional[int]] = {SOURCE: 0}
+        for level in self.levels:
+            for node in level:
+                own = STAGES[node.op].halo(**{key: _resolve(value, params) for key, value in node.args})
+                upstream = [reach[source] for source in node.inputs] or [0]
+                reach[node.name] = (None if own is None or None in upstream
+                                    else int(own) + max(upstream))
+        return reach[self.output]
+
+    def cost(self, params: Dict[str, Any]) -> float:
+        """출력에 필요한 단계 비용의 합 (1메가픽셀당 ms, 다른 스타일과 공유하는 단계도 포함)"""
+        return sum(STAGES[node.op].cost(**{key: _resolve(value, params) for key, value in node.args})
+                   for level in self.levels for node in level)
+
+    def run(self, features: ImageFeatures, params: Dict[str, Any]) -> np.ndarray:
+        """단계를 깊이 순서로 실행 (같은 깊이의 단계는 동시에), 출력 배열 반환"""
+        keys: Dict[str, Any] = {SOURCE: (SOURCE,)}
+        values: Dict[str, np.ndarray] = {SOURCE: features.image}
+
+        def compute(node: Node):
+            args = {key: _resolve(value, params) for key, value in node.args}
+            key = ('stage', node.op, tuple(keys[source] for source in node.inputs),
+                   tuple(sorted(args.items())))
+            definition = STAGES[node.op]
+            if definition.inputs == 0:
+                call = lambda: definition.fn(features, **args)  # noqa: E731
+            else:
+                call = lambda: definition.fn(*(values[source] for source in node.inputs), **args)  # noqa: E731
+            # 출력은 호출한 쪽이 고쳐 쓸 수 있도록 공유 캐시에 넣지 않음
+            value = call() if node.name == self.output else features.get(key, call)
+            return node, key, value
+
+        for level in self.levels:
+            if len(level) == 1:
+                results = [compute(level[0])]
+            else:
+                executor = get_stage_executor()
+                futures = [executor.submit(compute, node) for node in level[1:]]
+                results = [compute(level[0])] + [future.result() for future in futures]
+            for node, key, value in results:
+                keys[node.name], values[node.name] = key, value
+        return values[self.output]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# 독립 단계를 동시에 실행할 스레드 수 (요청 처리 스레드 하나가 함께 실행)
+STAGE_WORKERS = 2
+
+
+def get_stage_executor() -> ThreadPoolExecutor:
+    """독립 단계 실행용 공용 스레드 풀 (단계 안에서 다시 제출하지 않으므로 교착 없음)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS,
+                                               thread_name_prefix='converter-stage')
+    return _executor
+
+
+def pipeline_processor(name: str, spec: Dict[str, Any]) -> type:
+    """
+    선언으로 프로세서 클래스 생성
+    Args:
+        name: 클래스 이름
+        spec: 모듈 설명의 형식 ('description', 'parameters', 'stages', 'output')
+    Raises:
+        ValueError: 선언이 잘못됨
+    """
+    pipeline = Pipeline(spec)
+    parameters = [dict(param) for param in spec.get('parameters', [])]
+    names = {param['name'] for param in parameters}
+
+    class PipelineProcessor(BaseImageProcessor):
+        @classmethod
+        def get_parameters(cls):
+            return [dict(param) for param in parameters]
+
+        @classmethod
+        def get_halo(cls, **params):
+            return pipeline.halo(params)
+
+        @classmethod
+        def get_cost(cls, **params):
+            return pipeline.cost(params)
+
+        def process(self, image: np.ndarray, features=None, **params) -> np.ndarray:
+            unknown = set(params) - names
+            if unknown:
+                raise TypeError(f'{name}.process() got unexpected keyword arguments: {sorted(unknown)}')
+            merged = {**self.default_params(), **params}
+            result = pipeline.run(ImageFeatures.of(image, features), merged)
+            if result.ndim == 2:
+                return cv2.cvtColor(result, cv2.COLOR_GRAY2BGR)
+            # 원본이나 공유 중간 결과를 그대로 출력하는 경우
+            return result if result.flags.writeable else result.copy()
+
+    PipelineProcessor.__name__ = PipelineProcessor.__qualname__ = name
+    PipelineProcessor.__doc__ = spec.get('description', name)
+    PipelineProcessor.pipeline = pipeline
+    PipelineProcessor.spec = spec
+    return PipelineProcessor
@@ -0,0 +1,62 @@
+# converter/processors/raster.py
+import cv2
+import numpy as np
+from functools import lru_cache
+
+# float32 번호 맵이 정확히 표현할 수 있는 최대 번호 (2^24)
+MAX_STAMP_ID = 1 << 24
+
+
+@lru_cache(maxsize=None)
+def disk_kernel(radius: float) -> np.ndarray:
+    """반지름 radius의 채워진 원 모양 커널"""
+    reach = int(np.ceil(radius))
+    dy, dx = np.mgrid[-reach:reach + 1, -reach:reach + 1]
+    return (dy ** 2 + dx ** 2 <= radius ** 2).astype(np.uint8)
+
+
+def new_id_map(shape) -> np.ndarray:
+    """도장 번호 맵 (0 = 비어 있음)"""
+    return np.zeros(shape[:2], dtype=np.float32)
+
+
+def fill_from_id_map(canvas: np.ndarray, id_map: np.ndarray, colors: np.ndarray,
+                     kernel: np.ndarray = None) -> np.ndarray:
+    """
+    번호 맵에 찍힌 도장을 kernel 모양으로 팽창시켜 canvas에 칠한다.
+
+    번호 n(1부터)은 colors[n - 1] 색으로 칠해지고, 겹치는 곳은 번호가 큰
+    도장이 남는다. 즉 번호 순서대로 하나씩 그린 것과 같은 결과가 된다.
+    """
+    h, w = canvas.shape[:2]
+    if kernel is not None and np.count_nonzero(kernel) > 1:
+        id_map = cv2.dilate(id_map, kernel)
+
+    # 번호 -> 색상 팔레트 (0번은 비어 있음), 픽셀당 4바이트로 묶어 한 번에 조회
+    palette = np.zeros((len(colors) + 1, 4), dtype=np.uint8)
+    palette[1:, :3] = colors
+    ids = id_map.astype(np.int32)
+    stamped = palette.view(np.uint32).ravel().take(ids).view(np.uint8)
+    stamped = cv2.cvtColor(stamped.reshape(h, w, 4), cv2.COLOR_BGRA2BGR)
+
+    painted = cv2.compare(id_map, 0, cv2.CMP_GT)
+    cv2.copyTo(stamped, painted, canvas)
+    return canvas
+
+
+def stamp_points(canvas: np.ndarray, ys: np.ndarray, xs: np.ndarray,
+                 colors: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    (ys, xs) 위치마다 kernel 모양 도장을 순서대로 찍는다.
+
+    cv2.circle 등을 점마다 호출하는 루프와 같은 결과를 번호 맵 한 장과
+    팽창 한 번으로 만든다. 점이 MAX_STAMP_ID개를 넘으면 나누어 찍는다.
+    """
+    for begin in range(0, len(ys), MAX_STAMP_ID - 1):
+        end = begin + MAX_STAMP_ID - 1
+        id_map = new_id_map(canvas.shape)
+        id_map[ys[begin:end], xs[begin:end]] = np.arange(
+            1, len(ys[begin:end]) + 1, dtype=np.float32
+        )
+        fill_from_id_map(canvas, id_map, colors[begin:end], kernel)
+    return canvas
@@ -0,0 +1,103 @@
+# converter/processors/tiling.py
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .base import BaseImageProcessor
+from .features import ImageFeatures
+
+
+def tile_spec(processor_class, params: Dict[str, Any]) -> Tuple[Optional[int], int]:
+    """기본값을 채운 파라미터로 (여백, 정렬 배수) 계산 - 여백이 None이면 타일 처리 불가"""
+    merged = {**processor_class.default_params(), **params}
+    return processor_class.get_halo(**merged), max(1, int(processor_class.get_tile_alignment(**merged)))
+
+
+def iter_tiles(height: int, width: int, tile_size: int, halo: int,
+               align: int = 1) -> Iterator[Tuple[slice, slice, slice, slice]]:
+    """
+    겹치는 타일 좌표 생성
+    Yields:
+        (입력 행, 입력 열, 입력 타일 안의 결과 행, 결과 열) 슬라이스
+        - 입력 타일은 결과 타일을 halo만큼 넓힌 영역 (이미지 경계에서 잘림)
+        - 입력 타일의 시작 좌표는 align의 배수
+    """
+    tile_size = max(align, tile_size - tile_size % align)
+    halo = -(-halo // align) * align
+    for y0 in range(0, height, tile_size):
+        y1 = min(y0 + tile_size, height)
+        ey0, ey1 = max(0, y0 - halo), min(height, y1 + halo)
+        for x0 in range(0, width, tile_size):
+            x1 = min(x0 + tile_size, width)
+            ex0, ex1 = max(0, x0 - halo), min(width, x1 + halo)
+            yield (slice(ey0, ey1), slice(ex0, ex1),
+                   slice(y0 - ey0, y1 - ey0), slice(x0 - ex0, x1 - ex0))
+
+
+def process_tiled(processor: BaseImageProcessor, image: np.ndarray, tile_size: int = 1024,
+                  workers: int = 1, **params) -> np.ndarray:
+    """
+    이미지를 여백이 겹치는 타일로 나눠 처리하고 이어 붙인다.
+
+    프로세서가 선언한 여백(get_halo)만큼 넓혀 처리한 뒤 가운데만 잘라 쓰므로
+    결과는 전체 이미지를 한 번에 처리한 것과 같다. 여백이 유한하지 않은 연산(Canny 등)을 쓰는
+    스타일은 get_halo가 None이라 타일로 나누지 않는다. 예외로 OpenCV의 HSV->BGR 변환은
+    SIMD 경로와 버퍼 끝 나머지 픽셀의 스칼라 경로가 반올림이 달라, 이 변환을 쓰는 스타일
+    (cel_shading)은 타일 경계에 따라 픽셀 값이 1 다를 수 있다. 중간 결과(float64 그라디언트 등)는
+    타일 크기에 비례하므로 입력이 아무리 커도 작업 메모리는
+    (동시에 처리하는 타일 수 x 타일 크기)로 제한된다.
+    Raises:
+        ValueError: 타일 처리를 지원하지 않는 프로세서
+    """
+    halo, align = tile_spec(type(processor), params)
+    if halo is None:
+        raise ValueError(f'{type(processor).__name__} does not support tiled processing')
+    h, w = image.shape[:2]
+    output = None
+
+    def run(tile):
+        rows, cols, core_rows, core_cols = tile
+        # 결과 부분만 복사해 두고 타일의 중간 결과는 바로 버림
+        return tile, processor.process(image[rows, cols], **params)[core_rows, core_cols].copy()
+
+    def store(tile, result):
+        nonlocal output
+        rows, cols, core_rows, core_cols = tile
+        if output is None:
+            output = np.empty((h, w) + result.shape[2:], dtype=result.dtype)
+        output[rows.start + core_rows.start:rows.start + core_rows.stop,
+               cols.start + core_cols.start:cols.start + core_cols.stop] = result
+
+    tiles = iter_tiles(h, w, tile_size, halo, align)
+    if workers <= 1:
+        for tile in tiles:
+            store(*run(tile))
+        return output
+
+    # 동시에 처리 중인 타일을 workers개로 제한해 메모리 상한 유지
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='converter-tile') as executor:
+        in_flight = deque()
+        for tile in tiles:
+            if len(in_flight) >= workers:
+                store(*in_flight.popleft().result())
+            in_flight.append(executor.submit(run, tile))
+        while in_flight:
+            store(*in_flight.popleft().result())
+    return output
+
+
+def render(processor: BaseImageProcessor, image: np.ndarray, params: Dict[str, Any],
+           features: Optional[ImageFeatures] = None, tiling: Optional[Dict[str, Any]] = None):
+    """
+    프로세서 실행 - 이미지가 tiling['MIN_PIXELS'] 이상이고 타일 처리를 지원하면 타일로 처리
+    Args:
+        tiling: {'MIN_PIXELS': ..., 'TILE_SIZE': ..., 'WORKERS': ...} (None이면 타일 처리 안 함)
+    """
+    if tiling and image.shape[0] * image.shape[1] >= tiling.get('MIN_PIXELS', 16_000_000):
+        halo, _ = tile_spec(type(processor), params)
+        if halo is not None:
+            return process_tiled(processor, image, tiling.get('TILE_SIZE', 1024),
+                                 tiling.get('WORKERS', 1), **params)
+    return processor.process(image, features=features, **params)
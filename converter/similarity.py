@@ -0,0 +1,136 @@
+# converter/similarity.py
+"""
+지각 해시(pHash)로 거의 같은 업로드를 찾는 색인
+
+메신저 재인코딩, 재압축, EXIF만 바뀐 재업로드는 바이트 해시가 달라 결과 캐시에 걸리지 않는다.
+디코딩한 이미지를 32x32 그레이스케일로 줄여 DCT 저주파 8x8 계수(DC 제외 63개)가
+중앙값보다 큰지를 지문으로 삼고, 같은 크기의 이전 업로드 중 해밍 거리가 max_distance 이하인
+것이 있으면 그 업로드의 digest를 이어받아 결과 캐시와 저장된 디코딩 결과를 함께 쓴다.
+(이웃 픽셀 비교(dHash)는 평평한 영역에서 압축 노이즈로 비트가 쉽게 뒤집혀 쓰지 않음)
+
+지문은 색상과 미세한 노이즈를 보지 않으므로 구도가 같고 색만 다른 이미지도 같은 입력으로 본다.
+그래서 기본은 꺼져 있고 (settings.CONVERTER_SIMILAR_INPUTS), 거리 0~4 정도로만 쓴다.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+HASH_SIZE = 8
+THUMBNAIL_SIZE = 32
+
+
+def fingerprint(image: np.ndarray) -> int:
+    """이미지의 pHash (DCT 저주파 HASH_SIZE x HASH_SIZE 계수 중 DC를 뺀 비트 정수)"""
+    # 컬러 그대로 먼저 줄인 뒤 그레이스케일로 변환 (전체 크기 그레이스케일 변환을 피함)
+    thumbnail = cv2.resize(image, (THUMBNAIL_SIZE, THUMBNAIL_SIZE), interpolation=cv2.INTER_AREA)
+    if thumbnail.ndim == 3:
+        thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+    coefficients = cv2.dct(thumbnail.astype(np.float32))[:HASH_SIZE, :HASH_SIZE].ravel()[1:]
+    bits = np.packbits(coefficients > np.median(coefficients))
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+@dataclass
+class SimilarInput:
+    """색인에 등록된 업로드 (image_id는 디코딩 결과를 저장소에 넣어 둔 경우)"""
+    digest: str
+    image_id: Optional[str] = None
+    distance: int = 0
+
+
+class SimilarityIndex:
+    """
+    (원본 높이, 너비)별 지문 -> 업로드 digest 색인.
+    max_entries개를 넘으면 가장 오래 쓰지 않은 지문부터 제거한다.
+    조회는 같은 크기의 지문만 훑으므로 크기가 다양하면 거의 상수 시간이다.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_distance: int = 4):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.lookups = 0
+        self.matches = 0
+        self._order = OrderedDict()
+        self._by_shape: Dict[Tuple[int, int], Dict[int, SimilarInput]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, value: int, shape: Tuple[int, int]) -> Optional[SimilarInput]:
+        """같은 크기에서 해밍 거리가 가장 가까운 (max_distance 이하) 업로드"""
+        shape = tuple(shape[:2])
+        with self._lock:
+            self.lookups += 1
+            bucket = self._by_shape.get(shape, {})
+            if value in bucket:
+                best_value, best_distance = value, 0
+            else:
+                best_value, best_distance = None, self.max_distance + 1
+                for candidate in bucket:
+                    distance = bin(candidate ^ value).count('1')
+                    if distance < best_distance:
+                        best_value, best_distance = candidate, distance
+            if best_value is None:
+                return None
+            self.matches += 1
+            self._order.move_to_end((shape, best_value))
+            best = bucket[best_value]
+            return SimilarInput(best.digest, best.image_id, best_distance)
+
+    def add(self, value: int, shape: Tuple[int, int], digest: str,
+            image_id: Optional[str] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        shape = tuple(shape[:2])
+        with self._lock:
+            self._by_shape.setdefault(shape, {})[value] = SimilarInput(digest, image_id)
+            self._order[(shape, value)] = None
+            self._order.move_to_end((shape, value))
+            while len(self._order) > self.max_entries:
+                (old_shape, old_value), _ = self._order.popitem(last=False)
+                bucket = self._by_shape[old_shape]
+                del bucket[old_value]
+                if not bucket:
+                    del self._by_shape[old_shape]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._order.clear()
+            self._by_shape.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._order),
+            'max_entries': self.max_entries,
+            'max_distance': self.max_distance,
+            'lookups': self.lookups,
+            'matches': self.matches,
+        }
+
+
+_similarity_index = None
+_similarity_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> Optional[SimilarityIndex]:
+    """settings.CONVERTER_SIMILAR_INPUTS로 만든 프로세스 공용 색인 (꺼져 있으면 None)"""
+    global _similarity_index
+    if _similarity_index is None:
+        with _similarity_index_lock:
+            if _similarity_index is None:
+                config = getattr(settings, 'CONVERTER_SIMILAR_INPUTS', {})
+                _similarity_index = SimilarityIndex(
+                    max_entries=config.get('MAX_ENTRIES', 4096),
+                    max_distance=config.get('MAX_DISTANCE', 4),
+                ) if config.get('ENABLED') else False
+    return _similarity_index or None
+
+
+def reset_similarity_index() -> None:
+    """설정 변경 후 색인을 다시 만들도록 초기화 (테스트용)"""
+    global _similarity_index
+    with _similarity_index_lock:
+        _similarity_index = None
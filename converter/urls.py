@@ -1,8 +1,20 @@
 # converter/urls.py
 from django.urls import path
+from .async_views import convert_image_async
 from .views import ImageViewSet
 
 urlpatterns = [
     path('', ImageViewSet.as_view({'post': 'convert_image'}), name='convert'),
+    path('async/', convert_image_async, name='convert-async'),
     path('styles/', ImageViewSet.as_view({'get': 'styles'}), name='styles'),
+    path('images/', ImageViewSet.as_view({'post': 'upload_image'}), name='images'),
+    path('images/<str:image_id>/', ImageViewSet.as_view({'delete': 'delete_image'}),
+         name='image-detail'),
+    path('batch/', ImageViewSet.as_view({'post': 'batch_convert'}), name='batch'),
+    path('jobs/', ImageViewSet.as_view({'post': 'submit_job'}), name='jobs'),
+    path('jobs/<str:job_id>/', ImageViewSet.as_view({'get': 'job_status'}), name='job-detail'),
+    path('jobs/<str:job_id>/result/', ImageViewSet.as_view({'get': 'job_result'}),
+         name='job-result'),
+    path('cache/', ImageViewSet.as_view({'get': 'cache_stats'}), name='cache-stats'),
+    path('metrics/', ImageViewSet.as_view({'get': 'metrics'}), name='metrics'),
 ]
\ No newline at end of file
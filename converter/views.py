@@ -1,68 +1,747 @@
 # converter/views.py
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
 from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import action
-from PIL import Image
 import numpy as np
-import io
 import cv2
 import base64
 import json
+from urllib.parse import quote
+
+from .processors import ImageFeatures, ProcessorFactory, render
+from .encoding import (
+    AUTO_FORMAT, encode_image, format_from_accept, json_options, parse_format, resolve_options
+)
+from .jobs import DONE, FAILED, QueueFull, get_job_queue
+from .admission import Overloaded, get_admission, retry_after_header
+from .animation import VIDEO, convert_media, probe_media
+from .batch import parse_batch_items, run_batch
+from .cache import file_digest, get_result_cache, make_cache_key
+from .concurrency import tiling_config
+from .cost import budget_factor, estimate_cost
+from .decoding import ImageTooLarge, decode_image, probe_image
+from .image_store import ImageNotFound, get_image_store
+from .metrics import StageTimer, render_metrics, timed
+from .similarity import fingerprint, get_similarity_index
+
+
+def max_pixels() -> int:
+    """디코딩을 허용하는 최대 픽셀 수 (settings.CONVERTER_DECODE)"""
+    return getattr(settings, 'CONVERTER_DECODE', {}).get('MAX_PIXELS')
+
+
+def preview_scale(shape, max_edge: int) -> float:
+    """긴 변을 max_edge 이하로 줄이는 배율 (이미 작으면 1.0)"""
+    long_edge = max(shape[:2])
+    return min(1.0, max_edge / long_edge)
+
+
+def downscale_to(image: np.ndarray, factor: float, shape=None) -> np.ndarray:
+    """
+    이미지를 factor 배로 축소
+    Args:
+        shape: factor의 기준이 되는 원본 (높이, 너비) - 이미 줄여서 디코딩한 이미지일 때
+    """
+    if factor >= 1.0:
+        return image
+    h, w = (shape or image.shape)[:2]
+    size = (max(1, round(w * factor)), max(1, round(h * factor)))
+    if size == (image.shape[1], image.shape[0]):
+        return image
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def upload_bytes(upload) -> bytes:
+    """업로드 파일 전체 바이트 (다른 워커가 image_id로 디코딩할 수 있게 저장소에 넣을 원본)"""
+    upload.seek(0)
+    return upload.read()
+
+
+def parse_params(data) -> dict:
+    """
+    요청 데이터의 params (JSON 문자열 또는 딕셔너리)를 딕셔너리로
+    Raises:
+        ValueError: JSON 객체가 아님 (스키마 검사와 같이 400으로 응답)
+    """
+    params = data.get('params', '{}')
+    if isinstance(params, str):
+        try:
+            params = json.loads(params) if params.strip() else {}
+        except json.JSONDecodeError as e:
+            raise ValueError(f'params는 JSON 객체여야 합니다 ({e}).')
+    if not isinstance(params, dict):
+        raise ValueError('params는 JSON 객체여야 합니다.')
+    return params
+
+
+class SourceImage:
+    """
+    요청의 입력 이미지 - image_id로 저장된 이미지 또는 업로드 파일 (디코딩은 필요할 때)
+    업로드는 헤더만 먼저 읽어 픽셀 수가 너무 크면 디코딩 전에 ImageTooLarge로 거절한다.
+    """
+    
+    def __init__(self, data, max_edge=None, timer=None):
+        """
+        Args:
+            data: 요청 데이터 (DRF request.data 또는 POST와 FILES를 합친 딕셔너리)
+            max_edge: 필요한 긴 변 길이 - 주면 JPEG은 그 이상인 범위에서 줄여서 디코딩
+            timer: 읽기('read')와 디코딩('decode') 시간을 기록할 StageTimer
+        """
+        self.max_edge = max_edge
+        self.timer = timer
+        if 'image_id' in data:
+            self.image_id = data['image_id']
+            stored = get_image_store().get(self.image_id)
+            if stored is None:
+                raise ImageNotFound('이미지를 찾을 수 없거나 만료되었습니다.')
+            self.file_name, self.digest = stored.file_name, stored.digest
+            self.upload, self.info, self._image = None, None, stored.image
+            self._features = stored.features
+        else:
+            self.upload = data['image']
+            self.image_id = None
+            self.file_name = self.upload.name
+            with timed(timer, 'read'):
+                self.info = probe_image(self.upload, max_pixels())
+                self.digest = file_digest(self.upload)
+            self._image = self._features = None
+    
+    @property
+    def decoded(self) -> bool:
+        return self._image is not None
+    
+    @property
+    def shape(self):
+        """원본 (높이, 너비) - 줄여서 디코딩했어도 원본 기준"""
+        return self.info.shape if self.info is not None else self._image.shape[:2]
+    
+    @property
+    def image(self) -> np.ndarray:
+        """OpenCV 형식(BGR) 이미지 (max_edge를 줬으면 원본보다 작을 수 있음)"""
+        if self._image is None:
+            with timed(self.timer, 'decode'):
+                self._image = decode_image(self.upload, max_edge=self.max_edge, info=self.info)
+        return self._image
+    
+    @property
+    def features(self) -> ImageFeatures:
+        """중간 결과 컨텍스트 (저장된 이미지는 재변환 요청끼리 공유)"""
+        if self._features is None:
+            self._features = ImageFeatures(self.image)
+        return self._features
+    
+    def match_similar(self, index) -> bool:
+        """
+        지각 해시 색인에서 거의 같은 이전 업로드(같은 원본 크기)를 찾아 그 digest를 이어받음
+        그 업로드의 디코딩 결과가 저장소에 남아 있으면 중간 결과까지 함께 씀
+        비슷한 업로드가 없으면 이번 입력을 등록. digest가 바뀌었으면 True
+        (지문은 디코딩한 이미지로 계산하므로 아직 디코딩 전이면 여기서 디코딩함)
+        """
+        if self.upload is None:
+            return False
+        with timed(self.timer, 'fingerprint'):
+            value = fingerprint(self.image)
+        match = index.lookup(value, self.shape)
+        if match is None:
+            index.add(value, self.shape, self.digest, self.image_id)
+            return False
+        if match.image_id and self.image_id is None:
+            stored = get_image_store().get(match.image_id)
+            if stored is not None and stored.digest == match.digest:
+                self.image_id = match.image_id
+                self._image, self._features = stored.image, stored.features
+        changed = match.digest != self.digest
+        self.digest = match.digest
+        return changed
+    
+    def store(self):
+        """
+        디코딩한 이미지를 저장소에 넣고 image_id 반환 (이미 저장된 이미지면 그대로)
+        아직 디코딩하지 않았고 (결과 캐시 적중) 워커끼리 공유하는 저장소면 원본 바이트만 넣고
+        디코딩은 그 image_id로 재변환을 요청할 때 한다.
+        줄여서 디코딩한 이미지는 전체 해상도 재변환에 쓸 수 없으므로 저장하지 않음 (None)
+        """
+        if self.image_id is not None:
+            return self.image_id
+        store = get_image_store()
+        if not self.decoded and store.shared is not None:
+            self.image_id = store.put_source(upload_bytes(self.upload), self.digest,
+                                             self.file_name, self.shape)
+        elif self.image.shape[:2] == tuple(self.shape):
+            self.image_id = store.put(self.image, self.digest, self.file_name,
+                                      source=upload_bytes(self.upload))
+        return self.image_id
+
+
+def batch_line(item, encoded=None, cache_status=None, error=None) -> bytes:
+    """배치 결과 한 줄 (NDJSON)"""
+    line = {
+        'index': item.index,
+        'style': item.style,
+        'params': item.params,
+    }
+    if error is not None:
+        line['error'] = f'이미지 처리 중 오류 발생: {error}'
+    else:
+        line.update({
+            'format': item.encoder_options.format,
+            'content_type': item.encoder_options.content_type,
+            'image_base64': base64.b64encode(encoded).decode('ascii'),
+        })
+        if cache_status:
+            line['cache'] = cache_status
+    return json.dumps(line, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def describe_result(response, file_name, style, params, extension):
+    """바이너리 응답에 파일 이름과 변환 정보 헤더를 붙임"""
+    stem = file_name.rsplit('.', 1)[0] or 'image'
+    download_name = quote(f"{stem}_{style}{extension}")
+    response['Content-Disposition'] = f"inline; filename*=UTF-8''{download_name}"
+    response['X-File-Name'] = quote(file_name)
+    response['X-Style'] = style
+    response['X-Params'] = json.dumps(params)
+    return response
+
+
+def image_response(file_name, style, params, encoded, encoder_options,
+                   cache_status=None, extra=None) -> HttpResponse:
+    """이미지 바이트를 본문으로, 메타데이터는 헤더로 보내는 바이너리 응답"""
+    response = HttpResponse(encoded, content_type=encoder_options.content_type)
+    describe_result(response, file_name, style, params, encoder_options.extension)
+    if extra:
+        response['X-Preview'] = json.dumps(extra)
+    if cache_status:
+        response['X-Cache'] = cache_status
+    return response
+
+
+def is_truthy(value) -> bool:
+    """폼 데이터의 'true'/'1' 등을 bool로 변환"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
 
-from .processors import ProcessorFactory
 
 class ImageViewSet(viewsets.ViewSet):
     parser_classes = (MultiPartParser, FormParser)
 
     def convert_image(self, request):
-        if 'image' not in request.data:
+        if 'image' not in request.data and 'image_id' not in request.data:
             return Response({'error': '이미지 파일이 누락되었습니다.'}, 
                             status=status.HTTP_400_BAD_REQUEST)
         
+        # 비동기 모드: 작업 큐에 등록하고 job_id 반환
+        if is_truthy(request.data.get('async')):
+            return self.submit_job(request)
+        
         # 변환 스타일 선택 (기본값: pencil_sketch)
         style = request.data.get('style', 'pencil_sketch')
         
-        # 파라미터 가져오기 (JSON 문자열로 받음)
-        params_str = request.data.get('params', '{}')
-        try:
-            params = json.loads(params_str) if isinstance(params_str, str) else params_str
-        except json.JSONDecodeError:
-            params = {}
+        # 단계별 소요 시간 (스타일, 입력 크기별 히스토그램과 Server-Timing 헤더)
+        timer = StageTimer('convert')
         
-        uploaded_file = request.data['image']
-
         try:
-            # 1. 파일 로드 및 OpenCV 포맷으로 변환
-            image_data = uploaded_file.read()
-            image = Image.open(io.BytesIO(image_data))
-            numpy_image = np.array(image.convert('RGB')) 
-            cv_image = cv2.cvtColor(numpy_image, cv2.COLOR_RGB2BGR)
+            # 파라미터 가져오기 (JSON 문자열로 받음, 형식이 잘못되면 400)
+            params = parse_params(request.data)
+            
+            # 미리보기 모드: 긴 변을 preview_size로 줄여서 변환
+            preview_size = None
+            if is_truthy(request.data.get('preview')):
+                preview_size = int(request.data.get('preview_size',
+                                                    settings.CONVERTER_PREVIEW_SIZE))
+                if preview_size <= 0:
+                    raise ValueError('preview_size는 1 이상이어야 합니다.')
+            
+            # 최대 출력 크기: 긴 변을 max_size 이하로 줄여서 변환 (JPEG은 디코딩 단계에서 축소)
+            max_size = None
+            if request.data.get('max_size') not in (None, ''):
+                max_size = int(request.data['max_size'])
+                if max_size <= 0:
+                    raise ValueError('max_size는 1 이상이어야 합니다.')
+            
+            # 움직이는 GIF/WebP와 동영상은 프레임 단위로 변환 (움직이는 이미지의 미리보기는 첫 프레임만)
+            if 'image' in request.data:
+                with timer.stage('read'):
+                    media = probe_media(request.data['image'], max_pixels())
+                if media is not None and media.kind == VIDEO and preview_size:
+                    raise ValueError('동영상은 미리보기를 지원하지 않습니다.')
+                if media is not None and not preview_size:
+                    return self.convert_frames(request, media, style, params, max_size, timer)
+            
+            # 1. 파일 로드 (image_id가 있으면 저장해 둔 디코딩 결과 사용)
+            #    미리보기는 전체 해상도 재변환을 위해 원본을 저장하므로 줄여서 디코딩하지 않음
+            source = SourceImage(request.data, max_edge=None if preview_size else max_size, timer=timer)
+            file_name = source.file_name
+            
+            processor_class = ProcessorFactory.get_processor_class(style)
+            params = processor_class.clean_params(params)
+            timer.label(style=style, shape=source.shape)
+            
+            preview_info = None
+            if preview_size is not None:
+                # image_id는 캐시 적중 여부를 안 뒤에 채움 (전체 해상도 재변환용 원본 저장)
+                factor = preview_scale(source.shape, preview_size)
+                preview_info = {
+                    'image_id': None,
+                    'preview_size': preview_size,
+                    'scale': factor,
+                    'preview_params': processor_class.scale_params(params, factor)
+                }
+            
+            # 응답 방식: format 파라미터나 Accept 헤더가 이미지면 바이너리, 아니면 기존 JSON(PNG)
+            if 'format' in request.data:
+                output_format = parse_format(request.data['format'])
+            else:
+                output_format = format_from_accept(request.META.get('HTTP_ACCEPT', ''))
+            binary = output_format is not None
+            
+            # 인코딩 옵션: 바이너리는 요청 포맷 또는 스타일별 기본 포맷, JSON은 예전 레벨의 PNG
+            if binary:
+                encoder_options = resolve_options(
+                    style, output_format,
+                    quality=request.data.get('quality'),
+                    compression=request.data.get('compression')
+                )
+            else:
+                encoder_options = json_options(request.data.get('compression'))
+            
+            # 같은 이미지 + 스타일 + 파라미터로 이미 변환한 결과가 있으면 디코딩과 예산 검사 없이 바로 반환
+            # (키는 업로드 바이트의 digest와 파라미터로만 만듦)
+            result_cache = get_result_cache()
+            cache_key = None
+            
+            def cache_lookup():
+                variant = [encoder_options.cache_variant]
+                if preview_size:
+                    variant.append(f'preview:{preview_size}')
+                elif max_size:
+                    variant.append(f'max:{max_size}')
+                key = make_cache_key(source.digest, style, params, ':'.join(variant))
+                with timer.stage('cache'):
+                    return key, result_cache.lookup(key)
+            
+            def cache_hit(cached, cache_status):
+                if preview_info is not None:
+                    preview_info['image_id'] = source.store()
+                return timer.attach(self._success_response(
+                    file_name, style, params, cached, encoder_options, binary,
+                    cache_status=cache_status, extra=preview_info, timer=timer
+                ))
+            
+            if result_cache is not None:
+                cache_key, cached = cache_lookup()
+                if cached is not None:
+                    return cache_hit(cached, 'HIT')
             
-            # 2. 선택된 스타일로 변환 (파라미터 포함)
-            processor = ProcessorFactory.get_processor(style)
-            converted_image = processor.process(cv_image, **params)
+            # 예상 처리 비용이 예산을 넘으면 디코딩 전에 거절
+            # (ON_EXCEED='downscale'이면 예산에 맞는 max_size로 줄여서 변환, 미리보기는 항상 거절)
+            limit = preview_size or max_size
+            factor = preview_scale(source.shape, limit) if limit else 1.0
+            cost = estimate_cost(
+                style, [side * factor for side in source.shape],
+                processor_class.scale_params(params, factor) if factor < 1.0 else params
+            )
+            fit = budget_factor(cost, allow_downscale=preview_size is None)
+            if fit < 1.0:
+                max_size = max(1, int(max(source.shape) * factor * fit))
+                source.max_edge = max_size
+                cost *= fit * fit
+                # 예산에 맞춰 줄인 결과는 줄인 max_size의 키로 저장되어 있음
+                if result_cache is not None:
+                    cache_key, cached = cache_lookup()
+                    if cached is not None:
+                        return cache_hit(cached, 'HIT')
             
-            # 3. 변환된 이미지를 Base64 문자열로 인코딩
-            _, buffer = cv2.imencode('.png', converted_image) 
-            base64_encoded_image = base64.b64encode(buffer).decode('utf-8')
+            # 바이트는 다르지만 거의 같은 이미지(재압축, 재인코딩)를 변환한 적이 있으면
+            # 그 이미지의 결과 캐시 항목을 쓰고, 새 결과도 그 digest로 저장
+            similar_inputs = get_similarity_index()
+            if similar_inputs is not None and source.match_similar(similar_inputs):
+                if result_cache is not None:
+                    cache_key, cached = cache_lookup()
+                    if cached is not None:
+                        return cache_hit(cached, 'SIMILAR')
+            
+            # 예상 CPU 시간만큼 토큰을 꺼낸 뒤 디코딩/변환 (모자라면 잠시 기다리고, 그래도 없으면 503)
+            admission = get_admission()
+            if admission is not None:
+                with timer.stage('admission'):
+                    admission.acquire(cost / 1000)
+            
+            if preview_info is not None:
+                # 전체 해상도 렌더링 요청에 쓸 수 있도록 디코딩한 원본을 저장해 둠
+                preview_info['image_id'] = source.store()
+            
+            # OpenCV 포맷으로 변환
+            cv_image = source.image
+            
+            # 2. 선택된 스타일로 변환 (파라미터 포함, 미리보기는 축소 이미지와 조정된 파라미터)
+            #    아주 큰 이미지는 타일로 나눠 처리해 작업 메모리를 제한
+            processor = processor_class()
+            with timer.stage('process'):
+                if preview_info is None and max_size and preview_scale(source.shape, max_size) < 1.0:
+                    factor = preview_scale(source.shape, max_size)
+                    converted_image = processor.process(downscale_to(cv_image, factor, source.shape),
+                                                        **processor_class.scale_params(params, factor))
+                elif preview_info is None:
+                    converted_image = render(processor, cv_image, params, features=source.features,
+                                             tiling=tiling_config())
+                else:
+                    preview_image = downscale_to(cv_image, preview_info['scale'])
+                    converted_image = processor.process(preview_image,
+                                                        **preview_info['preview_params'])
+            
+            # 3. 변환된 이미지를 요청한 포맷으로 인코딩
+            with timer.stage('encode'):
+                encoded = encode_image(converted_image, encoder_options)
+            if cache_key is not None:
+                result_cache.set(cache_key, encoded)
             
             # 4. 최종 응답
-            return Response({
-                'message': '이미지 변환 성공',
-                'file_name': uploaded_file.name,
-                'style': style,
-                'params': params,
-                'sketch_image_base64': base64_encoded_image
-            }, status=status.HTTP_200_OK)
+            return timer.attach(self._success_response(
+                file_name, style, params, encoded, encoder_options, binary,
+                cache_status='MISS' if cache_key else None, extra=preview_info, timer=timer
+            ))
 
+        except ImageNotFound as e:
+            return Response({'error': str(e)}, 
+                            status=status.HTTP_404_NOT_FOUND)
+        except ImageTooLarge as e:
+            return Response({'error': str(e)}, 
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except Overloaded as e:
+            response = Response({'error': str(e)}, 
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = retry_after_header(e)
+            return response
+        except ValueError as e:
+            return Response({'error': str(e)}, 
+                            status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': f'이미지 처리 중 오류 발생: {str(e)}'}, 
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def convert_frames(self, request, media, style, params, max_size, timer):
+        """
+        여러 프레임 업로드를 프레임마다 변환해 움직이는 이미지는 GIF, 동영상은 MP4로 응답
+        비용은 프레임 하나의 예상 비용 x 프레임 수로 검사하고 (넘으면 모든 프레임을 같은 배율로 축소),
+        동영상이 헤더에 적힌 것보다 프레임이 많으면 넘는 프레임마다 비용을 더 매겨
+        예산을 넘는 순간 멈춘다 (413).
+        결과가 커질 수 있어 결과 캐시와 비슷한 입력 색인은 쓰지 않는다.
+        """
+        upload = request.data['image']
+        processor_class = ProcessorFactory.get_processor_class(style)
+        params = processor_class.clean_params(params)
+        timer.label(style=style, shape=media.shape)
+        
+        factor = preview_scale(media.shape, max_size) if max_size else 1.0
+        cost = estimate_cost(
+            style, [side * factor for side in media.shape],
+            processor_class.scale_params(params, factor) if factor < 1.0 else params
+        ) * media.frames
+        fit = budget_factor(cost, allow_downscale=True)
+        factor *= fit
+        cost *= fit * fit
+        frame_cost = cost / media.frames
+        frame_params = processor_class.scale_params(params, factor) if factor < 1.0 else params
+        
+        admission = get_admission()
+        if admission is not None:
+            with timer.stage('admission'):
+                admission.acquire(cost / 1000)
+        
+        def charge(count):
+            # 헤더의 프레임 수만큼은 위에서 냈으므로 그 뒤 프레임만 예산 검사 후 토큰을 더 꺼냄
+            if count <= media.frames:
+                return
+            budget_factor(frame_cost * count)
+            if admission is not None:
+                admission.acquire(frame_cost / 1000)
+        
+        processor = ProcessorFactory.get_processor(style)
+        
+        def process(frame):
+            return processor.process(downscale_to(frame, factor, media.shape), **frame_params)
+        
+        converted = convert_media(upload, media, process, timer, charge=charge)
+        
+        accept = request.META.get('HTTP_ACCEPT', '')
+        if ('format' in request.data or converted.content_type in accept
+                or format_from_accept(accept) is not None):
+            response = FileResponse(converted.file, content_type=converted.content_type)
+            describe_result(response, upload.name, style, params, converted.extension)
+            response['X-Frames'] = str(converted.frames)
+            return timer.attach(response)
+        
+        with converted.file, timed(timer, 'base64'):
+            image_base64 = base64.b64encode(converted.file.read()).decode('utf-8')
+        return timer.attach(Response({
+            'message': '이미지 변환 성공',
+            'file_name': upload.name,
+            'style': style,
+            'params': params,
+            'content_type': converted.content_type,
+            'frames': converted.frames,
+            'sketch_image_base64': image_base64
+        }, status=status.HTTP_200_OK))
+    
+    def submit_job(self, request):
+        """
+        변환을 작업 큐에 등록하고 상태/결과 조회 URL 반환 (결과는 항상 바이너리 이미지)
+        입장 제어 버킷은 거치지 않음 (작업 풀 크기와 MAX_PENDING이 제한, converter/admission.py 참고)
+        """
+        if 'image' not in request.data and 'image_id' not in request.data:
+            return Response({'error': '이미지 파일이 누락되었습니다.'}, 
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        style = request.data.get('style', 'pencil_sketch')
+        
+        try:
+            params = parse_params(request.data)
+            source = SourceImage(request.data)
+            params = ProcessorFactory.get_processor_class(style).clean_params(params)
+            budget_factor(estimate_cost(style, source.shape, params))
+            encoder_options = resolve_options(
+                style, parse_format(request.data.get('format', AUTO_FORMAT)),
+                quality=request.data.get('quality'),
+                compression=request.data.get('compression')
+            )
+            
+            # 이미 변환한 결과가 있으면 완료된 작업으로 바로 등록
+            job_queue = get_job_queue()
+            result_cache = get_result_cache()
+            cache_key = cached = None
+            if result_cache is not None:
+                cache_key = make_cache_key(source.digest, style, params,
+                                           encoder_options.cache_variant)
+                cached = result_cache.lookup(cache_key)
+            if cached is not None:
+                job = job_queue.add_completed(style, params, encoder_options, cached,
+                                              source.file_name)
+            else:
+                job = job_queue.submit(source.image, style, params, encoder_options,
+                                       source.file_name, cache_key)
+        except ImageNotFound as e:
+            return Response({'error': str(e)}, 
+                            status=status.HTTP_404_NOT_FOUND)
+        except ImageTooLarge as e:
+            return Response({'error': str(e)}, 
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except QueueFull as e:
+            response = Response({'error': str(e)}, 
+                                status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(settings.CONVERTER_JOBS.get('RETRY_AFTER', 5))
+            return response
+        except ValueError as e:
+            return Response({'error': str(e)}, 
+                            status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': f'이미지 처리 중 오류 발생: {str(e)}'}, 
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response({
+            **job.to_dict(),
+            'status_url': reverse('job-detail', args=[job.id]),
+            'result_url': reverse('job-result', args=[job.id])
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    def job_status(self, request, job_id=None):
+        """작업 상태 반환 (?wait=초 를 주면 끝날 때까지 최대 그만큼 대기)"""
+        try:
+            wait = float(request.query_params.get('wait', 0))
+        except ValueError:
+            wait = 0
+        wait = min(max(wait, 0), settings.CONVERTER_JOBS.get('MAX_WAIT', 30))
+        
+        job = get_job_queue().wait(job_id, wait)
+        if job is None:
+            return Response({'error': '작업을 찾을 수 없거나 만료되었습니다.'},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            **job.to_dict(),
+            'result_url': reverse('job-result', args=[job.id])
+        })
+    
+    def job_result(self, request, job_id=None):
+        """완료된 작업의 변환 이미지 반환"""
+        job = get_job_queue().get(job_id, with_result=True)
+        if job is None:
+            return Response({'error': '작업을 찾을 수 없거나 만료되었습니다.'},
+                            status=status.HTTP_404_NOT_FOUND)
+        if job.status == FAILED:
+            return Response({**job.to_dict(), 'error': f'이미지 처리 중 오류 발생: {job.error}'},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if job.status != DONE:
+            return Response({**job.to_dict(), 'error': '작업이 아직 끝나지 않았습니다.'},
+                            status=status.HTTP_409_CONFLICT)
+        return self._success_response(job.file_name, job.style, job.params, job.result,
+                                      job.encoder_options, binary=True)
+    
+    def batch_convert(self, request):
+        """
+        한 이미지를 여러 스타일로 변환 (디코딩은 한 번, 스타일은 병렬)
+        결과는 끝나는 순서대로 한 줄에 하나씩 NDJSON으로 스트리밍한다.
+        """
+        if 'image' not in request.data and 'image_id' not in request.data:
+            return Response({'error': '이미지 파일이 누락되었습니다.'}, 
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            source = SourceImage(request.data)
+            items = parse_batch_items(request.data.get('styles'),
+                                      settings.CONVERTER_BATCH.get('MAX_ITEMS', 16))
+            output_format = parse_format(request.data.get('format', AUTO_FORMAT))
+            
+            # 캐시에 있는 결과는 바로 보내고 나머지만 변환
+            result_cache = get_result_cache()
+            cached_lines, pending = [], []
+            for item in items:
+                item.encoder_options = resolve_options(
+                    item.style, output_format,
+                    quality=request.data.get('quality'),
+                    compression=request.data.get('compression')
+                )
+                if result_cache is not None:
+                    item.cache_key = make_cache_key(source.digest, item.style, item.params,
+                                                    item.encoder_options.cache_variant)
+                    cached = result_cache.lookup(item.cache_key)
+                    if cached is not None:
+                        cached_lines.append(batch_line(item, cached, 'HIT'))
+                        continue
+                pending.append(item)
+            # 변환할 스타일 전체의 예상 비용으로 예산 검사와 입장 제어 (디코딩 전)
+            cost = sum(estimate_cost(item.style, source.shape, item.params) for item in pending)
+            budget_factor(cost)
+            admission = get_admission()
+            if admission is not None and pending:
+                admission.acquire(cost / 1000)
+            image = source.image if pending else None
+        except ImageNotFound as e:
+            return Response({'error': str(e)}, 
+                            status=status.HTTP_404_NOT_FOUND)
+        except ImageTooLarge as e:
+            return Response({'error': str(e)}, 
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except Overloaded as e:
+            response = Response({'error': str(e)}, 
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = retry_after_header(e)
+            return response
         except ValueError as e:
             return Response({'error': str(e)}, 
                             status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': f'이미지 처리 중 오류 발생: {str(e)}'}, 
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        def stream():
+            yield from cached_lines
+            if not pending:
+                return
+            for item, result in run_batch(image, pending, source.features):
+                if isinstance(result, Exception):
+                    yield batch_line(item, error=str(result))
+                    continue
+                if item.cache_key is not None:
+                    result_cache.set(item.cache_key, result)
+                yield batch_line(item, result, 'MISS' if item.cache_key else None)
+        
+        response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+        response['X-File-Name'] = quote(source.file_name)
+        response['X-Batch-Count'] = str(len(items))
+        return response
+    
+    def upload_image(self, request):
+        """이미지를 한 번 업로드/디코딩해 두고 이후 변환에 쓸 image_id 반환"""
+        if 'image' not in request.data:
+            return Response({'error': '이미지 파일이 누락되었습니다.'}, 
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        uploaded_file = request.data['image']
+        try:
+            cv_image = decode_image(uploaded_file, max_pixels=max_pixels())
+        except ImageTooLarge as e:
+            return Response({'error': str(e)},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except Exception as e:
+            return Response({'error': f'이미지를 읽을 수 없습니다: {str(e)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        store = get_image_store()
+        image_id = store.put(cv_image, file_digest(uploaded_file), uploaded_file.name,
+                             source=upload_bytes(uploaded_file))
+        if image_id is None:
+            return Response({'error': '이미지가 너무 커서 저장할 수 없습니다.'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        
+        h, w = cv_image.shape[:2]
+        return Response({
+            'image_id': image_id,
+            'file_name': uploaded_file.name,
+            'width': w,
+            'height': h,
+            'expires_in': store.ttl
+        }, status=status.HTTP_201_CREATED)
+    
+    def delete_image(self, request, image_id=None):
+        """저장해 둔 이미지 삭제"""
+        if not get_image_store().delete(image_id):
+            return Response({'error': '이미지를 찾을 수 없거나 만료되었습니다.'},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    def perform_content_negotiation(self, request, force=False):
+        # Accept가 image/*여도 406 대신 JSON 렌더러로 협상 (이미지는 HttpResponse로 직접 반환)
+        return super().perform_content_negotiation(request, force=True)
+    
+    def _success_response(self, file_name, style, params, encoded, encoder_options,
+                          binary=False, cache_status=None, extra=None, timer=None):
+        """
+        인코딩된 이미지 바이트로 성공 응답 생성
+        binary면 이미지 바이트를 그대로 본문으로 보내고 메타데이터는 헤더로 옮긴다.
+        아니면 기존 JSON 응답 (Base64 PNG)
+        """
+        if binary:
+            return image_response(file_name, style, params, encoded, encoder_options,
+                                  cache_status, extra)
+        
+        with timed(timer, 'base64'):
+            image_base64 = base64.b64encode(encoded).decode('utf-8')
+        data = {
+            'message': '이미지 변환 성공',
+            'file_name': file_name,
+            'style': style,
+            'params': params,
+            'sketch_image_base64': image_base64
+        }
+        if extra:
+            data['preview'] = extra
+        response = Response(data, status=status.HTTP_200_OK)
+        if cache_status:
+            response['X-Cache'] = cache_status
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """변환 결과 캐시의 적중/실패 통계 반환"""
+        result_cache = get_result_cache()
+        if result_cache is None:
+            return Response({'enabled': False})
+        stats = {'enabled': True, **result_cache.stats()}
+        similar_inputs = get_similarity_index()
+        if similar_inputs is not None:
+            stats['similar_inputs'] = similar_inputs.stats()
+        return Response(stats)
+    
+    @action(detail=False, methods=['get'])
+    def metrics(self, request):
+        """단계별 소요 시간 히스토그램 (Prometheus 텍스트 형식)"""
+        return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
     
     @action(detail=False, methods=['get'])
     def styles(self, request):
@@ -0,0 +1,49 @@
+# converter/warmup.py
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+import cv2
+import numpy as np
+
+from .decoding import decode_image
+from .encoding import DEFAULT_LEVELS, FORMATS, EncoderOptions, encode_image
+from .processors import ProcessorFactory
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_image(size: int = 64) -> np.ndarray:
+    """워밍업용 작은 결정적 이미지 (엣지가 있어야 모든 분기를 한 번씩 탐)"""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 40, (size, size, 3), dtype=np.uint8)
+    cv2.rectangle(image, (size // 8, size // 8), (size // 2, size // 2), (200, 120, 40), -1)
+    cv2.circle(image, (size * 2 // 3, size * 2 // 3), size // 4, (30, 180, 220), -1)
+    return image
+
+
+def warm_up(styles: Optional[Iterable[str]] = None, size: int = 64) -> Dict[str, float]:
+    """
+    공유 프로세서를 만들고 스타일마다 작은 이미지로 한 번씩 실행해 첫 요청의 지연을 미리 치름
+    (OpenCV 함수별 첫 호출 초기화, 스레드 풀 생성, 인코더 초기화 등).
+    Django 설정을 읽지 않으므로 작업 프로세스에서도 호출할 수 있다.
+    Returns:
+        단계 이름 -> 걸린 시간(초) - 스타일 이름, 'encode:<포맷>', 'decode:<포맷>'
+    """
+    image = warmup_image(size)
+    timings = {}
+    for style in styles or ProcessorFactory.PROCESSORS:
+        start = time.perf_counter()
+        result = ProcessorFactory.get_processor(style).process(image)
+        timings[style] = time.perf_counter() - start
+    for name in FORMATS:
+        start = time.perf_counter()
+        encoded = encode_image(result, EncoderOptions(name, DEFAULT_LEVELS[name]))
+        timings[f'encode:{name}'] = time.perf_counter() - start
+        # 업로드 디코딩 경로 (PIL 헤더 읽기 + 플러그인 로드, OpenCV 디코더)
+        start = time.perf_counter()
+        decode_image(encoded)
+        timings[f'decode:{name}'] = time.perf_counter() - start
+    logger.info('converter warm-up %.1f ms (%s)', sum(timings.values()) * 1e3,
+                ', '.join(f'{name} {seconds * 1e3:.1f}' for name, seconds in timings.items()))
+    return timings
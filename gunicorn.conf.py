@@ -0,0 +1,40 @@
+# gunicorn.conf.py
+# 사용법: gunicorn config.wsgi -c gunicorn.conf.py
+# 워커 수는 CONVERTER_WORKERS (기본 'auto' - converter/concurrency.py의 auto_tune)
+import os
+
+from converter.concurrency import resolve
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+# resolve가 마스터에서 코어 수를 세어 두므로 (concurrency.cpu_count) 워커는 코어에 고정된 뒤에도
+# fork로 물려받은 같은 값으로 'auto'를 풂
+workers = resolve({'WORKERS': os.getenv('CONVERTER_WORKERS', 'auto'),
+                   'CV_THREADS': os.getenv('CONVERTER_CV_THREADS', 'auto')})['WORKERS']
+# 요청마다 다른 워커로 갈 수 있으므로 작업 큐 기록(jobs/)과 image_id 원본(images/)은
+# settings.CACHES['converter']로 워커끼리 공유하고, 작업 큐의 WORKERS/MAX_PENDING은
+# post_fork에서 기록한 워커 수(CONVERTER_WEB_WORKERS)로 나눠 서버 전체 한도를 지킴
+
+# Django와 OpenCV/NumPy, 프로세서 모듈을 마스터에서 한 번만 import하고 워커는 fork로 공유
+preload_app = True
+
+# 마스터에서는 OpenCV 연산을 실행하지 않음 - 스레드 풀 등은 fork 후 자식에서 동작하지 않으므로
+# 워밍업은 워커마다 post_fork에서 실행
+os.environ.setdefault('CONVERTER_WARMUP_ON_READY', 'false')
+
+
+def post_fork(server, worker):
+    from django.conf import settings
+    from converter.apps import run_warm_up
+    from converter.concurrency import WEB_WORKERS_ENV, apply_cv_threads, get_concurrency, pin_worker
+
+    # 서버 전체 한도(작업 큐 등)를 워커마다 나눌 때 쓰는 워커 수
+    os.environ[WEB_WORKERS_ENV] = str(server.num_workers)
+    concurrency = get_concurrency()
+    apply_cv_threads(concurrency['CV_THREADS'])
+    if concurrency['AFFINITY']:
+        # worker.age는 워커를 띄울 때마다 1씩 늘어나므로 재시작된 워커도 코어를 돌아가며 받음
+        cores = pin_worker(worker.age - 1, concurrency['CV_THREADS'])
+        server.log.info('worker %s pinned to cores %s', worker.pid, sorted(cores or []))
+
+    timings = run_warm_up(getattr(settings, 'CONVERTER_WARMUP', {}).get('SIZE', 64))
+    server.log.info('worker %s warm-up %.1f ms', worker.pid, sum(timings.values()) * 1e3)